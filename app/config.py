@@ -1,3 +1,4 @@
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,9 +7,73 @@ class Settings(BaseSettings):
     DB_NAME: str = "arena_db"
     DB_USER: str = "postgres"
     DB_PASSWORD: str = "postgres"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
     SECRET_KEY: str = "your-secret-key"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    JWT_KEYS: Dict[str, str] = {}
+    JWT_ACTIVE_KID: str = ""
+    TOKEN_CACHE_MAXSIZE: int = 10000
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAXSIZE: int = 10000
+    BCRYPT_ROUNDS: int = 12
+    HASH_WORKERS: int = 0
+    HASH_MAX_PENDING: int = 64
+    BULK_CHUNK_SIZE: int = 1000
+    CACHE_BACKEND: str = "memory"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_TTL_SECONDS: int = 300
+    CACHE_MAXSIZE: int = 1024
+    VALOR_MENSALIDADE: float = 200.0
+    SERIE_MAX_OCORRENCIAS: int = 366
+    PRECO_PICO_MULTIPLICADOR: float = 1.0
+    PRECO_PICO_INICIO: int = 18
+    PRECO_PICO_FIM: int = 23
+    PRECO_PICO_FIM_DE_SEMANA: bool = False
+    PRECO_NOITE_INICIO: int = 18
+    PRECO_NOITE_FIM: int = 6
+    PRECO_ILUMINACAO_HORA: float = 0.0
+    PRECO_COBERTA_MULTIPLICADOR: float = 1.0
+    PRECO_TABELA_TTL_SECONDS: int = 60
+    ROUTERS: List[str] = []
+    STARTUP_WARM_CONNECTIONS: int = 2
+    STARTUP_WARM_RANKINGS: bool = True
+    STARTUP_WARM_TIMEOUT: float = 5
+    EVENTS_BACKEND: str = "postgres"
+    EVENTS_QUEUE_SIZE: int = 256
+    EVENTS_KEEPALIVE_SECONDS: float = 15
+    EVENTS_HEARTBEAT_SECONDS: float = 20
+    HISTORICO_DIR: str = "historico"
+    HISTORICO_MESES_ATIVOS: int = 24
+    HISTORICO_MESES_FUTUROS: int = 3
+    HISTORICO_ARQUIVAR: bool = False
+    HISTORICO_INTERVALO_SECONDS: int = 3600
+    JOBS_WORKERS: int = 2
+    JOBS_POLL_SECONDS: float = 5
+    JOBS_MAX_TENTATIVAS: int = 5
+    JOBS_BACKOFF_SECONDS: float = 10
+    JOBS_BACKOFF_MAX_SECONDS: float = 3600
+    JOBS_TIMEOUT_SECONDS: float = 600
+    PAINEL_TTL_SECONDS: int = 30
+    PAINEL_MARGEM_SECONDS: int = 300
+    PAINEL_RECARGA_SECONDS: int = 86400
+    PAINEL_SNAPSHOT: str = "painel/cubo.npz"
+    PAINEL_SNAPSHOT_SECONDS: int = 600
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+    CLUSTER_SOCKET_DIR: str = ""
+    RATE_LIMIT_FILE: str = ""
+    RATE_LIMIT_SLOTS: int = 65536
+    RATE_LIMIT_LOGIN_PER_MINUTE: float = 20
+    RATE_LIMIT_LOGIN_BURST: int = 10
+    METRICS_SERVER_TIMING: bool = False
+    METRICS_N_PLUS_ONE_THRESHOLD: int = 10
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,134 @@
+import csv
+import enum
+import io
+import json
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple, Type
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from .responses import dumps
+
+class RowError(BaseModel):
+    line: int
+    errors: List[str]
+
+class ImportResult(BaseModel):
+    inserted: int = 0
+    errors: List[RowError] = []
+
+# Recebe (linha, objeto validado) de um lote e devolve os erros das linhas que não foram inseridas
+ChunkWriter = Callable[[List[Tuple[int, BaseModel]]], Awaitable[List[RowError]]]
+
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8").rstrip("\r")
+
+async def iter_records(request: Request) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    # NDJSON por padrão; CSV quando o Content-Type pede (cabeçalho na primeira linha)
+    is_csv = "csv" in request.headers.get("content-type", "")
+    header = None
+    line_number = 0
+    async for line in _iter_lines(request):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            if is_csv:
+                values = next(csv.reader([line]))
+                if header is None:
+                    header = values
+                    continue
+                if len(values) != len(header):
+                    raise ValueError(f"expected {len(header)} columns, got {len(values)}")
+                record = {key: value if value != "" else None for key, value in zip(header, values)}
+            else:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("expected a JSON object")
+        except ValueError as exc:
+            yield line_number, None, str(exc)
+            continue
+        yield line_number, record, None
+
+def _validation_messages(exc: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()]
+
+async def import_records(request: Request, schema: Type[BaseModel], write_chunk: ChunkWriter) -> ImportResult:
+    """Valida o corpo em streaming e entrega lotes de BULK_CHUNK_SIZE linhas válidas
+    para `write_chunk`, que insere cada lote em uma única transação."""
+    result = ImportResult()
+    chunk: List[Tuple[int, BaseModel]] = []
+
+    async def flush():
+        errors = await write_chunk(chunk)
+        result.inserted += len(chunk) - len(errors)
+        result.errors.extend(errors)
+        chunk.clear()
+
+    async for line, record, error in iter_records(request):
+        if error:
+            result.errors.append(RowError(line=line, errors=[error]))
+            continue
+        try:
+            chunk.append((line, schema.model_validate(record)))
+        except ValidationError as exc:
+            result.errors.append(RowError(line=line, errors=_validation_messages(exc)))
+            continue
+        if len(chunk) >= settings.BULK_CHUNK_SIZE:
+            await flush()
+    if chunk:
+        await flush()
+    result.errors.sort(key=lambda error: error.line)
+    return result
+
+def _plain(value):
+    return value.value if isinstance(value, enum.Enum) else value
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "json": ("application/json", "json"),
+    "csv": ("text/csv", "csv"),
+}
+
+def export_response(db: AsyncSession, stmt: Select, format: str, filename: str) -> StreamingResponse:
+    """Exporta o resultado de `stmt` (colunas projetadas) direto de um cursor no servidor."""
+
+    async def rows():
+        result = await db.stream(stmt.execution_options(yield_per=settings.BULK_CHUNK_SIZE))
+        keys = list(result.keys())
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(keys)
+            async for partition in result.partitions():
+                writer.writerows([_plain(value) for value in row] for row in partition)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        elif format == "json":
+            # Array JSON em streaming: mesmo corpo de uma listagem, sem montar a lista inteira em memória
+            separator = b"["
+            async for partition in result.partitions():
+                for row in partition:
+                    yield separator + dumps(dict(zip(keys, row)))
+                    separator = b","
+            yield b"[]" if separator == b"[" else b"]"
+        else:
+            async for partition in result.partitions():
+                yield b"".join(dumps(dict(zip(keys, row))) + b"\n" for row in partition)
+
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        rows(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{extension}"'},
+    )
@@ -0,0 +1,172 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from fastapi import Request, Response
+from ..config import settings
+from .cluster import cluster
+
+class MemoryBackend:
+    """LRU com TTL no próprio processo."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    async def version(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+class RedisBackend:
+    """Backend compartilhado entre processos; aceita qualquer cliente com a API de redis.asyncio."""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.client.set(key, value, ex=ttl)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*keys)
+
+    async def version(self, key: str) -> int:
+        value = await self.client.get(key)
+        return int(value) if value is not None else 0
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+class InMemoryRedis:
+    """Substituto local do cliente redis.asyncio (get/set/delete/incr), para testes e desenvolvimento."""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Optional[float], bytes]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value, ex: Optional[int] = None) -> bool:
+        if isinstance(value, int):
+            value = str(value)
+        if isinstance(value, str):
+            value = value.encode()
+        self._data[key] = (time.monotonic() + ex if ex else None, value)
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+    async def incr(self, key: str) -> int:
+        value = int(await self.get(key) or 0) + 1
+        self._data[key] = (None, str(value).encode())
+        return value
+
+def create_backend():
+    if settings.CACHE_BACKEND == "redis":
+        import redis.asyncio as redis
+        return RedisBackend(redis.from_url(settings.CACHE_REDIS_URL))
+    if settings.CACHE_BACKEND == "local-redis":
+        return RedisBackend(InMemoryRedis())
+    return MemoryBackend(settings.CACHE_MAXSIZE)
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+class ResponseCache:
+    """Cache de respostas JSON já serializadas, com ETag.
+
+    Cada recurso usa um namespace: itens ficam em `<ns>:item:<id>:<versão do item>` e
+    listagens incluem a versão do namespace na chave, de modo que uma escrita invalida
+    exatamente o item alterado e as listagens, sem varrer chaves. A chave é montada
+    antes de gerar a resposta: uma geração que leu o banco antes da escrita grava na
+    versão antiga, que ninguém mais consulta."""
+
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+
+    async def item_key(self, namespace: str, item_id) -> str:
+        version = await self.backend.version(f"{namespace}:item:{item_id}:version")
+        return f"{namespace}:item:{item_id}:{version}"
+
+    async def list_key(self, namespace: str, *parts) -> str:
+        version = await self.backend.version(f"{namespace}:version")
+        return f"{namespace}:list:{version}:" + ":".join(str(part) for part in parts)
+
+    async def respond(self, request: Request, key: str, build: Callable[[], Awaitable[bytes]]) -> Response:
+        cached = await self.backend.get(key)
+        if cached is None:
+            body = await build()
+            etag = make_etag(body)
+            await self.backend.set(key, etag.encode() + b"\n" + body, self.ttl)
+        else:
+            raw_etag, body = cached.split(b"\n", 1)
+            etag = raw_etag.decode()
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def invalidate(self, namespace: str, *item_ids) -> None:
+        await self._invalidate(namespace, *item_ids)
+        # Redis já é compartilhado; o cache em memória de cada worker precisa do aviso
+        if isinstance(self.backend, MemoryBackend):
+            cluster.publicar("cache", namespace, *item_ids)
+
+    async def _invalidate(self, namespace: str, *item_ids) -> None:
+        for item_id in item_ids:
+            version = await self.backend.incr(f"{namespace}:item:{item_id}:version")
+            # A versão anterior não é mais lida: libera o espaço sem esperar o TTL
+            await self.backend.delete(f"{namespace}:item:{item_id}:{version - 1}")
+        await self.backend.incr(f"{namespace}:version")
+
+response_cache = ResponseCache(create_backend(), settings.CACHE_TTL_SECONDS)
+cluster.registrar("cache", response_cache._invalidate)
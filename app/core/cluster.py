@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import os
+import socket
+from typing import Callable, Dict, Optional, Set
+import orjson
+from ..config import settings
+from .responses import dumps
+
+logger = logging.getLogger(__name__)
+
+# Datagramas maiores que isso não são garantidos pelo kernel: quem publica listas grandes manda só a invalidação
+MAX_DATAGRAMA = 64 * 1024
+
+class ClusterBus:
+    """Difusão de invalidações de cache entre os workers da mesma máquina.
+
+    Cada worker escuta em um socket Unix de datagrama `<CLUSTER_SOCKET_DIR>/<pid>.sock`
+    e publicar é enviar a mensagem a todos os outros sockets do diretório, sem processo
+    central. Quem publica já aplicou a mudança localmente; os demais executam o handler
+    registrado para o tópico. Sem diretório configurado (um único processo), publicar
+    não faz nada. Mensagens perdidas (worker lento) valem até o TTL de cada cache."""
+
+    def __init__(self, diretorio: str):
+        self.diretorio = diretorio
+        self._handlers: Dict[str, Callable] = {}
+        self._caminho: Optional[str] = None
+        self._entrada: Optional[socket.socket] = None
+        self._saida: Optional[socket.socket] = None
+        self._tarefas: Set[asyncio.Task] = set()
+
+    def registrar(self, topico: str, handler: Callable) -> None:
+        self._handlers[topico] = handler
+
+    def publicar(self, topico: str, *args) -> None:
+        if self._saida is None:
+            return
+        payload = dumps([topico, args])
+        with os.scandir(self.diretorio) as entradas:
+            destinos = [entrada.path for entrada in entradas if entrada.name.endswith(".sock")]
+        for destino in destinos:
+            if destino == self._caminho:
+                continue
+            try:
+                self._saida.sendto(payload, destino)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Socket de um worker que terminou sem removê-lo
+                try:
+                    os.unlink(destino)
+                except FileNotFoundError:
+                    pass
+            except BlockingIOError:
+                logger.warning("Cluster peer %s is not keeping up, dropping %s message", destino, topico)
+
+    def _receber(self) -> None:
+        while True:
+            try:
+                payload = self._entrada.recv(MAX_DATAGRAMA)
+            except (BlockingIOError, InterruptedError):
+                return
+            try:
+                topico, args = orjson.loads(payload)
+            except (orjson.JSONDecodeError, ValueError):
+                logger.warning("Ignoring malformed cluster message")
+                continue
+            handler = self._handlers.get(topico)
+            if handler is None:
+                continue
+            resultado = handler(*args)
+            if asyncio.iscoroutine(resultado):
+                tarefa = asyncio.get_running_loop().create_task(resultado)
+                self._tarefas.add(tarefa)
+                tarefa.add_done_callback(self._tarefas.discard)
+
+    def start(self) -> None:
+        if not self.diretorio or self._entrada is not None:
+            return
+        os.makedirs(self.diretorio, exist_ok=True)
+        self._caminho = os.path.join(self.diretorio, f"{os.getpid()}.sock")
+        if os.path.exists(self._caminho):
+            os.unlink(self._caminho)
+        self._entrada = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._entrada.setblocking(False)
+        self._entrada.bind(self._caminho)
+        self._saida = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._saida.setblocking(False)
+        asyncio.get_running_loop().add_reader(self._entrada.fileno(), self._receber)
+
+    def stop(self) -> None:
+        if self._entrada is None:
+            return
+        asyncio.get_running_loop().remove_reader(self._entrada.fileno())
+        self._entrada.close()
+        self._saida.close()
+        self._entrada = self._saida = None
+        try:
+            os.unlink(self._caminho)
+        except FileNotFoundError:
+            pass
+
+cluster = ClusterBus(settings.CLUSTER_SOCKET_DIR)
@@ -1,34 +1,40 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from jose import JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas.user import TokenData
 from ..models.user import User
-from ..config import settings
+from .principals import principal_cache
+from .tokens import token_service
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-async def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+async def get_token_data(token: str = Depends(oauth2_scheme)) -> TokenData:
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
+        return token_service.decode(token)
     except JWTError:
-        raise credentials_exception
-    user = db.query(User).filter(User.username == token_data.username).first()
+        raise _credentials_exception()
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_db),
+    token_data: TokenData = Depends(get_token_data)
+) -> User:
+    cached = principal_cache.get(token_data.username)
+    if cached is not None:
+        return await principal_cache.attach(db, cached)
+    user = await db.scalar(select(User).where(User.username == token_data.username))
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    principal_cache.set(token_data.username, user)
     return user
 
 async def get_current_active_user(
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Iterable, Optional, Set
+import asyncpg
+import orjson
+from ..config import settings
+from .responses import dumps
+
+logger = logging.getLogger(__name__)
+
+CANAL = "arena_ocupacao"
+RESYNC = dumps({"t": "resync"})
+
+class Assinante:
+    """Fila limitada de uma conexão (SSE ou WebSocket).
+
+    Se o cliente não consome no ritmo das mensagens, a fila é descartada e fica só
+    um `resync`: o cliente lento recarrega o estado em vez de segurar memória ou
+    atrasar os outros assinantes."""
+
+    def __init__(self, quadras: Optional[Iterable[int]], maxsize: int):
+        self.quadras: Optional[Set[int]] = set(quadras) if quadras else None
+        self.fila: asyncio.Queue = asyncio.Queue(maxsize)
+
+    def entregar(self, quadra_id: Optional[int], payload: bytes) -> None:
+        if self.quadras is not None and quadra_id is not None and quadra_id not in self.quadras:
+            return
+        try:
+            self.fila.put_nowait(payload)
+        except asyncio.QueueFull:
+            while not self.fila.empty():
+                self.fila.get_nowait()
+            self.fila.put_nowait(RESYNC)
+
+    async def proxima(self, timeout: float) -> Optional[bytes]:
+        try:
+            return await asyncio.wait_for(self.fila.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+class EventBus:
+    """Pub/sub do processo: cada mensagem é serializada uma vez e o mesmo payload
+    vai para a fila de todos os assinantes interessados."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._assinantes: Set[Assinante] = set()
+
+    def assinar(self, quadras: Optional[Iterable[int]] = None) -> Assinante:
+        assinante = Assinante(quadras, self.maxsize)
+        self._assinantes.add(assinante)
+        return assinante
+
+    def cancelar(self, assinante: Assinante) -> None:
+        self._assinantes.discard(assinante)
+
+    def publicar_payload(self, quadra_id: Optional[int], payload: bytes) -> None:
+        for assinante in tuple(self._assinantes):
+            assinante.entregar(quadra_id, payload)
+
+    def publicar(self, mensagem: dict) -> None:
+        self.publicar_payload(mensagem.get("quadra_id"), dumps(mensagem))
+
+    def resync(self) -> None:
+        self.publicar_payload(None, RESYNC)
+
+    @property
+    def assinantes(self) -> int:
+        return len(self._assinantes)
+
+event_bus = EventBus(settings.EVENTS_QUEUE_SIZE)
+
+def _iso(valor: Optional[datetime]) -> Optional[str]:
+    return valor.isoformat() if valor else None
+
+# Mesmo formato do JSON montado pelos triggers (migration 0003)
+
+def mensagem_agendamento(op: str, agendamento) -> dict:
+    return {
+        "t": "agendamento",
+        "op": op,
+        "id": agendamento.id,
+        "quadra_id": agendamento.quadra_id,
+        "inicio": _iso(agendamento.data_hora_inicio),
+        "fim": _iso(agendamento.data_hora_fim),
+        "status": agendamento.status.value if agendamento.status else None,
+    }
+
+def mensagem_serie(op: str, serie_id: int, quadra_id: int) -> dict:
+    return {"t": "serie", "op": op, "id": serie_id, "quadra_id": quadra_id}
+
+def mensagem_quadra(op: str, quadra_id: int, nome: Optional[str] = None) -> dict:
+    return {"t": "quadra", "op": op, "quadra_id": quadra_id, "nome": nome}
+
+def publicar(mensagem: dict) -> None:
+    # Com o backend postgres quem publica são os triggers, via NOTIFY, para todos os workers
+    if settings.EVENTS_BACKEND == "memory":
+        event_bus.publicar(mensagem)
+
+class PostgresListener:
+    """Conexão asyncpg dedicada em LISTEN no canal dos triggers, repassando os
+    payloads ao EventBus do worker. Reconecta com backoff; depois de uma queda os
+    assinantes recebem `resync`, pois notificações do intervalo se perderam."""
+
+    def __init__(self, bus: EventBus, dsn: str):
+        self.bus = bus
+        self.dsn = dsn
+        self._task: Optional[asyncio.Task] = None
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            quadra_id = orjson.loads(payload).get("quadra_id")
+        except orjson.JSONDecodeError:
+            logger.warning("Ignoring malformed notification on %s", channel)
+            return
+        self.bus.publicar_payload(quadra_id, payload.encode())
+
+    async def _run(self) -> None:
+        espera = 1.0
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning("Event listener could not connect: %s", exc)
+                await asyncio.sleep(espera)
+                espera = min(espera * 2, 30.0)
+                continue
+            espera = 1.0
+            fechada = asyncio.Event()
+            connection.add_termination_listener(lambda _: fechada.set())
+            try:
+                await connection.add_listener(CANAL, self._on_notify)
+                self.bus.resync()
+                while not fechada.is_set():
+                    # Conexão ociosa não percebe a queda sozinha: um ping periódico a denuncia
+                    try:
+                        await asyncio.wait_for(fechada.wait(), settings.EVENTS_KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        await connection.execute("SELECT 1")
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+                logger.warning("Event listener connection lost: %s", exc)
+            finally:
+                if not connection.is_closed():
+                    await connection.close()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,173 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class RequestMetrics:
+    __slots__ = ("queries", "query_time", "pool_wait", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.pool_wait = 0.0
+        self.statements: Counter = Counter()
+
+    def server_timing(self, total: float) -> str:
+        return (
+            f'db;dur={self.query_time * 1000:.1f};desc="{self.queries} queries", '
+            f"pool;dur={self.pool_wait * 1000:.1f}, "
+            f"app;dur={total * 1000:.1f}"
+        )
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+def current_request_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+def _labels(**labels) -> str:
+    return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.queries_per_request: Dict[Tuple[str, str], Histogram] = {}
+        self.requests: Counter = Counter()
+        self.query_seconds: Counter = Counter()
+        self.pool_wait_seconds: Counter = Counter()
+        self.n_plus_one: Counter = Counter()
+
+    def record(self, method: str, route: str, status: int, duration: float, metrics: RequestMetrics) -> None:
+        key = (method, route)
+        with self._lock:
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(duration)
+            self.queries_per_request.setdefault(key, Histogram(QUERY_COUNT_BUCKETS)).observe(metrics.queries)
+            self.requests[(method, route, status)] += 1
+            self.query_seconds[key] += metrics.query_time
+            self.pool_wait_seconds[key] += metrics.pool_wait
+        # Mesmo statement repetido muitas vezes em um request: provável carga lazy em loop (N+1)
+        for statement, count in metrics.statements.items():
+            if count >= settings.METRICS_N_PLUS_ONE_THRESHOLD:
+                with self._lock:
+                    self.n_plus_one[key] += 1
+                logger.warning("Possible N+1 on %s %s: %d executions of %s", method, route, count, statement)
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            lines += self._render_histogram("arena_http_request_duration_seconds", self.latency)
+            lines += self._render_histogram("arena_db_queries_per_request", self.queries_per_request)
+            lines.append("# TYPE arena_http_requests_total counter")
+            for (method, route, status), value in sorted(self.requests.items()):
+                lines.append(f"arena_http_requests_total{{{_labels(method=method, route=route, status=status)}}} {value}")
+            for name, counter in (
+                ("arena_db_query_seconds_total", self.query_seconds),
+                ("arena_db_pool_wait_seconds_total", self.pool_wait_seconds),
+                ("arena_db_n_plus_one_total", self.n_plus_one),
+            ):
+                lines.append(f"# TYPE {name} counter")
+                for (method, route), value in sorted(counter.items()):
+                    lines.append(f"{name}{{{_labels(method=method, route=route)}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    def _render_histogram(self, name: str, histograms: Dict[Tuple[str, str], Histogram]):
+        lines = [f"# TYPE {name} histogram"]
+        for (method, route), histogram in sorted(histograms.items()):
+            labels = _labels(method=method, route=route)
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        return lines
+
+registry = MetricsRegistry()
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Pool padrão do engine assíncrono, medindo o tempo de espera por uma conexão."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics = _current.get()
+            if metrics is not None:
+                metrics.pool_wait += time.perf_counter() - started
+
+def instrument_engine(engine) -> None:
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.queries += 1
+            metrics.query_time += time.perf_counter() - started
+            metrics.statements[statement] += 1
+
+class MetricsMiddleware:
+    """Middleware ASGI: latência por rota, consultas e espera no pool por request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.METRICS_SERVER_TIMING:
+                    headers = list(message.get("headers", []))
+                    timing = metrics.server_timing(time.perf_counter() - started)
+                    headers.append((b"server-timing", timing.encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            # Rotas não encontradas ficam agrupadas para não explodir a cardinalidade
+            path = getattr(route, "path", None) or "unmatched"
+            registry.record(scope["method"], path, status_code, time.perf_counter() - started, metrics)
@@ -0,0 +1,65 @@
+import base64
+import json
+from typing import Generic, List, Optional, TypeVar
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import Select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    total_estimate: Optional[int] = None
+
+class CursorParams:
+    def __init__(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = Query(100, ge=1, le=500),
+        with_total: bool = False,
+    ):
+        self.cursor = cursor
+        self.after = decode_cursor(cursor) if cursor else None
+        self.limit = limit
+        self.with_total = with_total
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return int(json.loads(raw)["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def estimate_total(db: AsyncSession, table_name: str) -> Optional[int]:
+    # Estimativa do planner (atualizada por ANALYZE/autovacuum) em vez de COUNT(*)
+    estimate = await db.scalar(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name},
+    )
+    return estimate if estimate is not None and estimate >= 0 else None
+
+def _is_entity(stmt: Select, model) -> bool:
+    descriptions = stmt.column_descriptions
+    return len(descriptions) == 1 and descriptions[0]["expr"] is model
+
+async def paginate(db: AsyncSession, stmt: Select, model, params: CursorParams, estimate: bool = True) -> dict:
+    # Keyset pelo id: o índice da PK começa direto no cursor, sem descartar linhas como o OFFSET
+    if params.after is not None:
+        stmt = stmt.where(model.id > params.after)
+    result = await db.execute(stmt.order_by(model.id).limit(params.limit + 1))
+    # Projeções (QueryProfile com colunas) voltam como Rows, que também expõem `.id`
+    rows = result.scalars().all() if _is_entity(stmt, model) else result.all()
+    items = rows[:params.limit]
+    page = {
+        "items": items,
+        "next_cursor": encode_cursor(items[-1].id) if len(rows) > params.limit else None,
+    }
+    if params.with_total and estimate:
+        page["total_estimate"] = await estimate_total(db, model.__tablename__)
+    return page
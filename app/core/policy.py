@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from fastapi import Depends, HTTPException
+from sqlalchemy import event, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..database import get_db
+from ..models.aluno import Aluno
+from ..models.professor import Professor
+from ..models.user import User, UserType
+from ..schemas.user import TokenData
+from .cluster import cluster
+from .deps import get_current_active_user, get_token_data
+
+_SEM_PROFESSOR = -1
+
+class OwnershipCache:
+    """Cache TTL/LRU do `professor_id` de cada usuário professor, indexado por `user_id`.
+
+    Só é consultado quando o token não traz o claim `professor_id` (tokens emitidos
+    antes do cadastro do professor). Guarda também a ausência de perfil, derrubada
+    quando um `Professor` é criado ou removido pelo ORM."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[int]:
+        """`professor_id`, `_SEM_PROFESSOR` se o usuário não tem perfil ou None se não está no cache."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, professor_id = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return professor_id
+
+    def set(self, user_id: int, professor_id: Optional[int]) -> None:
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, professor_id or _SEM_PROFESSOR)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._discard(user_id)
+        cluster.publicar("professor", user_id)
+
+    def _discard(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+ownership_cache = OwnershipCache(settings.AUTH_CACHE_MAXSIZE, settings.AUTH_CACHE_TTL_SECONDS)
+cluster.registrar("professor", ownership_cache._discard)
+
+@event.listens_for(Professor, "after_insert")
+@event.listens_for(Professor, "after_update")
+@event.listens_for(Professor, "after_delete")
+def _invalidate_professor(mapper, connection, target: Professor):
+    if target.user_id is not None:
+        ownership_cache.invalidate(target.user_id)
+
+class AuthContext:
+    """Papel e recursos do usuário autenticado, resolvidos uma vez por request.
+
+    Os handlers usam os filtros daqui no WHERE da própria consulta: a verificação
+    de posse e a busca do registro saem na mesma ida ao banco."""
+
+    def __init__(self, user: User, professor_id: Optional[int] = None):
+        self.user = user
+        self.professor_id = professor_id
+
+    @property
+    def user_type(self) -> UserType:
+        return self.user.user_type
+
+    @property
+    def is_admin(self) -> bool:
+        return self.user.user_type == UserType.ADMIN
+
+    @property
+    def is_professor(self) -> bool:
+        return self.user.user_type == UserType.PROFESSOR
+
+    @property
+    def cliente_id(self) -> int:
+        # Agendamentos e comandas referenciam o próprio usuário como cliente
+        return self.user.id
+
+    def exigir(self, *tipos: UserType, detail: str = "Not enough permissions") -> None:
+        if self.user.user_type not in tipos:
+            raise HTTPException(status_code=403, detail=detail)
+
+    def exigir_professor(self) -> int:
+        """`professor_id` do usuário; 403 se não é professor e 404 se ainda não tem perfil."""
+        self.exigir(UserType.PROFESSOR, detail="User is not a professor")
+        if self.professor_id is None:
+            raise HTTPException(status_code=404, detail="Professor not found")
+        return self.professor_id
+
+    def alunos(self):
+        """Condição de posse sobre `Aluno`: tudo para admin, só os próprios alunos para professor."""
+        if self.is_admin:
+            return true()
+        return Aluno.professor_id == self.professor_id
+
+    def pode_atribuir(self, professor_id: int) -> bool:
+        return self.is_admin or (self.professor_id is not None and self.professor_id == professor_id)
+
+async def _professor_id(db: AsyncSession, user: User, token_data: TokenData) -> Optional[int]:
+    if user.user_type != UserType.PROFESSOR:
+        return None
+    if token_data.professor_id is not None:
+        return token_data.professor_id
+    cached = ownership_cache.get(user.id)
+    if cached is not None:
+        return None if cached == _SEM_PROFESSOR else cached
+    professor_id = await db.scalar(select(Professor.id).where(Professor.user_id == user.id))
+    ownership_cache.set(user.id, professor_id)
+    return professor_id
+
+async def get_auth_context(
+    db: AsyncSession = Depends(get_db),
+    token_data: TokenData = Depends(get_token_data),
+    current_user: User = Depends(get_current_active_user),
+) -> AuthContext:
+    return AuthContext(current_user, await _professor_id(db, current_user, token_data))
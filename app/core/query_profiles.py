@@ -0,0 +1,55 @@
+from typing import Optional, Sequence, Tuple, Type, Union
+from pydantic import BaseModel
+from sqlalchemy import Select, inspect, select
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+Caminho = Union[object, Tuple[object, ...]]
+
+def _carregar(loader, caminho: Caminho):
+    # (Comanda.itens, ItemComanda.produto) -> selectinload(Comanda.itens).selectinload(ItemComanda.produto)
+    caminho = caminho if isinstance(caminho, tuple) else (caminho,)
+    option = loader(caminho[0])
+    for atributo in caminho[1:]:
+        option = getattr(option, loader.__name__)(atributo)
+    return option
+
+class QueryProfile:
+    """Como um endpoint lê um model.
+
+    Com `columns`, a consulta projeta só essas colunas e devolve Rows, sem montar
+    entidades no identity map; o schema de resposta lê os campos direto do Row.
+    Sem `columns`, carrega a entidade com os relacionamentos declarados em
+    `selectin`/`joined` e bloqueia qualquer outro carregamento lazy, de modo que o
+    número de consultas não depende do tamanho da página."""
+
+    def __init__(
+        self,
+        model,
+        columns: Optional[Sequence] = None,
+        selectin: Sequence[Caminho] = (),
+        joined: Sequence[Caminho] = (),
+        joins: Sequence = (),
+    ):
+        self.model = model
+        self.columns = list(columns) if columns else None
+        self.joins = list(joins)
+        self.options = [_carregar(selectinload, caminho) for caminho in selectin]
+        self.options += [_carregar(joinedload, caminho) for caminho in joined]
+
+    @classmethod
+    def for_schema(cls, model, schema: Type[BaseModel], **kwargs) -> "QueryProfile":
+        # Projeta exatamente os campos do schema que são colunas do model
+        colunas = inspect(model).columns
+        return cls(model, columns=[getattr(model, field) for field in schema.model_fields if field in colunas], **kwargs)
+
+    @property
+    def projection(self) -> bool:
+        return self.columns is not None
+
+    def select(self) -> Select:
+        if self.projection:
+            stmt = select(*self.columns).select_from(self.model)
+            for target in self.joins:
+                stmt = stmt.join(target)
+            return stmt
+        return select(self.model).options(*self.options, raiseload("*"))
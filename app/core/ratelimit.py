@@ -0,0 +1,104 @@
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Optional
+from fastapi import HTTPException, Request
+from ..config import settings
+
+# Cada slot: hash da chave (0 = livre), fichas restantes e instante da última atualização
+SLOT = struct.Struct("<Qdd")
+# Slots examinados por chave; cheio o trecho, a entrada mais antiga dá lugar à nova
+SONDAGEM = 8
+
+class TokenBucketLimiter:
+    """Token bucket por chave (IP do cliente) em uma tabela hash de tamanho fixo.
+
+    Com `caminho`, a tabela é um arquivo mapeado em memória por todos os workers e
+    cada consulta trava (fcntl) só o trecho de `SONDAGEM` slots da chave, então o
+    limite vale para a máquina e não por processo. Sem arquivo, a tabela é anônima
+    e o limite é deste processo. Colisões e despejos só podem favorecer o cliente."""
+
+    def __init__(self, caminho: str, taxa: float, capacidade: int, slots: int):
+        self.caminho = caminho
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.slots = max(slots, SONDAGEM)
+        self._mapa: Optional[mmap.mmap] = None
+        self._fd: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _abrir(self) -> mmap.mmap:
+        # Aberto no primeiro uso, já dentro do worker: nada herdado do processo pai
+        if self._mapa is None:
+            tamanho = self.slots * SLOT.size
+            if not self.caminho:
+                self._mapa = mmap.mmap(-1, tamanho)
+            else:
+                self._fd = os.open(self.caminho, os.O_RDWR | os.O_CREAT, 0o600)
+                if os.fstat(self._fd).st_size < tamanho:
+                    os.ftruncate(self._fd, tamanho)
+                self._mapa = mmap.mmap(self._fd, tamanho)
+        return self._mapa
+
+    def _hash(self, chave: str) -> int:
+        valor = int.from_bytes(hashlib.blake2b(chave.encode(), digest_size=8).digest(), "little")
+        return valor or 1
+
+    def consumir(self, chave: str) -> float:
+        """Gasta uma ficha de `chave`; devolve 0 se havia ficha ou os segundos até a próxima."""
+        mapa = self._abrir()
+        valor = self._hash(chave)
+        inicio = valor % (self.slots - SONDAGEM + 1) * SLOT.size
+        with self._lock:
+            if self._fd is not None:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX, SONDAGEM * SLOT.size, inicio)
+            try:
+                agora = time.time()
+                fichas, visto = float(self.capacidade), agora
+                livre = antigo = None
+                for posicao in range(inicio, inicio + SONDAGEM * SLOT.size, SLOT.size):
+                    dono, saldo, ultimo = SLOT.unpack_from(mapa, posicao)
+                    if dono == valor:
+                        escolhido, fichas, visto = posicao, saldo, ultimo
+                        break
+                    if dono == 0:
+                        livre = posicao if livre is None else livre
+                    elif antigo is None or ultimo < antigo[1]:
+                        antigo = (posicao, ultimo)
+                else:
+                    escolhido = livre if livre is not None else antigo[0]
+                fichas = min(float(self.capacidade), fichas + max(agora - visto, 0.0) * self.taxa)
+                espera = 0.0
+                if fichas >= 1:
+                    fichas -= 1
+                else:
+                    espera = (1 - fichas) / self.taxa
+                SLOT.pack_into(mapa, escolhido, valor, fichas, agora)
+                return espera
+            finally:
+                if self._fd is not None:
+                    fcntl.lockf(self._fd, fcntl.LOCK_UN, SONDAGEM * SLOT.size, inicio)
+
+login_limiter = TokenBucketLimiter(
+    settings.RATE_LIMIT_FILE,
+    settings.RATE_LIMIT_LOGIN_PER_MINUTE / 60,
+    settings.RATE_LIMIT_LOGIN_BURST,
+    settings.RATE_LIMIT_SLOTS,
+)
+
+async def limit_login(request: Request) -> None:
+    # Atrás de proxy, o uvicorn já troca request.client pelo X-Forwarded-For (proxy_headers)
+    if settings.RATE_LIMIT_LOGIN_PER_MINUTE <= 0:
+        return
+    espera = login_limiter.consumir(request.client.host if request.client else "")
+    if espera > 0:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(math.ceil(espera))},
+        )
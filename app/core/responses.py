@@ -0,0 +1,32 @@
+from decimal import Decimal
+from typing import Any, Iterable, List
+import orjson
+from fastapi.responses import JSONResponse
+
+def _default(value):
+    # NUMERIC do Postgres chega como Decimal quando a coluna não passa pelo tipo Float do model
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+class FastJSONResponse(JSONResponse):
+    """JSON serializado com orjson, sem jsonable_encoder nem revalidação pelo response_model.
+
+    Para listagens de projeções (Rows com os campos do schema): o response_model da rota
+    continua documentando o formato, mas o conteúdo é escrito direto dos Rows."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def row_dicts(rows: Iterable) -> List[dict]:
+    return [row._asdict() for row in rows]
+
+def page_content(page: dict) -> dict:
+    return {
+        "items": row_dicts(page["items"]),
+        "next_cursor": page.get("next_cursor"),
+        "total_estimate": page.get("total_estimate"),
+    }
\ No newline at end of file
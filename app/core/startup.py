@@ -0,0 +1,69 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from ..config import settings
+from ..database import SessionLocal, engine
+from ..services.historico import HistoricoJob
+from ..services.jobs import job_queue
+from ..services.rankings import ranking_engine
+from .cluster import cluster
+from .events import PostgresListener, event_bus
+from .security import password_hasher
+
+logger = logging.getLogger(__name__)
+
+DSN = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+event_listener = PostgresListener(event_bus, DSN)
+historico_job = HistoricoJob(DSN)
+
+async def warm_pool(size: int) -> None:
+    # Abre `size` conexões em paralelo e as devolve ao pool: os primeiros requests não pagam o handshake
+    connections = await asyncio.gather(*(engine.connect() for _ in range(size)), return_exceptions=True)
+    await asyncio.gather(*(conn.close() for conn in connections if not isinstance(conn, BaseException)))
+    errors = [conn for conn in connections if isinstance(conn, BaseException)]
+    if errors:
+        raise errors[0]
+
+async def warm_rankings() -> None:
+    async with SessionLocal() as db:
+        await ranking_engine.aquecer(db)
+
+async def warm_up() -> None:
+    """Aquecimento em paralelo e sem bloquear a subida: falhas e timeout só geram log,
+    o worker passa a atender de qualquer forma (o schema é responsabilidade das migrations)."""
+    tasks = {"password_hasher": password_hasher.warm()}
+    if settings.STARTUP_WARM_CONNECTIONS > 0:
+        tasks["pool"] = warm_pool(settings.STARTUP_WARM_CONNECTIONS)
+    if settings.STARTUP_WARM_RANKINGS:
+        tasks["rankings"] = warm_rankings()
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(*tasks.values(), return_exceptions=True),
+            timeout=settings.STARTUP_WARM_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Startup warm-up timed out after %ss", settings.STARTUP_WARM_TIMEOUT)
+        return
+    for name, result in zip(tasks, results):
+        if isinstance(result, Exception):
+            logger.warning("Startup warm-up of %s failed: %s", name, result)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    cluster.start()
+    await warm_up()
+    if settings.EVENTS_BACKEND == "postgres":
+        event_listener.start()
+    if settings.HISTORICO_INTERVALO_SECONDS > 0:
+        historico_job.start()
+    if settings.JOBS_WORKERS > 0:
+        job_queue.start()
+    yield
+    await job_queue.stop()
+    await historico_job.stop()
+    await event_listener.stop()
+    cluster.stop()
+    password_hasher.shutdown()
+    await engine.dispose()
\ No newline at end of file
@@ -0,0 +1,114 @@
+import hmac
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from jose import JWTError, jwt
+from ..schemas.user import TokenData
+from ..config import settings
+from .cluster import cluster
+
+class TokenService:
+    """Emissão e validação dos JWT de acesso.
+
+    Tokens válidos ficam em cache até o `exp`, indexados pela assinatura; um
+    acerto custa um lookup e uma comparação do conteúdo assinado, sem decodificar
+    base64/JSON nem recalcular o HMAC. As chaves formam um keyring (`kid` no
+    header): novos tokens usam a chave ativa e os antigos continuam válidos
+    enquanto a chave deles estiver no keyring. Revogações são por `jti`."""
+
+    def __init__(self, keys: Dict[str, str], active_kid: str, algorithm: str, maxsize: int):
+        if active_kid not in keys:
+            raise ValueError(f"Active key '{active_kid}' is not in the keyring")
+        self.keys = keys
+        self.active_kid = active_kid
+        self.algorithm = algorithm
+        self.maxsize = maxsize
+        # assinatura -> (header.payload, exp, jti, TokenData)
+        self._entries: "OrderedDict[str, Tuple[str, float, Optional[str], TokenData]]" = OrderedDict()
+        # jti -> exp: revogação só precisa durar até o token expirar
+        self._revoked: Dict[str, float] = {}
+
+    def encode(self, claims: dict, expires_delta: Optional[timedelta] = None) -> str:
+        to_encode = claims.copy()
+        expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
+        to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
+        return jwt.encode(
+            to_encode,
+            self.keys[self.active_kid],
+            algorithm=self.algorithm,
+            headers={"kid": self.active_kid},
+        )
+
+    def decode(self, token: str) -> TokenData:
+        signing_input, _, signature = token.rpartition(".")
+        now = time.time()
+        entry = self._entries.get(signature)
+        if entry is not None:
+            cached_input, exp, jti, data = entry
+            if hmac.compare_digest(cached_input, signing_input) and exp > now:
+                if jti is not None and jti in self._revoked:
+                    raise JWTError("Token has been revoked")
+                self._entries.move_to_end(signature)
+                return data
+            if exp <= now:
+                del self._entries[signature]
+
+        payload = jwt.decode(token, self._key_for(token), algorithms=[self.algorithm])
+        if payload.get("sub") is None:
+            raise JWTError("Token has no subject")
+        jti = payload.get("jti")
+        if jti is not None and jti in self._revoked:
+            raise JWTError("Token has been revoked")
+        data = TokenData(
+            username=payload["sub"],
+            user_type=payload.get("user_type"),
+            professor_id=payload.get("professor_id"),
+            jti=jti,
+            exp=payload.get("exp"),
+        )
+        # Sem `exp` o token não entra no cache: não há até quando guardá-lo
+        if data.exp is not None:
+            self._entries[signature] = (signing_input, data.exp, jti, data)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return data
+
+    def _key_for(self, token: str) -> str:
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid is None:
+            # Tokens emitidos antes do keyring foram assinados com o SECRET_KEY, a chave
+            # `default`; depois que ela sai do keyring, deixam de valer como qualquer outra
+            kid = "default"
+        try:
+            return self.keys[kid]
+        except KeyError:
+            raise JWTError("Unknown signing key")
+
+    def revoke(self, jti: str, exp: float) -> None:
+        self._revoke(jti, exp)
+        cluster.publicar("revogacao", jti, exp)
+
+    def _revoke(self, jti: str, exp: float) -> None:
+        now = time.time()
+        if exp <= now:
+            return
+        self._revoked[jti] = exp
+        # Poda preguiçosa: entradas vencidas saem quando o conjunto cresce
+        if len(self._revoked) > self.maxsize:
+            self._revoked = {key: value for key, value in self._revoked.items() if value > now}
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._revoked
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+def _keyring() -> Tuple[Dict[str, str], str]:
+    if not settings.JWT_KEYS:
+        return {"default": settings.SECRET_KEY}, "default"
+    return settings.JWT_KEYS, settings.JWT_ACTIVE_KID or next(iter(settings.JWT_KEYS))
+
+token_service = TokenService(*_keyring(), settings.ALGORITHM, settings.TOKEN_CACHE_MAXSIZE)
+cluster.registrar("revogacao", token_service._revoke)
@@ -1,10 +1,18 @@
+from importlib import import_module
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine
-from .models import base
-from .routers import auth, users, professores, alunos, produtos, comandas, rankings, agendamentos
+from fastapi.responses import PlainTextResponse
+from .config import settings
+from .core.metrics import MetricsMiddleware, registry
+from .core.startup import lifespan
 
-app = FastAPI(title="Sistema de Gestão de Arena Esportiva")
+# Routers importados sob demanda: ROUTERS no .env restringe o que cada worker carrega
+ROUTERS = (
+    "auth", "users", "professores", "alunos", "quadras", "produtos", "comandas", "rankings", "agendamentos", "ocupacao",
+    "historico", "jobs", "painel",
+)
+
+app = FastAPI(title="Sistema de Gestão de Arena Esportiva", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,19 +21,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-# Criar tabelas
-base.Base.metadata.create_all(bind=engine)
+app.add_middleware(MetricsMiddleware)
 
 # Incluir routers
-app.include_router(auth.router)
-app.include_router(users.router)
-app.include_router(professores.router)
-app.include_router(alunos.router)
-app.include_router(produtos.router)
-app.include_router(comandas.router)
-app.include_router(rankings.router)
-app.include_router(agendamentos.router)
+for name in settings.ROUTERS or ROUTERS:
+    app.include_router(import_module(f".routers.{name}", __package__).router)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 async def root():
@@ -3,6 +3,11 @@ from .user import User
 from .professor import Professor
 from .aluno import Aluno
 from .produto import Produto
+from .quadra import Quadra
 from .comanda import Comanda, ItemComanda
 from .ranking import Ranking, ParticipanteRanking
-from .agendamento import Agendamento
\ No newline at end of file
+from .ganho import GanhoMensal
+from .agendamento import Agendamento, SerieAgendamento, ExcecaoAgendamento
+from .venda import VendaProduto, VendaCategoriaDiaria
+from .job import Job
+from .indicador import OcorrenciaContabilizada, OcupacaoHoraria, ReceitaComandasDiaria
\ No newline at end of file
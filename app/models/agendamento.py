@@ -1,12 +1,18 @@
-from sqlalchemy import Column, DateTime, Integer, ForeignKey, String, Enum
+from sqlalchemy import Column, Date, DateTime, Time, Integer, Float, Boolean, ForeignKey, JSON, String, CheckConstraint, UniqueConstraint, DDL, event, func, literal_column
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
+from sqlalchemy.orm import relationship
 import enum
-from .base import BaseModel
+from .base import BaseModel, pg_enum
 
 class StatusAgendamento(str, enum.Enum):
     PENDENTE = "pendente"
     CONFIRMADO = "confirmado"
     CANCELADO = "cancelado"
 
+class FrequenciaSerie(str, enum.Enum):
+    DIARIA = "diaria"
+    SEMANAL = "semanal"
+
 class Agendamento(BaseModel):
     __tablename__ = "agendamentos"
 
@@ -14,6 +20,69 @@ class Agendamento(BaseModel):
     cliente_id = Column(Integer, ForeignKey("users.id"))
     data_hora_inicio = Column(DateTime)
     data_hora_fim = Column(DateTime)
-    status = Column(Enum(StatusAgendamento))
+    status = Column(pg_enum(StatusAgendamento, "status_agendamento"))
+    valor = Column(Float)
+    observacoes = Column(String, nullable=True)
+
+class SerieAgendamento(BaseModel):
+    __tablename__ = "series_agendamento"
+    __table_args__ = (
+        CheckConstraint("data_fim >= data_inicio", name="series_agendamento_datas_validas"),
+        CheckConstraint("hora_fim > hora_inicio", name="series_agendamento_horario_valido"),
+    )
+
+    quadra_id = Column(Integer, ForeignKey("quadras.id"), index=True)
+    cliente_id = Column(Integer, ForeignKey("users.id"))
+    # Subconjunto do RRULE: FREQ, INTERVAL, BYDAY (ex.: "TU,TH") e UNTIL (data_fim)
+    frequencia = Column(pg_enum(FrequenciaSerie, "frequencia_serie"))
+    intervalo = Column(Integer, default=1)
+    dias_semana = Column(String, nullable=True)
+    data_inicio = Column(Date)
+    data_fim = Column(Date)
+    hora_inicio = Column(Time)
+    hora_fim = Column(Time)
+    status = Column(pg_enum(StatusAgendamento, "status_agendamento"))
+    # Total das ocorrências ativas; o valor de cada uma fica em valores_semana (segunda = 0)
     valor = Column(Float)
-    observacoes = Column(String, nullable=True)
\ No newline at end of file
+    valores_semana = Column(JSON, nullable=True)
+    observacoes = Column(String, nullable=True)
+
+    excecoes = relationship("ExcecaoAgendamento", back_populates="serie")
+
+class ExcecaoAgendamento(BaseModel):
+    __tablename__ = "excecoes_agendamento"
+    __table_args__ = (UniqueConstraint("serie_id", "data", name="excecoes_agendamento_serie_data"),)
+
+    serie_id = Column(Integer, ForeignKey("series_agendamento.id", ondelete="CASCADE"))
+    # Data original da ocorrência; início/fim preenchidos quando ela foi remarcada
+    data = Column(Date)
+    cancelada = Column(Boolean, default=False)
+    data_hora_inicio = Column(DateTime, nullable=True)
+    data_hora_fim = Column(DateTime, nullable=True)
+    valor = Column(Float, nullable=True)
+
+    serie = relationship("SerieAgendamento", back_populates="excecoes")
+
+def periodo(inicio, fim):
+    # Intervalo semiaberto [inicio, fim): um agendamento que termina às 19h não conflita com outro que começa às 19h
+    return func.tsrange(inicio, fim, literal_column("'[)'"))
+
+# Índice GiST por quadra + período: impede sobreposição no banco e atende as consultas de disponibilidade
+Agendamento.__table__.append_constraint(
+    CheckConstraint(Agendamento.data_hora_fim > Agendamento.data_hora_inicio, name="agendamentos_periodo_valido")
+)
+# No banco a tabela é particionada por mês (migration 0004) e esta constraint é criada em cada partição
+Agendamento.__table__.append_constraint(
+    ExcludeConstraint(
+        (Agendamento.quadra_id, "="),
+        (periodo(Agendamento.data_hora_inicio, Agendamento.data_hora_fim), "&&"),
+        name="agendamentos_sem_sobreposicao",
+        using="gist",
+        where=Agendamento.status != StatusAgendamento.CANCELADO,
+    )
+)
+event.listen(
+    Agendamento.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
@@ -1,9 +1,13 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, DateTime
+from sqlalchemy import Column, Integer, DateTime, Enum
 from datetime import datetime
 
 Base = declarative_base()
 
+def pg_enum(enum_class, name: str) -> Enum:
+    # Grava os valores ('admin') no tipo nomeado do banco, como nas migrations, e não os nomes ('ADMIN')
+    return Enum(enum_class, name=name, values_callable=lambda members: [member.value for member in members])
+
 class BaseModel(Base):
     __abstract__ = True
     
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey, Enum, String
+from sqlalchemy import Column, Integer, Float, ForeignKey, String
 from sqlalchemy.orm import relationship
 import enum
-from .base import BaseModel
+from .base import BaseModel, pg_enum
 
 class StatusComanda(str, enum.Enum):
     ABERTA = "aberta"
@@ -12,7 +12,7 @@ class Comanda(BaseModel):
     __tablename__ = "comandas"
 
     cliente_id = Column(Integer, ForeignKey("users.id"))
-    status = Column(Enum(StatusComanda))
+    status = Column(pg_enum(StatusComanda, "status_comanda"))
     valor_total = Column(Float, default=0.0)
     forma_pagamento = Column(String, nullable=True)
     
@@ -21,10 +21,13 @@ class Comanda(BaseModel):
 class ItemComanda(BaseModel):
     __tablename__ = "itens_comanda"
 
+    # Sem FK no banco desde o particionamento de comandas (migration 0004); declarada para o relacionamento
     comanda_id = Column(Integer, ForeignKey("comandas.id"))
     produto_id = Column(Integer, ForeignKey("produtos.id"))
     quantidade = Column(Integer)
     valor_unitario = Column(Float)
+    # Categoria do produto na venda, preenchida pelo banco (migration 0002)
+    categoria = Column(String)
     
     comanda = relationship("Comanda", back_populates="itens")
     produto = relationship("Produto")
\ No newline at end of file
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Date, Float, Integer, ForeignKey, UniqueConstraint
+from .base import BaseModel
+
+class GanhoMensal(BaseModel):
+    __tablename__ = "ganhos_mensais"
+    __table_args__ = (UniqueConstraint("professor_id", "mes", name="ganhos_mensais_professor_mes"),)
+
+    # Fechamento mensal por professor; meses sem linha aqui são calculados sob demanda
+    professor_id = Column(Integer, ForeignKey("professores.id", ondelete="CASCADE"))
+    mes = Column(Date, index=True)
+    alunos_ativos = Column(Integer, default=0)
+    valor_bruto = Column(Float, default=0.0)
+    valor_ganho = Column(Float, default=0.0)
\ No newline at end of file
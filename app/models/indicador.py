@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Integer
+from .base import Base
+
+# Indicadores mantidos pelos triggers de agendamentos e comandas (migration 0006) e de séries (migration 0008);
+# a aplicação só lê
+
+class OcupacaoHoraria(Base):
+    __tablename__ = "ocupacao_horaria"
+
+    # Minutos ocupados e receita rateada de cada hora (horário local) de cada quadra
+    quadra_id = Column(Integer, ForeignKey("quadras.id", ondelete="CASCADE"), primary_key=True)
+    dia = Column(Date, primary_key=True)
+    hora = Column(Integer, primary_key=True)
+    minutos = Column(Float, nullable=False, default=0.0)
+    receita = Column(Float, nullable=False, default=0.0)
+    atualizado_em = Column(DateTime, nullable=False)
+
+class ReceitaComandasDiaria(Base):
+    __tablename__ = "receita_comandas_diaria"
+
+    dia = Column(Date, primary_key=True)
+    comandas = Column(Integer, nullable=False, default=0)
+    receita = Column(Float, nullable=False, default=0.0)
+    atualizado_em = Column(DateTime, nullable=False)
+
+class OcorrenciaContabilizada(Base):
+    __tablename__ = "ocorrencias_contabilizadas"
+
+    # Ocorrências de séries somadas em ocupacao_horaria, para descontá-las quando a série ou uma exceção muda
+    serie_id = Column(Integer, primary_key=True)
+    data = Column(Date, primary_key=True)
+    quadra_id = Column(Integer, nullable=False)
+    inicio = Column(DateTime, nullable=False)
+    fim = Column(DateTime, nullable=False)
+    valor = Column(Float, nullable=True)
\ No newline at end of file
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, String, Text
+import enum
+from .base import BaseModel, pg_enum
+
+class StatusJob(str, enum.Enum):
+    PENDENTE = "pendente"
+    EXECUTANDO = "executando"
+    CONCLUIDO = "concluido"
+    FALHOU = "falhou"
+
+class Job(BaseModel):
+    __tablename__ = "jobs"
+
+    # Fila consumida com SELECT ... FOR UPDATE SKIP LOCKED (app/services/jobs.py)
+    tipo = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(pg_enum(StatusJob, "status_job"), nullable=False, default=StatusJob.PENDENTE)
+    tentativas = Column(Integer, nullable=False, default=0)
+    max_tentativas = Column(Integer, nullable=False)
+    executar_em = Column(DateTime, nullable=False)
+    iniciado_em = Column(DateTime, nullable=True)
+    concluido_em = Column(DateTime, nullable=True)
+    resultado = Column(JSON, nullable=True)
+    erro = Column(Text, nullable=True)
+    criado_por = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
\ No newline at end of file
@@ -1,11 +1,16 @@
-from sqlalchemy import Column, String, Float, Integer
+from sqlalchemy import Column, String, Float, Integer, Index, text
 from .base import BaseModel
 
 class Produto(BaseModel):
     __tablename__ = "produtos"
+    __table_args__ = (
+        # Só os produtos abaixo do mínimo entram no índice: a lista de reposição não varre o catálogo
+        Index("idx_produtos_estoque_baixo", "id", postgresql_where=text("estoque <= estoque_minimo")),
+    )
 
     nome = Column(String)
     descricao = Column(String)
     preco = Column(Float)
     estoque = Column(Integer)
-    categoria = Column(String)
\ No newline at end of file
+    estoque_minimo = Column(Integer, default=0, server_default="0")
+    categoria = Column(String, index=True)
\ No newline at end of file
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Enum
+from sqlalchemy import Column, String, Integer, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 import enum
-from .base import BaseModel
+from .base import BaseModel, pg_enum
 
 class Categoria(str, enum.Enum):
     INICIANTE = "iniciante"
@@ -17,13 +17,14 @@ class Ranking(BaseModel):
     __tablename__ = "rankings"
 
     nome = Column(String)
-    categoria = Column(Enum(Categoria))
-    tipo = Column(Enum(TipoRanking))
+    categoria = Column(pg_enum(Categoria, "categoria_ranking"))
+    tipo = Column(pg_enum(TipoRanking, "tipo_ranking"))
     
     participantes = relationship("ParticipanteRanking", back_populates="ranking")
 
 class ParticipanteRanking(BaseModel):
     __tablename__ = "participantes_ranking"
+    __table_args__ = (UniqueConstraint("ranking_id", "jogador_id", name="participantes_ranking_ranking_jogador"),)
 
     ranking_id = Column(Integer, ForeignKey("rankings.id"))
     jogador_id = Column(Integer, ForeignKey("users.id"))
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Boolean, Enum
+from sqlalchemy import Column, String, Boolean
 from sqlalchemy.orm import relationship
-from .base import BaseModel
+from .base import BaseModel, pg_enum
 import enum
 
 class UserType(str, enum.Enum):
@@ -15,7 +15,7 @@ class User(BaseModel):
     username = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     full_name = Column(String)
-    user_type = Column(Enum(UserType))
+    user_type = Column(pg_enum(UserType, "user_type"))
     is_active = Column(Boolean, default=True)
     
     professor_profile = relationship("Professor", back_populates="user", uselist=False)
\ No newline at end of file
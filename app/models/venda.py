@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Integer, String
+from .base import Base
+
+# Contadores mantidos pelos triggers de itens_comanda (migration 0002); a aplicação só lê
+
+class VendaProduto(Base):
+    __tablename__ = "vendas_produto"
+
+    produto_id = Column(Integer, ForeignKey("produtos.id", ondelete="CASCADE"), primary_key=True)
+    quantidade = Column(Integer, nullable=False, default=0)
+    receita = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime)
+
+class VendaCategoriaDiaria(Base):
+    __tablename__ = "vendas_categoria_diaria"
+
+    # Dia primeiro na chave: o painel consulta todas as categorias de um dia
+    dia = Column(Date, primary_key=True)
+    categoria = Column(String, primary_key=True)
+    quantidade = Column(Integer, nullable=False, default=0)
+    receita = Column(Float, nullable=False, default=0.0)
\ No newline at end of file
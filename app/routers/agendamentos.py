@@ -0,0 +1,289 @@
+from datetime import date, datetime, time, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
+from ..config import settings
+from ..core.deps import get_current_active_user
+from ..core.events import mensagem_agendamento, mensagem_serie, publicar
+from ..database import get_db
+from ..models.user import User, UserType
+from ..models.quadra import Quadra
+from ..models.agendamento import Agendamento, ExcecaoAgendamento, SerieAgendamento, StatusAgendamento
+from ..schemas.agendamento import (
+    AgendamentoCreate, AgendamentoInDB, Conflito, DisponibilidadeQuadra, Horario, Intervalo,
+    ExcecaoAgendamentoInDB, ExcecaoAgendamentoUpdate, Ocorrencia, SerieAgendamentoCreate, SerieAgendamentoInDB,
+)
+from ..services.disponibilidade import AvailabilityEngine, buscar_conflitos
+from ..services.precos import TabelaPrecos, preco, pricing_engine
+from ..services.recorrencia import e_ocorrencia, excecoes_por_data, ocorrencias, valor_ocorrencia
+
+router = APIRouter(prefix="/agendamentos", tags=["agendamentos"])
+
+def _validar_periodo(inicio: datetime, fim: datetime):
+    if fim <= inicio:
+        raise HTTPException(status_code=400, detail="End must be after start")
+
+def _cliente_id(cliente_id: Optional[int], current_user: User) -> int:
+    # Apenas admin pode agendar em nome de outro cliente
+    if cliente_id and cliente_id != current_user.id:
+        if current_user.user_type != UserType.ADMIN:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+        return cliente_id
+    return current_user.id
+
+async def _travar_quadra(db: AsyncSession, quadra_id: int) -> Quadra:
+    # Serializa agendamentos da mesma quadra: ocorrências de séries não passam pela constraint de exclusão
+    quadra = await db.scalar(select(Quadra).where(Quadra.id == quadra_id).with_for_update())
+    if not quadra:
+        raise HTTPException(status_code=404, detail="Quadra not found")
+    return quadra
+
+def _conflitos(conflitos) -> List[Conflito]:
+    return [
+        Conflito(agendamento_id=agendamento_id, serie_id=serie_id, inicio=inicio, fim=fim)
+        for (agendamento_id, serie_id), inicio, fim in conflitos
+    ]
+
+def _conflito_exception(conflitos) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail={
+            "message": "Quadra already booked for this period",
+            "conflitos": [conflito.model_dump(mode="json") for conflito in _conflitos(conflitos)],
+        },
+    )
+
+@router.get("/disponibilidade", response_model=List[DisponibilidadeQuadra])
+async def read_disponibilidade(
+    inicio: datetime,
+    fim: datetime,
+    duracao_minutos: Optional[int] = Query(None, gt=0),
+    passo_minutos: Optional[int] = Query(None, gt=0),
+    quadra_id: Optional[List[int]] = Query(None),
+    com_precos: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    _validar_periodo(inicio, fim)
+    engine = await AvailabilityEngine.carregar(db, inicio, fim, quadra_id)
+    livres = set(engine.quadras_livres())
+    intervalos = engine.intervalos_livres()
+    horarios = {}
+    if duracao_minutos:
+        passo = timedelta(minutes=passo_minutos) if passo_minutos else None
+        horarios = engine.horarios(timedelta(minutes=duracao_minutos), passo)
+    valores = {}
+    slots = [(quadra, i, f) for quadra, itens in horarios.items() for i, f in itens] if com_precos else []
+    if slots:
+        # Todos os horários de todas as quadras cotados em uma chamada
+        tabela = await pricing_engine.tabela(db, horarios.keys())
+        quadras, inicios, fins = zip(*slots)
+        valores = dict(zip(slots, tabela.cotar(quadras, inicios, fins).tolist()))
+    return [
+        DisponibilidadeQuadra(
+            quadra_id=quadra,
+            livre=quadra in livres,
+            intervalos_livres=[Intervalo(inicio=i, fim=f) for i, f in intervalos[quadra]],
+            horarios=[Horario(inicio=i, fim=f, valor=valores.get((quadra, i, f))) for i, f in horarios.get(quadra, [])],
+        )
+        for quadra in intervalos
+    ]
+
+@router.get("/conflitos", response_model=List[Conflito])
+async def read_conflitos(
+    quadra_id: int,
+    inicio: datetime,
+    fim: datetime,
+    db: AsyncSession = Depends(get_db)
+):
+    _validar_periodo(inicio, fim)
+    return _conflitos(await buscar_conflitos(db, quadra_id, [(inicio, fim)]))
+
+@router.post("/", response_model=AgendamentoInDB)
+async def create_agendamento(
+    agendamento: AgendamentoCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    _validar_periodo(agendamento.data_hora_inicio, agendamento.data_hora_fim)
+
+    cliente_id = _cliente_id(agendamento.cliente_id, current_user)
+    quadra = await _travar_quadra(db, agendamento.quadra_id)
+
+    if await buscar_conflitos(db, quadra.id, [(agendamento.data_hora_inicio, agendamento.data_hora_fim)]):
+        raise HTTPException(status_code=409, detail="Quadra already booked for this period")
+
+    db_agendamento = Agendamento(
+        **agendamento.model_dump(exclude={"cliente_id"}),
+        cliente_id=cliente_id,
+        status=StatusAgendamento.PENDENTE,
+        valor=preco(quadra, agendamento.data_hora_inicio, agendamento.data_hora_fim),
+    )
+    db.add(db_agendamento)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Outro agendamento concorrente ocupou o período (constraint de exclusão)
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Quadra already booked for this period")
+    await db.refresh(db_agendamento)
+    publicar(mensagem_agendamento("insert", db_agendamento))
+    return db_agendamento
+
+
+async def _get_serie(db: AsyncSession, serie_id: int, current_user: User) -> SerieAgendamento:
+    serie = await db.scalar(
+        select(SerieAgendamento)
+        .options(selectinload(SerieAgendamento.excecoes))
+        .where(SerieAgendamento.id == serie_id)
+    )
+    if not serie:
+        raise HTTPException(status_code=404, detail="Serie not found")
+    if serie.cliente_id != current_user.id and current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return serie
+
+def _periodo_serie(serie) -> tuple:
+    return datetime.combine(serie.data_inicio, time.min), datetime.combine(serie.data_fim + timedelta(days=1), time.min)
+
+@router.post("/series", response_model=SerieAgendamentoInDB)
+async def create_serie(
+    serie: SerieAgendamentoCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if serie.data_fim < serie.data_inicio:
+        raise HTTPException(status_code=400, detail="End date must not be before start date")
+    if serie.hora_fim <= serie.hora_inicio:
+        raise HTTPException(status_code=400, detail="End must be after start")
+
+    cliente_id = _cliente_id(serie.cliente_id, current_user)
+    quadra = await _travar_quadra(db, serie.quadra_id)
+
+    db_serie = SerieAgendamento(
+        **serie.model_dump(exclude={"cliente_id", "dias_semana"}),
+        dias_semana=",".join(dia.value for dia in serie.dias_semana) or None,
+        cliente_id=cliente_id,
+        status=StatusAgendamento.PENDENTE,
+    )
+
+    # Todas as ocorrências são conferidas de uma vez; nenhuma linha por ocorrência é gravada
+    previstas = ocorrencias(db_serie, *_periodo_serie(db_serie))
+    if not previstas:
+        raise HTTPException(status_code=400, detail="Serie has no occurrences")
+    if len(previstas) > settings.SERIE_MAX_OCORRENCIAS:
+        raise HTTPException(status_code=400, detail="Too many occurrences")
+    conflitos = await buscar_conflitos(db, quadra.id, [(ocorrencia.inicio, ocorrencia.fim) for ocorrencia in previstas])
+    if conflitos:
+        raise _conflito_exception(conflitos)
+
+    # Cada ocorrência na sua faixa de preço, cotadas de uma vez. O horário é o mesmo em todas,
+    # então o valor só muda com o dia da semana; `valor` é o total da série
+    valores = TabelaPrecos([quadra]).cotar(
+        [quadra.id] * len(previstas),
+        [ocorrencia.inicio for ocorrencia in previstas],
+        [ocorrencia.fim for ocorrencia in previstas],
+    )
+    valores_semana = [None] * 7
+    for ocorrencia, valor in zip(previstas, valores):
+        valores_semana[ocorrencia.data.weekday()] = float(valor)
+    db_serie.valores_semana = valores_semana
+    db_serie.valor = round(float(valores.sum()), 2)
+    db.add(db_serie)
+    await db.commit()
+    await db.refresh(db_serie)
+    publicar(mensagem_serie("insert", db_serie.id, db_serie.quadra_id))
+    return db_serie
+
+@router.get("/series/{serie_id}", response_model=SerieAgendamentoInDB)
+async def read_serie(
+    serie_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return await _get_serie(db, serie_id, current_user)
+
+@router.get("/series/{serie_id}/ocorrencias", response_model=List[Ocorrencia])
+async def read_ocorrencias(
+    serie_id: int,
+    inicio: Optional[datetime] = None,
+    fim: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    serie = await _get_serie(db, serie_id, current_user)
+    serie_inicio, serie_fim = _periodo_serie(serie)
+    inicio = inicio or serie_inicio
+    fim = fim or serie_fim
+    _validar_periodo(inicio, fim)
+    return [
+        Ocorrencia(**ocorrencia._asdict())
+        for ocorrencia in ocorrencias(serie, inicio, fim, excecoes_por_data(serie), incluir_canceladas=True)
+    ]
+
+@router.put("/series/{serie_id}/ocorrencias/{data}", response_model=ExcecaoAgendamentoInDB)
+async def update_ocorrencia(
+    serie_id: int,
+    data: date,
+    excecao: ExcecaoAgendamentoUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    serie = await _get_serie(db, serie_id, current_user)
+    if not e_ocorrencia(serie, data):
+        raise HTTPException(status_code=404, detail="Occurrence not found")
+
+    remarcada = excecao.data_hora_inicio is not None or excecao.data_hora_fim is not None
+    if remarcada and not excecao.cancelada:
+        if excecao.data_hora_inicio is None or excecao.data_hora_fim is None:
+            raise HTTPException(status_code=400, detail="Both start and end are required to reschedule")
+        _validar_periodo(excecao.data_hora_inicio, excecao.data_hora_fim)
+        serie_inicio, serie_fim = _periodo_serie(serie)
+        if excecao.data_hora_inicio < serie_inicio or excecao.data_hora_fim > serie_fim:
+            raise HTTPException(status_code=400, detail="Occurrence must stay within the serie period")
+        quadra = await _travar_quadra(db, serie.quadra_id)
+        conflitos = await buscar_conflitos(
+            db, serie.quadra_id, [(excecao.data_hora_inicio, excecao.data_hora_fim)], ignorar=(serie.id, data)
+        )
+        if conflitos:
+            raise _conflito_exception(conflitos)
+
+    db_excecao = excecoes_por_data(serie).get(data)
+    valor_anterior = valor_ocorrencia(serie, data, db_excecao)
+    if db_excecao is None:
+        db_excecao = ExcecaoAgendamento(serie_id=serie.id, data=data)
+        db.add(db_excecao)
+    db_excecao.cancelada = excecao.cancelada
+    db_excecao.data_hora_inicio = excecao.data_hora_inicio if remarcada else None
+    db_excecao.data_hora_fim = excecao.data_hora_fim if remarcada else None
+    # A remarcada é cobrada pelo novo horário, que pode cair em outra faixa de preço
+    db_excecao.valor = (
+        preco(quadra, excecao.data_hora_inicio, excecao.data_hora_fim)
+        if remarcada and not excecao.cancelada else None
+    )
+    diferenca = valor_ocorrencia(serie, data, db_excecao) - valor_anterior
+    if diferenca:
+        # Incremento no banco: outras ocorrências da mesma série podem estar sendo alteradas ao mesmo tempo
+        await db.execute(
+            update(SerieAgendamento)
+            .where(SerieAgendamento.id == serie.id)
+            .values(valor=SerieAgendamento.valor + round(diferenca, 2))
+        )
+    await db.commit()
+    await db.refresh(db_excecao)
+    publicar(mensagem_serie("update", serie.id, serie.quadra_id))
+    return db_excecao
+
+@router.delete("/series/{serie_id}")
+async def delete_serie(
+    serie_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    serie = await _get_serie(db, serie_id, current_user)
+    serie.status = StatusAgendamento.CANCELADO
+    await db.commit()
+    publicar(mensagem_serie("update", serie.id, serie.quadra_id))
+    return {"message": "Serie cancelled successfully"}
\ No newline at end of file
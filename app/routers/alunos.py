@@ -1,7 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+from ..core.bulk import ImportResult, RowError, export_response, import_records
 from ..core.deps import get_current_active_user
+from ..core.policy import AuthContext, get_auth_context
+from ..core.pagination import CursorParams, Page, paginate
+from ..core.query_profiles import QueryProfile
+from ..core.responses import FastJSONResponse, page_content
 from ..database import get_db
 from ..models.user import User, UserType
 from ..models.aluno import Aluno
@@ -10,90 +16,117 @@ from ..schemas.aluno import AlunoCreate, AlunoUpdate, AlunoInDB
 
 router = APIRouter(prefix="/alunos", tags=["alunos"])
 
+ALUNO_LISTA = QueryProfile.for_schema(Aluno, AlunoInDB)
+
 @router.post("/", response_model=AlunoInDB)
-def create_aluno(
+async def create_aluno(
     aluno: AlunoCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    auth: AuthContext = Depends(get_auth_context)
 ):
-    if current_user.user_type not in [UserType.ADMIN, UserType.PROFESSOR]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    auth.exigir(UserType.ADMIN, UserType.PROFESSOR)
     
     # Se for professor, só pode adicionar alunos para si mesmo
-    if current_user.user_type == UserType.PROFESSOR:
-        professor = db.query(Professor).filter(Professor.user_id == current_user.id).first()
-        if not professor or professor.id != aluno.professor_id:
-            raise HTTPException(status_code=403, detail="Professor can only add students to themselves")
+    if not auth.pode_atribuir(aluno.professor_id):
+        raise HTTPException(status_code=403, detail="Professor can only add students to themselves")
     
     db_aluno = Aluno(**aluno.model_dump())
     db.add(db_aluno)
-    db.commit()
-    db.refresh(db_aluno)
+    await db.commit()
+    await db.refresh(db_aluno)
     return db_aluno
 
-@router.get("/", response_model=List[AlunoInDB])
-def read_alunos(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+@router.get("/", response_model=Page[AlunoInDB], response_class=FastJSONResponse)
+async def read_alunos(
+    page: CursorParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+    auth: AuthContext = Depends(get_auth_context)
+):
+    auth.exigir(UserType.ADMIN, UserType.PROFESSOR)
+    if auth.is_admin:
+        return FastJSONResponse(page_content(await paginate(db, ALUNO_LISTA.select(), Aluno, page)))
+    auth.exigir_professor()
+    # A estimativa do pg_class vale para a tabela inteira, não para o filtro por professor
+    stmt = ALUNO_LISTA.select().where(auth.alunos())
+    return FastJSONResponse(page_content(await paginate(db, stmt, Aluno, page, estimate=False)))
+
+@router.post("/import", response_model=ImportResult)
+async def import_alunos(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    if current_user.user_type == UserType.PROFESSOR:
-        professor = db.query(Professor).filter(Professor.user_id == current_user.id).first()
-        if not professor:
-            raise HTTPException(status_code=404, detail="Professor not found")
-        return db.query(Aluno).filter(Aluno.professor_id == professor.id).offset(skip).limit(limit).all()
-    elif current_user.user_type == UserType.ADMIN:
-        return db.query(Aluno).offset(skip).limit(limit).all()
-    else:
+    if current_user.user_type != UserType.ADMIN:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-@router.put("/{aluno_id}", response_model=AlunoInDB)
-def update_aluno(
-    aluno_id: int,
-    aluno_update: AlunoUpdate,
-    db: Session = Depends(get_db),
+    async def write_chunk(rows):
+        # Valida os professores do lote em uma consulta em vez de deixar a FK derrubar o lote inteiro
+        professor_ids = {aluno.professor_id for _, aluno in rows}
+        existing = set((await db.scalars(select(Professor.id).where(Professor.id.in_(professor_ids)))).all())
+        valid = [aluno.model_dump() for _, aluno in rows if aluno.professor_id in existing]
+        if valid:
+            await db.execute(insert(Aluno).values(valid))
+            await db.commit()
+        return [
+            RowError(line=line, errors=["professor_id: Professor not found"])
+            for line, aluno in rows
+            if aluno.professor_id not in existing
+        ]
+
+    return await import_records(request, AlunoCreate, write_chunk)
+
+@router.get("/export")
+async def export_alunos(
+    format: str = Query("ndjson", pattern="^(ndjson|json|csv)$"),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    if current_user.user_type not in [UserType.ADMIN, UserType.PROFESSOR]:
+    if current_user.user_type != UserType.ADMIN:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    db_aluno = db.query(Aluno).filter(Aluno.id == aluno_id).first()
-    if not db_aluno:
+    columns = [getattr(Aluno, field) for field in AlunoInDB.model_fields]
+    return export_response(db, select(*columns).order_by(Aluno.id), format, "alunos")
+
+async def _negar(db: AsyncSession, aluno_id: int, detail: str):
+    # Só no caminho de erro: distingue aluno inexistente de aluno de outro professor
+    if await db.scalar(select(Aluno.id).where(Aluno.id == aluno_id)) is None:
         raise HTTPException(status_code=404, detail="Aluno not found")
+    raise HTTPException(status_code=403, detail=detail)
+
+@router.put("/{aluno_id}", response_model=AlunoInDB)
+async def update_aluno(
+    aluno_id: int,
+    aluno_update: AlunoUpdate,
+    db: AsyncSession = Depends(get_db),
+    auth: AuthContext = Depends(get_auth_context)
+):
+    auth.exigir(UserType.ADMIN, UserType.PROFESSOR)
     
-    # Se for professor, só pode atualizar seus próprios alunos
-    if current_user.user_type == UserType.PROFESSOR:
-        professor = db.query(Professor).filter(Professor.user_id == current_user.id).first()
-        if not professor or professor.id != db_aluno.professor_id:
-            raise HTTPException(status_code=403, detail="Professor can only update their own students")
-    
-    for field, value in aluno_update.model_dump(exclude_unset=True).items():
-        setattr(db_aluno, field, value)
+    # Posse no WHERE: professor só atualiza seus próprios alunos, na mesma consulta que grava
+    valores = aluno_update.model_dump(exclude_unset=True)
+    condicao = (Aluno.id == aluno_id, auth.alunos())
+    if valores:
+        db_aluno = await db.scalar(update(Aluno).where(*condicao).values(**valores).returning(Aluno))
+    else:
+        db_aluno = await db.scalar(select(Aluno).where(*condicao))
+    if not db_aluno:
+        await _negar(db, aluno_id, "Professor can only update their own students")
     
-    db.commit()
-    db.refresh(db_aluno)
+    await db.commit()
     return db_aluno
 
 @router.delete("/{aluno_id}")
-def delete_aluno(
+async def delete_aluno(
     aluno_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    auth: AuthContext = Depends(get_auth_context)
 ):
-    if current_user.user_type not in [UserType.ADMIN, UserType.PROFESSOR]:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
-    db_aluno = db.query(Aluno).filter(Aluno.id == aluno_id).first()
-    if not db_aluno:
-        raise HTTPException(status_code=404, detail="Aluno not found")
+    auth.exigir(UserType.ADMIN, UserType.PROFESSOR)
     
     # Se for professor, só pode deletar seus próprios alunos
-    if current_user.user_type == UserType.PROFESSOR:
-        professor = db.query(Professor).filter(Professor.user_id == current_user.id).first()
-        if not professor or professor.id != db_aluno.professor_id:
-            raise HTTPException(status_code=403, detail="Professor can only delete their own students")
+    deleted = await db.scalar(delete(Aluno).where(Aluno.id == aluno_id, auth.alunos()).returning(Aluno.id))
+    if deleted is None:
+        await _negar(db, aluno_id, "Professor can only delete their own students")
     
-    db.delete(db_aluno)
-    db.commit()
+    await db.commit()
     return {"message": "Aluno deleted successfully"}
\ No newline at end of file
@@ -1,30 +1,57 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from ..core.security import verify_password, create_access_token
-from ..core.deps import get_current_user
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from ..core.security import password_hasher, create_access_token
+from ..core.deps import get_current_user, get_token_data
+from ..core.ratelimit import limit_login
+from ..core.tokens import token_service
 from ..database import get_db
-from ..models.user import User
-from ..schemas.user import Token
+from ..models.user import User, UserType
+from ..schemas.user import Token, TokenData
 from ..config import settings
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-@router.post("/token", response_model=Token)
+@router.post("/token", response_model=Token, dependencies=[Depends(limit_login)])
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await db.scalar(
+        select(User)
+        .options(selectinload(User.professor_profile))
+        .where(User.username == form_data.username)
+    )
+    verified, new_hash = (False, None)
+    if user:
+        verified, new_hash = await password_hasher.verify(form_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # Custo do bcrypt mudou desde o último login: regrava o hash com o custo atual
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    # Claims pré-calculados evitam consultas de papel/professor nos requests seguintes
+    claims = {"sub": user.username, "user_type": user.user_type.value}
+    if user.user_type == UserType.PROFESSOR and user.professor_profile:
+        claims["professor_id"] = user.professor_profile.id
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data=claims, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.post("/logout")
+async def logout(token_data: TokenData = Depends(get_token_data)):
+    # Tokens sem `jti` (anteriores ao keyring) só deixam de valer quando expiram
+    if token_data.jti is None or token_data.exp is None:
+        raise HTTPException(status_code=400, detail="Token cannot be revoked")
+    token_service.revoke(token_data.jti, token_data.exp)
+    return {"message": "Logged out successfully"}
\ No newline at end of file
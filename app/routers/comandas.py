@@ -0,0 +1,160 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ..core.cache import response_cache
+from ..core.deps import get_current_active_user
+from ..core.pagination import CursorParams, Page, paginate
+from ..core.query_profiles import QueryProfile
+from ..core.responses import FastJSONResponse, page_content
+from ..database import get_db
+from ..models.user import User, UserType
+from ..models.comanda import Comanda, StatusComanda
+from ..schemas.comanda import ComandaCreate, ComandaInDB, ComandaResumo, ComandasFechadas, ItemComandaCreate, Pagamento
+from ..schemas.comanda import StatusComanda as StatusComandaSchema
+from ..services import comandas as comanda_service
+
+router = APIRouter(prefix="/comandas", tags=["comandas"])
+
+COMANDA_RESUMO = QueryProfile.for_schema(Comanda, ComandaResumo)
+COMANDA_COM_ITENS = QueryProfile(Comanda, selectin=[Comanda.itens])
+
+def _require_admin(current_user: User):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+async def _get_comanda(db: AsyncSession, comanda_id: int) -> Comanda:
+    db_comanda = await db.scalar(
+        COMANDA_COM_ITENS.select()
+        .where(Comanda.id == comanda_id)
+        .execution_options(populate_existing=True)
+    )
+    if not db_comanda:
+        raise HTTPException(status_code=404, detail="Comanda not found")
+    return db_comanda
+
+async def _listar(db: AsyncSession, profile: QueryProfile, status, page: CursorParams, current_user: User) -> dict:
+    stmt = profile.select()
+    if status:
+        stmt = stmt.where(Comanda.status == status)
+    # Cliente só enxerga as próprias comandas
+    if current_user.user_type != UserType.ADMIN:
+        stmt = stmt.where(Comanda.cliente_id == current_user.id)
+    return await paginate(db, stmt, Comanda, page, estimate=current_user.user_type == UserType.ADMIN and not status)
+
+@router.post("/", response_model=ComandaInDB)
+async def create_comanda(
+    comanda: ComandaCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    _require_admin(current_user)
+    if not await db.scalar(select(User.id).where(User.id == comanda.cliente_id)):
+        raise HTTPException(status_code=404, detail="Cliente not found")
+
+    db_comanda = Comanda(cliente_id=comanda.cliente_id, status=StatusComanda.ABERTA, valor_total=0.0)
+    db.add(db_comanda)
+    await db.commit()
+    return await _get_comanda(db, db_comanda.id)
+
+@router.get("/", response_model=Page[ComandaResumo], response_class=FastJSONResponse)
+async def read_comandas(
+    status: Optional[StatusComandaSchema] = None,
+    page: CursorParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return FastJSONResponse(page_content(await _listar(db, COMANDA_RESUMO, status, page, current_user)))
+
+@router.get("/detalhadas", response_model=Page[ComandaInDB])
+async def read_comandas_detalhadas(
+    status: Optional[StatusComandaSchema] = None,
+    page: CursorParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    # Página + itens de todas as comandas dela: duas consultas, qualquer que seja o limit
+    return await _listar(db, COMANDA_COM_ITENS, status, page, current_user)
+
+@router.post("/fechar-todas", response_model=ComandasFechadas)
+async def close_all_comandas(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    _require_admin(current_user)
+    return ComandasFechadas(comandas=await comanda_service.fechar_todas(db))
+
+@router.get("/{comanda_id}", response_model=ComandaInDB)
+async def read_comanda(
+    comanda_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    db_comanda = await _get_comanda(db, comanda_id)
+    if current_user.user_type != UserType.ADMIN and db_comanda.cliente_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return db_comanda
+
+@router.post("/{comanda_id}/itens", response_model=ComandaInDB)
+async def add_itens(
+    comanda_id: int,
+    itens: List[ItemComandaCreate],
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    _require_admin(current_user)
+    if not itens:
+        raise HTTPException(status_code=400, detail="No items to add")
+    
+    try:
+        total = await comanda_service.adicionar_itens(db, comanda_id, [(item.produto_id, item.quantidade) for item in itens])
+    except comanda_service.EstoqueInsuficiente:
+        raise HTTPException(status_code=409, detail="Insufficient stock or unknown product")
+    if total is None:
+        raise HTTPException(status_code=409, detail="Comanda not found or not open")
+    # O estoque exibido no catálogo mudou
+    await response_cache.invalidate("produtos", *{item.produto_id for item in itens})
+    return await _get_comanda(db, comanda_id)
+
+@router.delete("/{comanda_id}/itens/{item_id}", response_model=ComandaInDB)
+async def remove_item(
+    comanda_id: int,
+    item_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    _require_admin(current_user)
+    
+    removido = await comanda_service.remover_item(db, comanda_id, item_id)
+    if removido is None:
+        raise HTTPException(status_code=409, detail="Item not found or comanda not open")
+    _, produto_id = removido
+    await response_cache.invalidate("produtos", produto_id)
+    return await _get_comanda(db, comanda_id)
+
+@router.post("/{comanda_id}/fechar", response_model=ComandaResumo)
+async def close_comanda(
+    comanda_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    _require_admin(current_user)
+    
+    db_comanda = await comanda_service.fechar(db, comanda_id)
+    if not db_comanda:
+        raise HTTPException(status_code=409, detail="Comanda not found or not open")
+    return db_comanda
+
+@router.post("/{comanda_id}/pagar", response_model=ComandaResumo)
+async def pay_comanda(
+    comanda_id: int,
+    pagamento: Pagamento,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    _require_admin(current_user)
+    
+    db_comanda = await comanda_service.pagar(db, comanda_id, pagamento.forma_pagamento)
+    if not db_comanda:
+        raise HTTPException(status_code=409, detail="Comanda not found or already paid")
+    return db_comanda
\ No newline at end of file
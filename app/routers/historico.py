@@ -0,0 +1,57 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from ..core.deps import get_current_active_user
+from ..core.responses import dumps
+from ..core.startup import historico_job
+from ..models.user import User, UserType
+from ..schemas.historico import ArquivoHistorico, ManutencaoHistorico
+from ..services import historico
+
+router = APIRouter(prefix="/historico", tags=["historico"])
+
+@router.get("/", response_model=List[ArquivoHistorico])
+async def read_arquivos(
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return [ArquivoHistorico(tabela=tabela, mes=mes, bytes=tamanho) for tabela, mes, tamanho in historico.arquivos()]
+
+@router.get("/{tabela}/{mes}")
+async def read_arquivo(
+    tabela: str,
+    mes: str,
+    cliente_id: Optional[int] = None,
+    quadra_id: Optional[int] = None,
+    comanda_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    try:
+        mes_arquivo = datetime.strptime(mes, "%Y-%m").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Month must be in YYYY-MM format")
+    if tabela not in historico.ARQUIVADAS or not historico.caminho(tabela, mes_arquivo).is_file():
+        raise HTTPException(status_code=404, detail="Archive not found")
+    
+    filtros = {"cliente_id": cliente_id, "quadra_id": quadra_id, "comanda_id": comanda_id}
+    filtros = {nome: valor for nome, valor in filtros.items() if valor is not None}
+    if any(nome not in historico.ARQUIVADAS[tabela].columns for nome in filtros):
+        raise HTTPException(status_code=400, detail="Filter not available for this table")
+    # Gerador síncrono: o StreamingResponse o consome em uma thread, sem bloquear o loop na descompressão
+    linhas = (dumps(registro) + b"\n" for registro in historico.ler(tabela, mes_arquivo, filtros))
+    return StreamingResponse(linhas, media_type="application/x-ndjson")
+
+@router.post("/manutencao", response_model=ManutencaoHistorico)
+async def run_manutencao(
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return await historico_job.executar()
\ No newline at end of file
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from ..core.deps import get_current_active_user
+from ..core.pagination import CursorParams, Page, paginate
+from ..database import get_db
+from ..models.job import Job, StatusJob
+from ..models.user import User, UserType
+from ..schemas.job import JobInDB
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.get("/", response_model=Page[JobInDB])
+async def read_jobs(
+    status: Optional[StatusJob] = None,
+    tipo: Optional[str] = None,
+    page: CursorParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    stmt = select(Job)
+    # Admin vê a fila inteira; os demais, só os jobs que enfileiraram
+    if current_user.user_type != UserType.ADMIN:
+        stmt = stmt.where(Job.criado_por == current_user.id)
+    if status is not None:
+        stmt = stmt.where(Job.status == status)
+    if tipo is not None:
+        stmt = stmt.where(Job.tipo == tipo)
+    return await paginate(db, stmt, Job, page, estimate=False)
+
+@router.get("/{job_id}", response_model=JobInDB)
+async def read_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    job = await db.get(Job, job_id)
+    if job is None or (current_user.user_type != UserType.ADMIN and job.criado_por != current_user.id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
\ No newline at end of file
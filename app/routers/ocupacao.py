@@ -0,0 +1,104 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Query, Request, WebSocket
+from fastapi.responses import StreamingResponse
+from typing import Dict, List, Optional, Tuple
+from ..config import settings
+from ..core.events import RESYNC, Assinante, event_bus
+from ..core.responses import dumps
+from ..database import SessionLocal
+from ..schemas.ocupacao import OcupacaoQuadra
+from ..services.disponibilidade import AvailabilityEngine
+
+router = APIRouter(prefix="/ocupacao", tags=["ocupacao"])
+
+JANELA = timedelta(hours=24)
+SNAPSHOT_TTL = 1.0
+
+_snapshots: Dict[Optional[Tuple[int, ...]], Tuple[float, bytes]] = {}
+_snapshot_lock = asyncio.Lock()
+
+async def _ocupacao(quadra_ids: Optional[List[int]]) -> List[OcupacaoQuadra]:
+    # Horários dos agendamentos são locais (naive), como os enviados pelos clientes
+    agora = datetime.now().replace(microsecond=0)
+    # Sessão própria e curta: as conexões de stream não seguram uma conexão do pool
+    async with SessionLocal() as db:
+        engine = await AvailabilityEngine.carregar(db, agora, agora + JANELA, quadra_ids)
+    ocupacao = []
+    for quadra_id, livres in engine.intervalos_livres().items():
+        if livres and livres[0][0] == agora:
+            ocupacao.append(OcupacaoQuadra(quadra_id=quadra_id, ocupada=False, ate=livres[0][1]))
+        else:
+            ocupacao.append(OcupacaoQuadra(quadra_id=quadra_id, ocupada=True, ate=livres[0][0] if livres else agora + JANELA))
+    return ocupacao
+
+async def _snapshot(quadra_ids: Optional[List[int]]) -> bytes:
+    """Mensagem `snapshot` compartilhada por um segundo: uma rajada de conexões novas
+    (ou de resyncs depois de uma reconexão do listener) custa uma consulta."""
+    chave = tuple(sorted(quadra_ids)) if quadra_ids else None
+    async with _snapshot_lock:
+        entrada = _snapshots.get(chave)
+        if entrada is not None and entrada[0] > time.monotonic():
+            return entrada[1]
+        quadras = [item.model_dump(mode="json") for item in await _ocupacao(quadra_ids)]
+        payload = dumps({"t": "snapshot", "quadras": quadras})
+        if len(_snapshots) > 256:
+            _snapshots.clear()
+        _snapshots[chave] = (time.monotonic() + SNAPSHOT_TTL, payload)
+        return payload
+
+async def _mensagens(assinante: Assinante, quadra_ids: Optional[List[int]]):
+    # Estado inicial, depois só as mudanças; None a cada intervalo sem mensagens (heartbeat)
+    yield await _snapshot(quadra_ids)
+    while True:
+        payload = await assinante.proxima(settings.EVENTS_HEARTBEAT_SECONDS)
+        if payload is RESYNC:
+            # Mensagens descartadas por atraso do cliente: reenvia o estado completo
+            payload = await _snapshot(quadra_ids)
+        yield payload
+
+@router.get("/", response_model=List[OcupacaoQuadra])
+async def read_ocupacao(quadra_id: Optional[List[int]] = Query(None)):
+    return await _ocupacao(quadra_id)
+
+@router.get("/stream")
+async def stream_ocupacao(request: Request, quadra_id: Optional[List[int]] = Query(None)):
+    assinante = event_bus.assinar(quadra_id)
+
+    async def eventos():
+        try:
+            async for payload in _mensagens(assinante, quadra_id):
+                if await request.is_disconnected():
+                    break
+                yield b": ping\n\n" if payload is None else b"data: " + payload + b"\n\n"
+        finally:
+            event_bus.cancelar(assinante)
+
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/ws")
+async def ws_ocupacao(websocket: WebSocket, quadra_id: Optional[List[int]] = Query(None)):
+    await websocket.accept()
+    assinante = event_bus.assinar(quadra_id)
+
+    async def enviar():
+        async for payload in _mensagens(assinante, quadra_id):
+            await websocket.send_text('{"t":"ping"}' if payload is None else payload.decode())
+
+    async def receber():
+        # O cliente não envia nada; ler é o que revela a desconexão
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tarefas = [asyncio.create_task(enviar()), asyncio.create_task(receber())]
+    try:
+        await asyncio.wait(tarefas, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        event_bus.cancelar(assinante)
+        for tarefa in tarefas:
+            tarefa.cancel()
\ No newline at end of file
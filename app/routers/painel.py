@@ -0,0 +1,87 @@
+from datetime import date, timedelta
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Tuple
+import numpy as np
+from ..core.deps import get_current_active_user
+from ..core.responses import FastJSONResponse
+from ..database import get_db
+from ..models.quadra import Quadra
+from ..models.user import User, UserType
+from ..schemas.painel import PainelOcupacao, PainelReceita
+from ..services.painel import painel_engine
+
+router = APIRouter(prefix="/painel", tags=["painel"])
+
+def _periodo(inicio: Optional[date], fim: Optional[date]) -> Tuple[date, date]:
+    # Padrão: os últimos 30 dias, no horário local como os indicadores
+    fim = fim or date.today()
+    inicio = inicio or fim - timedelta(days=29)
+    if fim < inicio:
+        raise HTTPException(status_code=400, detail="End date must not be before start date")
+    return inicio, fim
+
+@router.get("/ocupacao", response_model=PainelOcupacao, response_class=FastJSONResponse)
+async def read_ocupacao(
+    inicio: Optional[date] = None,
+    fim: Optional[date] = None,
+    quadra_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    inicio, fim = _periodo(inicio, fim)
+    stmt = select(Quadra.id).order_by(Quadra.id)
+    if quadra_id is not None:
+        stmt = stmt.where(Quadra.id == quadra_id)
+    quadra_ids = (await db.scalars(stmt)).all()
+    if quadra_id is not None and not quadra_ids:
+        raise HTTPException(status_code=404, detail="Quadra not found")
+
+    cubo = await painel_engine.cubo(db)
+    percentuais, minutos = cubo.ocupacao(inicio, fim, quadra_ids)
+    total_minutos = ((fim - inicio).days + 1) * 24 * 60
+    return FastJSONResponse({
+        "inicio": inicio,
+        "fim": fim,
+        "quadras": [
+            {
+                "quadra_id": quadra_id,
+                "percentual": round(float(minutos[linha]) * 100 / total_minutos, 2),
+                "horas_ocupadas": round(float(minutos[linha]) / 60, 2),
+                "por_dia_semana_hora": np.round(percentuais[linha], 2).tolist(),
+            }
+            for linha, quadra_id in enumerate(quadra_ids)
+        ],
+    })
+
+@router.get("/receita", response_model=PainelReceita, response_class=FastJSONResponse)
+async def read_receita(
+    inicio: Optional[date] = None,
+    fim: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    inicio, fim = _periodo(inicio, fim)
+    cubo = await painel_engine.cubo(db)
+    agendamentos, bar, comandas = cubo.receita_diaria(inicio, fim)
+    dias = np.arange(np.datetime64(inicio, "D"), np.datetime64(fim, "D") + 1).tolist()
+    return FastJSONResponse({
+        "inicio": inicio,
+        "fim": fim,
+        "agendamentos": round(float(agendamentos.sum()), 2),
+        "bar": round(float(bar.sum()), 2),
+        "comandas": int(comandas.sum()),
+        "dias": [
+            {"dia": dia, "agendamentos": valor, "bar": valor_bar, "comandas": quantidade}
+            for dia, valor, valor_bar, quantidade in zip(
+                dias, np.round(agendamentos, 2).tolist(), np.round(bar, 2).tolist(), comandas.tolist()
+            )
+        ],
+    })
\ No newline at end of file
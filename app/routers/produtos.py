@@ -0,0 +1,187 @@
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ..core.bulk import ImportResult, export_response, import_records
+from ..core.cache import response_cache
+from ..core.deps import get_current_active_user
+from ..core.pagination import CursorParams, Page, paginate
+from ..core.query_profiles import QueryProfile
+from ..core.responses import FastJSONResponse, dumps, page_content
+from ..database import get_db
+from ..models.user import User, UserType
+from ..models.produto import Produto
+from ..models.venda import VendaCategoriaDiaria, VendaProduto
+from ..schemas.produto import ProdutoCreate, ProdutoUpdate, ProdutoInDB, VendasCategoria, VendasProduto
+
+router = APIRouter(prefix="/produtos", tags=["produtos"])
+
+ProdutoAdapter = TypeAdapter(ProdutoInDB)
+PRODUTO_LISTA = QueryProfile.for_schema(Produto, ProdutoInDB)
+
+@router.post("/", response_model=ProdutoInDB)
+async def create_produto(
+    produto: ProdutoCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    db_produto = Produto(**produto.model_dump())
+    db.add(db_produto)
+    await db.commit()
+    await db.refresh(db_produto)
+    await response_cache.invalidate("produtos")
+    return db_produto
+
+@router.get("/", response_model=Page[ProdutoInDB])
+async def read_produtos(
+    request: Request,
+    page: CursorParams = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    async def build():
+        data = await paginate(db, PRODUTO_LISTA.select(), Produto, page)
+        return dumps(page_content(data))
+
+    key = await response_cache.list_key("produtos", page.cursor, page.limit, page.with_total)
+    return await response_cache.respond(request, key, build)
+
+@router.post("/import", response_model=ImportResult)
+async def import_produtos(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    async def write_chunk(rows):
+        await db.execute(insert(Produto).values([produto.model_dump() for _, produto in rows]))
+        await db.commit()
+        return []
+
+    result = await import_records(request, ProdutoCreate, write_chunk)
+    await response_cache.invalidate("produtos")
+    return result
+
+@router.get("/export")
+async def export_produtos(
+    format: str = Query("ndjson", pattern="^(ndjson|json|csv)$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    columns = [getattr(Produto, field) for field in ProdutoInDB.model_fields]
+    return export_response(db, select(*columns).order_by(Produto.id), format, "produtos")
+
+@router.get("/estoque-baixo", response_model=Page[ProdutoInDB], response_class=FastJSONResponse)
+async def read_produtos_estoque_baixo(
+    page: CursorParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    # Mesmo predicado do índice parcial idx_produtos_estoque_baixo
+    stmt = PRODUTO_LISTA.select().where(Produto.estoque <= Produto.estoque_minimo)
+    return FastJSONResponse(page_content(await paginate(db, stmt, Produto, page, estimate=False)))
+
+@router.get("/vendas/categorias", response_model=List[VendasCategoria])
+async def read_vendas_categorias(
+    dia: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    # Dias em UTC, como o created_at dos itens
+    dia = dia or datetime.utcnow().date()
+    return (await db.scalars(
+        select(VendaCategoriaDiaria)
+        .where(VendaCategoriaDiaria.dia == dia)
+        .order_by(VendaCategoriaDiaria.categoria)
+    )).all()
+
+@router.get("/{produto_id}/vendas", response_model=VendasProduto)
+async def read_vendas_produto(
+    produto_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    row = (await db.execute(
+        select(
+            Produto.id.label("produto_id"),
+            func.coalesce(VendaProduto.quantidade, 0).label("quantidade"),
+            func.coalesce(VendaProduto.receita, 0.0).label("receita"),
+        )
+        .outerjoin(VendaProduto, VendaProduto.produto_id == Produto.id)
+        .where(Produto.id == produto_id)
+    )).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Produto not found")
+    return row
+
+@router.get("/{produto_id}", response_model=ProdutoInDB)
+async def read_produto(
+    request: Request,
+    produto_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    async def build():
+        db_produto = await db.scalar(select(Produto).where(Produto.id == produto_id))
+        if not db_produto:
+            raise HTTPException(status_code=404, detail="Produto not found")
+        return ProdutoAdapter.dump_json(ProdutoAdapter.validate_python(db_produto, from_attributes=True))
+
+    return await response_cache.respond(request, await response_cache.item_key("produtos", produto_id), build)
+
+@router.put("/{produto_id}", response_model=ProdutoInDB)
+async def update_produto(
+    produto_id: int,
+    produto_update: ProdutoUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    db_produto = await db.scalar(select(Produto).where(Produto.id == produto_id))
+    if not db_produto:
+        raise HTTPException(status_code=404, detail="Produto not found")
+    
+    for field, value in produto_update.model_dump(exclude_unset=True).items():
+        setattr(db_produto, field, value)
+    
+    await db.commit()
+    await db.refresh(db_produto)
+    await response_cache.invalidate("produtos", produto_id)
+    return db_produto
+
+@router.delete("/{produto_id}")
+async def delete_produto(
+    produto_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    db_produto = await db.scalar(select(Produto).where(Produto.id == produto_id))
+    if not db_produto:
+        raise HTTPException(status_code=404, detail="Produto not found")
+    
+    await db.delete(db_produto)
+    await db.commit()
+    await response_cache.invalidate("produtos", produto_id)
+    return {"message": "Produto deleted successfully"}
\ No newline at end of file
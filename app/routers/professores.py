@@ -1,87 +1,159 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from ..core.deps import get_current_active_user
+from ..core.policy import AuthContext, get_auth_context
+from ..core.pagination import CursorParams, Page, paginate
+from ..core.query_profiles import QueryProfile
 from ..database import get_db
 from ..models.user import User, UserType
 from ..models.professor import Professor
-from ..schemas.professor import ProfessorCreate, ProfessorUpdate, ProfessorInDB
+from ..schemas.job import JobInDB
+from ..schemas.professor import ProfessorCreate, ProfessorUpdate, ProfessorInDB, ProfessorDetalhe, GanhosProfessor
+from ..services import ganhos, jobs
 
 router = APIRouter(prefix="/professores", tags=["professores"])
 
+PROFESSOR_DETALHE = QueryProfile(Professor, joined=[Professor.user], selectin=[Professor.alunos])
+
 @router.post("/", response_model=ProfessorInDB)
-def create_professor(
+async def create_professor(
     professor: ProfessorCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     if current_user.user_type != UserType.ADMIN:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     # Verificar se o usuário existe e é do tipo professor
-    user = db.query(User).filter(User.id == professor.user_id).first()
+    user = await db.scalar(select(User).where(User.id == professor.user_id))
     if not user or user.user_type != UserType.PROFESSOR:
         raise HTTPException(status_code=400, detail="Invalid user_id or user is not a professor")
     
     # Verificar se o professor já existe
-    db_professor = db.query(Professor).filter(Professor.user_id == professor.user_id).first()
+    db_professor = await db.scalar(select(Professor).where(Professor.user_id == professor.user_id))
     if db_professor:
         raise HTTPException(status_code=400, detail="Professor already exists")
     
     db_professor = Professor(**professor.model_dump())
     db.add(db_professor)
-    db.commit()
-    db.refresh(db_professor)
+    await db.commit()
+    await db.refresh(db_professor)
     return db_professor
 
-@router.get("/me", response_model=ProfessorInDB)
-def read_professor_me(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=Page[ProfessorDetalhe])
+async def read_professores(
+    page: CursorParams = Depends(),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    if current_user.user_type != UserType.PROFESSOR:
-        raise HTTPException(status_code=403, detail="User is not a professor")
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    professor = db.query(Professor).filter(Professor.user_id == current_user.id).first()
+    # Usuário no mesmo SELECT (joinedload) e alunos de todos os professores da página em uma consulta
+    return await paginate(db, PROFESSOR_DETALHE.select(), Professor, page)
+
+@router.get("/me", response_model=ProfessorInDB)
+async def read_professor_me(
+    db: AsyncSession = Depends(get_db),
+    auth: AuthContext = Depends(get_auth_context)
+):
+    professor_id = auth.exigir_professor()
+    
+    # Posse no WHERE: o perfil do token precisa continuar sendo deste usuário
+    professor = await db.scalar(
+        select(Professor).where(Professor.id == professor_id, Professor.user_id == auth.user.id)
+    )
     if not professor:
         raise HTTPException(status_code=404, detail="Professor not found")
     return professor
 
 @router.put("/me", response_model=ProfessorInDB)
-def update_professor_me(
+async def update_professor_me(
     professor_update: ProfessorUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    auth: AuthContext = Depends(get_auth_context)
 ):
-    if current_user.user_type != UserType.PROFESSOR:
-        raise HTTPException(status_code=403, detail="User is not a professor")
+    professor_id = auth.exigir_professor()
     
-    professor = db.query(Professor).filter(Professor.user_id == current_user.id).first()
+    condicao = (Professor.id == professor_id, Professor.user_id == auth.user.id)
+    valores = professor_update.model_dump(exclude_unset=True)
+    if valores:
+        professor = await db.scalar(update(Professor).where(*condicao).values(**valores).returning(Professor))
+    else:
+        professor = await db.scalar(select(Professor).where(*condicao))
     if not professor:
         raise HTTPException(status_code=404, detail="Professor not found")
     
-    for field, value in professor_update.model_dump(exclude_unset=True).items():
-        setattr(professor, field, value)
-    
-    db.commit()
-    db.refresh(professor)
+    await db.commit()
     return professor
 
-@router.get("/ganhos", response_model=dict)
-def calculate_earnings(
-    db: Session = Depends(get_db),
+def _periodo(inicio: Optional[date], fim: Optional[date]) -> tuple:
+    # Sem período informado, considera o mês corrente
+    hoje = date.today()
+    inicio = ganhos.primeiro_dia(inicio or hoje)
+    fim = ganhos.primeiro_dia(fim or hoje)
+    if fim < inicio:
+        raise HTTPException(status_code=400, detail="End must not be before start")
+    return inicio, fim
+
+def _resumo(professor_id: int, inicio: date, fim: date, meses: List[ganhos.GanhoMes]) -> GanhosProfessor:
+    return GanhosProfessor(
+        professor_id=professor_id,
+        inicio=inicio,
+        fim=fim,
+        alunos_ativos=meses[-1].alunos_ativos if meses else 0,
+        ganhos_potenciais=round(sum(mes.valor_ganho for mes in meses), 2),
+        meses=[mes._asdict() for mes in meses],
+    )
+
+async def _calcular(db: AsyncSession, inicio: date, fim: date, professor_id: Optional[int] = None):
+    try:
+        return await ganhos.calcular(db, inicio, fim, professor_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/ganhos", response_model=GanhosProfessor)
+async def calculate_earnings(
+    inicio: Optional[date] = None,
+    fim: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+    auth: AuthContext = Depends(get_auth_context)
+):
+    # O professor_id vem do token (ou do cache de posse), sem consultar `professores`
+    professor_id = auth.exigir_professor()
+    
+    inicio, fim = _periodo(inicio, fim)
+    resultado = await _calcular(db, inicio, fim, professor_id)
+    return _resumo(professor_id, inicio, fim, resultado.get(professor_id, []))
+
+@router.get("/ganhos/todos", response_model=List[GanhosProfessor])
+async def calculate_all_earnings(
+    inicio: Optional[date] = None,
+    fim: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    if current_user.user_type != UserType.PROFESSOR:
-        raise HTTPException(status_code=403, detail="User is not a professor")
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    professor = db.query(Professor).filter(Professor.user_id == current_user.id).first()
-    if not professor:
-        raise HTTPException(status_code=404, detail="Professor not found")
+    inicio, fim = _periodo(inicio, fim)
+    resultado = await _calcular(db, inicio, fim)
+    return [_resumo(professor_id, inicio, fim, meses) for professor_id, meses in sorted(resultado.items())]
+
+@router.post("/ganhos/fechamento", response_model=JobInDB, status_code=202)
+async def close_earnings(
+    mes: date,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    # Aqui você pode implementar a lógica de cálculo dos ganhos
-    # Por exemplo, baseado nos alunos ativos e seus percentuais
-    return {
-        "ganhos_potenciais": 0.0,  # Implementar cálculo real
-        "alunos_ativos": 0  # Implementar contagem real
-    }
\ No newline at end of file
+    # O fechamento agrega o mês inteiro: roda na fila e o resultado (FechamentoGanhos) fica em /jobs/{id}
+    job = await jobs.enfileirar(db, "ganhos.fechamento", {"mes": mes.isoformat()}, criado_por=current_user.id)
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job
\ No newline at end of file
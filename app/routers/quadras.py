@@ -1,18 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+from ..core.cache import response_cache
 from ..core.deps import get_current_active_user
+from ..core.events import mensagem_quadra, publicar
+from ..core.pagination import CursorParams, Page, paginate
+from ..core.query_profiles import QueryProfile
+from ..core.responses import dumps, page_content
 from ..database import get_db
 from ..models.user import User, UserType
 from ..models.quadra import Quadra
 from ..schemas.quadra import QuadraCreate, QuadraUpdate, QuadraInDB
+from ..services.precos import pricing_engine
 
 router = APIRouter(prefix="/quadras", tags=["quadras"])
 
+QuadraAdapter = TypeAdapter(QuadraInDB)
+QUADRA_LISTA = QueryProfile.for_schema(Quadra, QuadraInDB)
+
 @router.post("/", response_model=QuadraInDB)
-def create_quadra(
+async def create_quadra(
     quadra: QuadraCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     if current_user.user_type != UserType.ADMIN:
@@ -20,62 +31,80 @@ def create_quadra(
     
     db_quadra = Quadra(**quadra.model_dump())
     db.add(db_quadra)
-    db.commit()
-    db.refresh(db_quadra)
+    await db.commit()
+    await db.refresh(db_quadra)
+    await response_cache.invalidate("quadras")
+    pricing_engine.invalidar()
+    publicar(mensagem_quadra("insert", db_quadra.id, db_quadra.nome))
     return db_quadra
 
-@router.get("/", response_model=List[QuadraInDB])
-def read_quadras(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+@router.get("/", response_model=Page[QuadraInDB])
+async def read_quadras(
+    request: Request,
+    page: CursorParams = Depends(),
+    db: AsyncSession = Depends(get_db)
 ):
-    return db.query(Quadra).offset(skip).limit(limit).all()
+    async def build():
+        data = await paginate(db, QUADRA_LISTA.select(), Quadra, page)
+        return dumps(page_content(data))
+
+    key = await response_cache.list_key("quadras", page.cursor, page.limit, page.with_total)
+    return await response_cache.respond(request, key, build)
 
 @router.get("/{quadra_id}", response_model=QuadraInDB)
-def read_quadra(
+async def read_quadra(
+    request: Request,
     quadra_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    db_quadra = db.query(Quadra).filter(Quadra.id == quadra_id).first()
-    if not db_quadra:
-        raise HTTPException(status_code=404, detail="Quadra not found")
-    return db_quadra
+    async def build():
+        db_quadra = await db.scalar(select(Quadra).where(Quadra.id == quadra_id))
+        if not db_quadra:
+            raise HTTPException(status_code=404, detail="Quadra not found")
+        return QuadraAdapter.dump_json(QuadraAdapter.validate_python(db_quadra, from_attributes=True))
+
+    return await response_cache.respond(request, await response_cache.item_key("quadras", quadra_id), build)
 
 @router.put("/{quadra_id}", response_model=QuadraInDB)
-def update_quadra(
+async def update_quadra(
     quadra_id: int,
     quadra_update: QuadraUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     if current_user.user_type != UserType.ADMIN:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    db_quadra = db.query(Quadra).filter(Quadra.id == quadra_id).first()
+    db_quadra = await db.scalar(select(Quadra).where(Quadra.id == quadra_id))
     if not db_quadra:
         raise HTTPException(status_code=404, detail="Quadra not found")
     
     for field, value in quadra_update.model_dump(exclude_unset=True).items():
         setattr(db_quadra, field, value)
     
-    db.commit()
-    db.refresh(db_quadra)
+    await db.commit()
+    await db.refresh(db_quadra)
+    await response_cache.invalidate("quadras", quadra_id)
+    pricing_engine.invalidar()
+    publicar(mensagem_quadra("update", quadra_id, db_quadra.nome))
     return db_quadra
 
 @router.delete("/{quadra_id}")
-def delete_quadra(
+async def delete_quadra(
     quadra_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     if current_user.user_type != UserType.ADMIN:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    db_quadra = db.query(Quadra).filter(Quadra.id == quadra_id).first()
+    db_quadra = await db.scalar(select(Quadra).where(Quadra.id == quadra_id))
     if not db_quadra:
         raise HTTPException(status_code=404, detail="Quadra not found")
     
-    db.delete(db_quadra)
-    db.commit()
+    await db.delete(db_quadra)
+    await db.commit()
+    await response_cache.invalidate("quadras", quadra_id)
+    pricing_engine.invalidar()
+    publicar(mensagem_quadra("delete", quadra_id))
     return {"message": "Quadra deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,143 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from ..core.deps import get_current_active_user
+from ..core.pagination import CursorParams, Page, paginate
+from ..core.query_profiles import QueryProfile
+from ..core.responses import FastJSONResponse, page_content
+from ..database import get_db
+from ..models.user import User, UserType
+from ..models.ranking import Ranking, ParticipanteRanking
+from ..schemas.ranking import (
+    ClassificacaoJogador,
+    ParticipanteCreate,
+    ParticipanteInDB,
+    PosicaoRanking,
+    RankingComParticipantes,
+    RankingCreate,
+    RankingInDB,
+    Resultado,
+    ResultadosRegistrados,
+)
+from ..services.rankings import ranking_engine
+
+router = APIRouter(prefix="/rankings", tags=["rankings"])
+
+RANKING_LISTA = QueryProfile.for_schema(Ranking, RankingInDB)
+RANKING_COM_PARTICIPANTES = QueryProfile(Ranking, selectin=[(Ranking.participantes, ParticipanteRanking.jogador)])
+
+async def _get_ranking(db: AsyncSession, ranking_id: int) -> Ranking:
+    db_ranking = await db.scalar(select(Ranking).where(Ranking.id == ranking_id))
+    if not db_ranking:
+        raise HTTPException(status_code=404, detail="Ranking not found")
+    return db_ranking
+
+@router.post("/", response_model=RankingInDB)
+async def create_ranking(
+    ranking: RankingCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    db_ranking = Ranking(**ranking.model_dump())
+    db.add(db_ranking)
+    await db.commit()
+    await db.refresh(db_ranking)
+    return db_ranking
+
+@router.get("/", response_model=Page[RankingInDB], response_class=FastJSONResponse)
+async def read_rankings(
+    page: CursorParams = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    return FastJSONResponse(page_content(await paginate(db, RANKING_LISTA.select(), Ranking, page)))
+
+@router.get("/detalhados", response_model=Page[RankingComParticipantes])
+async def read_rankings_detalhados(
+    page: CursorParams = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    # Rankings, participantes e jogadores: três consultas, qualquer que seja o limit
+    return await paginate(db, RANKING_COM_PARTICIPANTES.select(), Ranking, page)
+
+@router.post("/{ranking_id}/participantes", response_model=ParticipanteInDB)
+async def create_participante(
+    ranking_id: int,
+    participante: ParticipanteCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    await _get_ranking(db, ranking_id)
+    # A constraint única decide entre requests concorrentes do mesmo jogador
+    stmt = (
+        insert(ParticipanteRanking)
+        .values(ranking_id=ranking_id, **participante.model_dump())
+        .on_conflict_do_nothing(index_elements=["ranking_id", "jogador_id"])
+        .returning(ParticipanteRanking)
+    )
+    db_participante = await db.scalar(stmt)
+    if db_participante is None:
+        raise HTTPException(status_code=400, detail="Player already in ranking")
+    await db.commit()
+    ranking_engine.set_participante(ranking_id, db_participante.jogador_id, db_participante.pontos)
+    return db_participante
+
+@router.get("/{ranking_id}/top", response_model=List[PosicaoRanking])
+async def read_top(
+    ranking_id: int,
+    n: int = Query(10, ge=1, le=500),
+    db: AsyncSession = Depends(get_db)
+):
+    board = await ranking_engine.get(db, ranking_id)
+    if board is None:
+        raise HTTPException(status_code=404, detail="Ranking not found")
+    return [
+        PosicaoRanking(posicao=posicao, jogador_id=jogador_id, pontos=pontos)
+        for posicao, jogador_id, pontos in board.top(n)
+    ]
+
+@router.get("/{ranking_id}/jogadores/{jogador_id}", response_model=ClassificacaoJogador)
+async def read_classificacao_jogador(
+    ranking_id: int,
+    jogador_id: int,
+    raio: int = Query(2, ge=0, le=50),
+    db: AsyncSession = Depends(get_db)
+):
+    board = await ranking_engine.get(db, ranking_id)
+    if board is None:
+        raise HTTPException(status_code=404, detail="Ranking not found")
+    if jogador_id not in board:
+        raise HTTPException(status_code=404, detail="Player not in ranking")
+    vizinhanca = [
+        PosicaoRanking(posicao=posicao, jogador_id=vizinho_id, pontos=pontos)
+        for posicao, vizinho_id, pontos in board.vizinhanca(jogador_id, raio)
+    ]
+    atual = next(item for item in vizinhanca if item.jogador_id == jogador_id)
+    return ClassificacaoJogador(**atual.model_dump(), vizinhanca=vizinhanca)
+
+@router.post("/{ranking_id}/resultados", response_model=ResultadosRegistrados)
+async def create_resultados(
+    ranking_id: int,
+    resultados: List[Resultado],
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    await _get_ranking(db, ranking_id)
+    atualizados = await ranking_engine.registrar_resultados(
+        db, ranking_id, [(resultado.jogador_id, resultado.pontos) for resultado in resultados]
+    )
+    encontrados = {jogador_id for jogador_id, _ in atualizados}
+    return ResultadosRegistrados(
+        atualizados=[Resultado(jogador_id=jogador_id, pontos=pontos) for jogador_id, pontos in atualizados],
+        jogadores_nao_encontrados=sorted({r.jogador_id for r in resultados} - encontrados),
+    )
\ No newline at end of file
@@ -1,25 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+from ..core.bulk import ImportResult, RowError, export_response, import_records
 from ..core.deps import get_current_active_user, get_current_user
-from ..core.security import get_password_hash
+from ..core.security import password_hasher
+from ..core.principals import principal_cache
 from ..database import get_db
-from ..models.user import User
+from ..models.user import User, UserType
 from ..schemas.user import UserCreate, UserInDB, UserUpdate
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.post("/", response_model=UserInDB)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    db_user = await db.scalar(select(User).where(User.email == user.email))
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    db_user = db.query(User).filter(User.username == user.username).first()
+    db_user = await db.scalar(select(User).where(User.username == user.username))
     if db_user:
         raise HTTPException(status_code=400, detail="Username already registered")
     
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     db_user = User(
         email=user.email,
         username=user.username,
@@ -28,27 +32,84 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
         user_type=user.user_type
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
+@router.post("/import", response_model=ImportResult)
+async def import_users(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    async def write_chunk(rows):
+        errors = []
+        seen = set()
+        unique_rows = []
+        for line, user in rows:
+            if user.email in seen or user.username in seen:
+                errors.append(RowError(line=line, errors=["Duplicated email or username in import"]))
+                continue
+            seen.update((user.email, user.username))
+            unique_rows.append((line, user))
+        if not unique_rows:
+            return errors
+        hashed_passwords = await password_hasher.hash_many([user.password for _, user in unique_rows])
+        values = [
+            {
+                **user.model_dump(exclude={"password"}),
+                "hashed_password": hashed_password,
+                "is_active": True,
+            }
+            for (_, user), hashed_password in zip(unique_rows, hashed_passwords)
+        ]
+        # Um INSERT multi-linha por lote; conflitos de email/username são ignorados e reportados
+        stmt = insert(User).values(values).on_conflict_do_nothing().returning(User.username)
+        inserted = set((await db.scalars(stmt)).all())
+        await db.commit()
+        errors.extend(
+            RowError(line=line, errors=["Email or username already registered"])
+            for line, user in unique_rows
+            if user.username not in inserted
+        )
+        return errors
+
+    return await import_records(request, UserCreate, write_chunk)
+
+@router.get("/export")
+async def export_users(
+    format: str = Query("ndjson", pattern="^(ndjson|json|csv)$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    columns = [getattr(User, field) for field in UserInDB.model_fields]
+    return export_response(db, select(*columns).order_by(User.id), format, "users")
+
 @router.get("/me", response_model=UserInDB)
-def read_user_me(current_user: User = Depends(get_current_active_user)):
+async def read_user_me(current_user: User = Depends(get_current_active_user)):
     return current_user
 
 @router.put("/me", response_model=UserInDB)
-def update_user_me(
+async def update_user_me(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     if user_update.email:
         current_user.email = user_update.email
     if user_update.full_name:
         current_user.full_name = user_update.full_name
     if user_update.password:
-        current_user.hashed_password = get_password_hash(user_update.password)
+        current_user.hashed_password = await password_hasher.hash(user_update.password)
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    # Invalida após o commit para que nenhum request recoloque o estado antigo no cache
+    principal_cache.invalidate(current_user.username)
+    await db.refresh(current_user)
     return current_user
\ No newline at end of file
@@ -0,0 +1,112 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List
+from datetime import date, datetime, time
+from enum import Enum
+
+class StatusAgendamento(str, Enum):
+    PENDENTE = "pendente"
+    CONFIRMADO = "confirmado"
+    CANCELADO = "cancelado"
+
+class FrequenciaSerie(str, Enum):
+    DIARIA = "diaria"
+    SEMANAL = "semanal"
+
+class DiaSemana(str, Enum):
+    MO = "MO"
+    TU = "TU"
+    WE = "WE"
+    TH = "TH"
+    FR = "FR"
+    SA = "SA"
+    SU = "SU"
+
+class AgendamentoBase(BaseModel):
+    quadra_id: int
+    data_hora_inicio: datetime
+    data_hora_fim: datetime
+    observacoes: Optional[str] = None
+
+class AgendamentoCreate(AgendamentoBase):
+    cliente_id: Optional[int] = None
+
+class AgendamentoInDB(AgendamentoBase):
+    id: int
+    cliente_id: int
+    status: StatusAgendamento
+    valor: float
+
+    class Config:
+        from_attributes = True
+
+class Intervalo(BaseModel):
+    inicio: datetime
+    fim: datetime
+
+class Horario(Intervalo):
+    # Preenchido com com_precos=true
+    valor: Optional[float] = None
+
+class DisponibilidadeQuadra(BaseModel):
+    quadra_id: int
+    livre: bool
+    intervalos_livres: List[Intervalo]
+    horarios: List[Horario] = []
+
+class Conflito(BaseModel):
+    agendamento_id: Optional[int] = None
+    serie_id: Optional[int] = None
+    inicio: datetime
+    fim: datetime
+
+class SerieAgendamentoBase(BaseModel):
+    quadra_id: int
+    frequencia: FrequenciaSerie = FrequenciaSerie.SEMANAL
+    intervalo: int = Field(1, ge=1)
+    dias_semana: List[DiaSemana] = []
+    data_inicio: date
+    data_fim: date
+    hora_inicio: time
+    hora_fim: time
+    observacoes: Optional[str] = None
+
+class SerieAgendamentoCreate(SerieAgendamentoBase):
+    cliente_id: Optional[int] = None
+
+class SerieAgendamentoInDB(SerieAgendamentoBase):
+    id: int
+    cliente_id: int
+    status: StatusAgendamento
+    valor: float
+
+    @field_validator("dias_semana", mode="before")
+    @classmethod
+    def split_dias_semana(cls, value):
+        if isinstance(value, str):
+            return value.split(",")
+        return value or []
+
+    class Config:
+        from_attributes = True
+
+class Ocorrencia(BaseModel):
+    serie_id: int
+    data: date
+    inicio: datetime
+    fim: datetime
+    cancelada: bool = False
+    valor: Optional[float] = None
+
+class ExcecaoAgendamentoUpdate(BaseModel):
+    cancelada: bool = False
+    data_hora_inicio: Optional[datetime] = None
+    data_hora_fim: Optional[datetime] = None
+
+class ExcecaoAgendamentoInDB(ExcecaoAgendamentoUpdate):
+    id: int
+    serie_id: int
+    data: date
+    valor: Optional[float] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,43 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from enum import Enum
+
+class StatusComanda(str, Enum):
+    ABERTA = "aberta"
+    FECHADA = "fechada"
+    PAGA = "paga"
+
+class ItemComandaCreate(BaseModel):
+    produto_id: int
+    quantidade: int = Field(gt=0)
+
+class ItemComandaInDB(BaseModel):
+    id: int
+    produto_id: int
+    quantidade: int
+    valor_unitario: float
+
+    class Config:
+        from_attributes = True
+
+class ComandaCreate(BaseModel):
+    cliente_id: int
+
+class ComandaResumo(BaseModel):
+    id: int
+    cliente_id: int
+    status: StatusComanda
+    valor_total: float
+    forma_pagamento: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class ComandaInDB(ComandaResumo):
+    itens: List[ItemComandaInDB] = []
+
+class Pagamento(BaseModel):
+    forma_pagamento: str
+
+class ComandasFechadas(BaseModel):
+    comandas: List[int]
\ No newline at end of file
@@ -0,0 +1,12 @@
+from datetime import date
+from pydantic import BaseModel
+from typing import List
+
+class ArquivoHistorico(BaseModel):
+    tabela: str
+    mes: date
+    bytes: int
+
+class ManutencaoHistorico(BaseModel):
+    criadas: List[str]
+    arquivadas: List[str]
\ No newline at end of file
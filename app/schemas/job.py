@@ -0,0 +1,28 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Any, Optional
+from enum import Enum
+
+class StatusJob(str, Enum):
+    PENDENTE = "pendente"
+    EXECUTANDO = "executando"
+    CONCLUIDO = "concluido"
+    FALHOU = "falhou"
+
+class JobInDB(BaseModel):
+    id: int
+    tipo: str
+    payload: dict
+    status: StatusJob
+    tentativas: int
+    max_tentativas: int
+    executar_em: datetime
+    iniciado_em: Optional[datetime] = None
+    concluido_em: Optional[datetime] = None
+    resultado: Optional[Any] = None
+    erro: Optional[str] = None
+    criado_por: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
\ No newline at end of file
@@ -0,0 +1,8 @@
+from datetime import datetime
+from pydantic import BaseModel
+
+class OcupacaoQuadra(BaseModel):
+    quadra_id: int
+    ocupada: bool
+    # Fim do estado atual (livre até / ocupada até), limitado à janela consultada
+    ate: datetime
\ No newline at end of file
@@ -0,0 +1,29 @@
+from datetime import date
+from pydantic import BaseModel
+from typing import List
+
+class OcupacaoQuadra(BaseModel):
+    quadra_id: int
+    percentual: float
+    horas_ocupadas: float
+    # Percentual ocupado por dia da semana (segunda = 0) e hora do dia (horário local): 7 listas de 24 valores
+    por_dia_semana_hora: List[List[float]]
+
+class PainelOcupacao(BaseModel):
+    inicio: date
+    fim: date
+    quadras: List[OcupacaoQuadra]
+
+class ReceitaDia(BaseModel):
+    dia: date
+    agendamentos: float
+    bar: float
+    comandas: int
+
+class PainelReceita(BaseModel):
+    inicio: date
+    fim: date
+    agendamentos: float
+    bar: float
+    comandas: int
+    dias: List[ReceitaDia]
\ No newline at end of file
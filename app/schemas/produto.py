@@ -0,0 +1,45 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import Optional
+
+class ProdutoBase(BaseModel):
+    nome: str
+    descricao: Optional[str] = None
+    preco: float
+    estoque: int
+    estoque_minimo: int = 0
+    categoria: str
+
+class ProdutoCreate(ProdutoBase):
+    pass
+
+class ProdutoUpdate(BaseModel):
+    nome: Optional[str] = None
+    descricao: Optional[str] = None
+    preco: Optional[float] = None
+    estoque: Optional[int] = None
+    estoque_minimo: Optional[int] = None
+    categoria: Optional[str] = None
+
+class ProdutoInDB(ProdutoBase):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+class VendasProduto(BaseModel):
+    produto_id: int
+    quantidade: int = 0
+    receita: float = 0.0
+
+    class Config:
+        from_attributes = True
+
+class VendasCategoria(BaseModel):
+    dia: date
+    categoria: str
+    quantidade: int
+    receita: float
+
+    class Config:
+        from_attributes = True
\ No newline at end of file
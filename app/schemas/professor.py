@@ -1,6 +1,8 @@
 from pydantic import BaseModel
 from typing import Optional, List
 from decimal import Decimal
+from datetime import date
+from .aluno import AlunoInDB
 
 class ProfessorBase(BaseModel):
     especialidade: str
@@ -18,4 +20,35 @@ class ProfessorInDB(ProfessorBase):
     user_id: int
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class GanhoMensal(BaseModel):
+    mes: date
+    alunos_ativos: int
+    valor_bruto: float
+    valor_ganho: float
+    fechado: bool
+
+class GanhosProfessor(BaseModel):
+    professor_id: int
+    inicio: date
+    fim: date
+    alunos_ativos: int
+    ganhos_potenciais: float
+    meses: List[GanhoMensal]
+
+class FechamentoGanhos(BaseModel):
+    mes: date
+    professores: int
+
+class UsuarioResumo(BaseModel):
+    id: int
+    full_name: str
+    email: str
+
+    class Config:
+        from_attributes = True
+
+class ProfessorDetalhe(ProfessorInDB):
+    user: Optional[UsuarioResumo] = None
+    alunos: List[AlunoInDB] = []
\ No newline at end of file
@@ -0,0 +1,72 @@
+from pydantic import BaseModel, Field
+from typing import List
+from enum import Enum
+
+class Categoria(str, Enum):
+    INICIANTE = "iniciante"
+    INTERMEDIARIO = "intermediario"
+    AVANCADO = "avancado"
+
+class TipoRanking(str, Enum):
+    MASCULINO = "masculino"
+    FEMININO = "feminino"
+    MISTO = "misto"
+
+class RankingBase(BaseModel):
+    nome: str
+    categoria: Categoria
+    tipo: TipoRanking
+
+class RankingCreate(RankingBase):
+    pass
+
+class RankingInDB(RankingBase):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+class ParticipanteCreate(BaseModel):
+    jogador_id: int
+    pontos: int = 0
+
+class ParticipanteInDB(ParticipanteCreate):
+    id: int
+    ranking_id: int
+
+    class Config:
+        from_attributes = True
+
+class Resultado(BaseModel):
+    jogador_id: int
+    pontos: int
+
+class PosicaoRanking(BaseModel):
+    posicao: int
+    jogador_id: int
+    pontos: int
+
+class ClassificacaoJogador(PosicaoRanking):
+    vizinhanca: List[PosicaoRanking]
+
+class ResultadosRegistrados(BaseModel):
+    atualizados: List[Resultado]
+    jogadores_nao_encontrados: List[int] = Field(default_factory=list)
+
+class JogadorResumo(BaseModel):
+    id: int
+    full_name: str
+
+    class Config:
+        from_attributes = True
+
+class ParticipanteComJogador(BaseModel):
+    jogador_id: int
+    pontos: int
+    jogador: JogadorResumo
+
+    class Config:
+        from_attributes = True
+
+class RankingComParticipantes(RankingInDB):
+    participantes: List[ParticipanteComJogador] = []
\ No newline at end of file
@@ -33,4 +33,8 @@ class Token(BaseModel):
     token_type: str
 
 class TokenData(BaseModel):
-    username: Optional[str] = None
\ No newline at end of file
+    username: Optional[str] = None
+    user_type: Optional[UserType] = None
+    professor_id: Optional[int] = None
+    jti: Optional[str] = None
+    exp: Optional[int] = None
\ No newline at end of file
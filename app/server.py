@@ -0,0 +1,37 @@
+"""Servidor de produção: `python -m app.server`.
+
+Sobe o uvicorn com `SERVER_WORKERS` processos (0 = um por núcleo) e prepara o que
+os workers compartilham na máquina: o diretório dos sockets do cluster (invalidação
+de caches) e o arquivo do rate limiter. Ambos ficam em um diretório temporário
+removido na saída, a não ser que `CLUSTER_SOCKET_DIR`/`RATE_LIMIT_FILE` estejam configurados.
+"""
+import os
+import shutil
+import tempfile
+import uvicorn
+from .config import settings
+
+def main() -> None:
+    nucleos = os.cpu_count() or 1
+    workers = settings.SERVER_WORKERS or nucleos
+    runtime = tempfile.mkdtemp(prefix="arena-")
+    # Os workers leem a configuração do ambiente herdado
+    os.environ["CLUSTER_SOCKET_DIR"] = settings.CLUSTER_SOCKET_DIR or os.path.join(runtime, "cluster")
+    os.environ["RATE_LIMIT_FILE"] = settings.RATE_LIMIT_FILE or os.path.join(runtime, "ratelimit")
+    # bcrypt em processos: sem limite, cada worker abriria um por núcleo
+    if not settings.HASH_WORKERS:
+        os.environ["HASH_WORKERS"] = str(max(1, nucleos // workers))
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host=settings.SERVER_HOST,
+            port=settings.SERVER_PORT,
+            workers=workers,
+            proxy_headers=True,
+            forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+        )
+    finally:
+        shutil.rmtree(runtime, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
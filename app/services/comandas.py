@@ -0,0 +1,146 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import Integer, column, delete, exists, func, insert, literal, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.comanda import Comanda, ItemComanda, StatusComanda
+from ..models.produto import Produto
+
+class EstoqueInsuficiente(Exception):
+    pass
+
+def _agora():
+    # Mesmo referencial de datetime.utcnow usado pelos defaults dos models; explícito também nos
+    # UPDATEs dentro de CTEs, onde o onupdate do model não pode ser aplicado
+    return func.timezone("utc", func.now())
+
+def _aberta():
+    # Status literal, como no índice parcial idx_comandas_abertas: com o plano genérico de um
+    # prepared statement, um parâmetro não deixa o planner usar o índice
+    return Comanda.status == literal(StatusComanda.ABERTA, Comanda.status.type, literal_execute=True)
+
+def _comanda_aberta(comanda_id: int):
+    return exists().where(Comanda.id == comanda_id, _aberta())
+
+def _total_itens(comanda_id):
+    return (
+        select(func.coalesce(func.sum(ItemComanda.quantidade * ItemComanda.valor_unitario), 0.0))
+        .where(ItemComanda.comanda_id == comanda_id)
+        .scalar_subquery()
+    )
+
+async def adicionar_itens(db: AsyncSession, comanda_id: int, itens: Iterable[Tuple[int, int]]) -> Optional[float]:
+    """Em um único statement: baixa o estoque com guarda `estoque >= quantidade`,
+    insere os itens com o preço atual e soma o valor na comanda.
+
+    Retorna o novo total, None se a comanda não existir ou não estiver aberta,
+    e levanta EstoqueInsuficiente (após rollback) se algum produto não tiver estoque."""
+    quantidades: Dict[int, int] = {}
+    for produto_id, quantidade in itens:
+        quantidades[produto_id] = quantidades.get(produto_id, 0) + quantidade
+    pedido = values(column("produto_id", Integer), column("quantidade", Integer), name="pedido").data(list(quantidades.items()))
+
+    baixa = (
+        update(Produto)
+        .where(
+            Produto.id == pedido.c.produto_id,
+            Produto.estoque >= pedido.c.quantidade,
+            _comanda_aberta(comanda_id),
+        )
+        .values(estoque=Produto.estoque - pedido.c.quantidade, updated_at=_agora())
+        .returning(Produto.id.label("produto_id"), Produto.preco, pedido.c.quantidade)
+        .cte("baixa")
+    )
+    novos = (
+        insert(ItemComanda)
+        .from_select(
+            ["comanda_id", "produto_id", "quantidade", "valor_unitario", "created_at", "updated_at"],
+            select(literal(comanda_id), baixa.c.produto_id, baixa.c.quantidade, baixa.c.preco, _agora(), _agora()),
+        )
+        .returning(ItemComanda.quantidade, ItemComanda.valor_unitario)
+        .cte("novos")
+    )
+    stmt = (
+        update(Comanda)
+        .where(Comanda.id == comanda_id, _aberta())
+        .values(
+            valor_total=Comanda.valor_total
+            + select(func.coalesce(func.sum(novos.c.quantidade * novos.c.valor_unitario), 0.0)).scalar_subquery(),
+            updated_at=_agora(),
+        )
+        .returning(Comanda.valor_total, select(func.count()).select_from(novos).scalar_subquery())
+    )
+    row = (await db.execute(stmt)).first()
+    if row is None:
+        await db.rollback()
+        return None
+    valor_total, inseridos = row
+    if inseridos != len(quantidades):
+        await db.rollback()
+        raise EstoqueInsuficiente()
+    await db.commit()
+    return valor_total
+
+async def remover_item(db: AsyncSession, comanda_id: int, item_id: int) -> Optional[Tuple[float, int]]:
+    """Remove o item, devolve a quantidade ao estoque e abate o valor da comanda em um statement.
+
+    Retorna (novo total, produto_id do item removido)."""
+    removido = (
+        delete(ItemComanda)
+        .where(ItemComanda.id == item_id, ItemComanda.comanda_id == comanda_id, _comanda_aberta(comanda_id))
+        .returning(ItemComanda.produto_id, ItemComanda.quantidade, ItemComanda.valor_unitario)
+        .cte("removido")
+    )
+    estorno = (
+        update(Produto)
+        .where(Produto.id == removido.c.produto_id)
+        .values(estoque=Produto.estoque + removido.c.quantidade, updated_at=_agora())
+        .returning(Produto.id)
+        .cte("estorno")
+    )
+    stmt = (
+        update(Comanda)
+        .where(Comanda.id == comanda_id, exists().select_from(removido))
+        .values(
+            valor_total=Comanda.valor_total
+            - select(func.coalesce(func.sum(removido.c.quantidade * removido.c.valor_unitario), 0.0)).scalar_subquery(),
+            updated_at=_agora(),
+        )
+        .returning(Comanda.valor_total, select(removido.c.produto_id).scalar_subquery())
+        .add_cte(estorno)
+    )
+    row = (await db.execute(stmt)).first()
+    await db.commit()
+    return tuple(row) if row else None
+
+async def fechar(db: AsyncSession, comanda_id: int) -> Optional[Comanda]:
+    # Recalcula o total a partir dos itens no mesmo UPDATE que fecha a comanda
+    comanda = await db.scalar(
+        update(Comanda)
+        .where(Comanda.id == comanda_id, _aberta())
+        .values(status=StatusComanda.FECHADA, valor_total=_total_itens(Comanda.id))
+        .returning(Comanda)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return comanda
+
+async def pagar(db: AsyncSession, comanda_id: int, forma_pagamento: str) -> Optional[Comanda]:
+    comanda = await db.scalar(
+        update(Comanda)
+        .where(Comanda.id == comanda_id, Comanda.status.in_([StatusComanda.ABERTA, StatusComanda.FECHADA]))
+        .values(status=StatusComanda.PAGA, forma_pagamento=forma_pagamento, valor_total=_total_itens(Comanda.id))
+        .returning(Comanda)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return comanda
+
+async def fechar_todas(db: AsyncSession) -> List[int]:
+    ids = (await db.scalars(
+        update(Comanda)
+        .where(_aberta())
+        .values(status=StatusComanda.FECHADA, valor_total=_total_itens(Comanda.id))
+        .returning(Comanda.id)
+        .execution_options(synchronize_session=False)
+    )).all()
+    await db.commit()
+    return list(ids)
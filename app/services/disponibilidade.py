@@ -0,0 +1,182 @@
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import DateTime, and_, column, literal, select, values
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.agendamento import Agendamento, StatusAgendamento, periodo
+from ..models.quadra import Quadra
+from .recorrencia import carregar_series, excecoes_por_data, ocorrencias
+
+Intervalo = Tuple[datetime, datetime]
+# (agendamento_id, serie_id): ocupações vêm de agendamentos avulsos ou de ocorrências de séries
+Origem = Tuple[Optional[int], Optional[int]]
+
+class IntervalIndex:
+    """Agendamentos de uma quadra ordenados por início, com o maior fim acumulado
+    para responder conflitos em O(log n + k) e a união dos períodos ocupados
+    para gerar os intervalos livres."""
+
+    def __init__(self, agendamentos: Iterable[Tuple[Origem, datetime, datetime]] = ()):
+        itens = sorted(agendamentos, key=lambda item: (item[1], item[2]))
+        self._ids = [item[0] for item in itens]
+        self._inicios = [item[1] for item in itens]
+        self._fins = [item[2] for item in itens]
+        self._max_fim = []
+        for fim in self._fins:
+            self._max_fim.append(max(fim, self._max_fim[-1]) if self._max_fim else fim)
+        self._ocupados = self._unir()
+        self._ocupados_fins = [fim for _, fim in self._ocupados]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _unir(self) -> List[Intervalo]:
+        ocupados: List[Intervalo] = []
+        for inicio, fim in zip(self._inicios, self._fins):
+            if ocupados and inicio <= ocupados[-1][1]:
+                if fim > ocupados[-1][1]:
+                    ocupados[-1] = (ocupados[-1][0], fim)
+            else:
+                ocupados.append((inicio, fim))
+        return ocupados
+
+    def conflitos(self, inicio: datetime, fim: datetime) -> List[Tuple[Origem, datetime, datetime]]:
+        # Candidatos começam antes de `fim`; paramos quando nenhum anterior termina depois de `inicio`
+        resultado = []
+        i = bisect_left(self._inicios, fim) - 1
+        while i >= 0 and self._max_fim[i] > inicio:
+            if self._fins[i] > inicio:
+                resultado.append((self._ids[i], self._inicios[i], self._fins[i]))
+            i -= 1
+        resultado.reverse()
+        return resultado
+
+    def livre(self, inicio: datetime, fim: datetime) -> bool:
+        i = bisect_left(self._inicios, fim) - 1
+        return i < 0 or self._max_fim[i] <= inicio
+
+    def intervalos_livres(self, inicio: datetime, fim: datetime) -> List[Intervalo]:
+        livres: List[Intervalo] = []
+        cursor = inicio
+        i = bisect_right(self._ocupados_fins, inicio)
+        for ocupado_inicio, ocupado_fim in self._ocupados[i:]:
+            if ocupado_inicio >= fim:
+                break
+            if ocupado_inicio > cursor:
+                livres.append((cursor, ocupado_inicio))
+            cursor = max(cursor, ocupado_fim)
+        if cursor < fim:
+            livres.append((cursor, fim))
+        return livres
+
+    def horarios(self, inicio: datetime, fim: datetime, duracao: timedelta, passo: Optional[timedelta] = None) -> List[Intervalo]:
+        passo = passo or duracao
+        horarios: List[Intervalo] = []
+        for livre_inicio, livre_fim in self.intervalos_livres(inicio, fim):
+            # Alinha os horários à grade definida por `inicio` e `passo`
+            atraso = (livre_inicio - inicio) % passo
+            slot = livre_inicio if not atraso else livre_inicio + (passo - atraso)
+            while slot + duracao <= livre_fim:
+                horarios.append((slot, slot + duracao))
+                slot += passo
+        return horarios
+
+def periodo_sobreposto(inicio: datetime, fim: datetime):
+    # Mesma expressão (e status literal) da constraint de exclusão, para que o planner use o índice GiST
+    # mesmo com prepared statements no servidor
+    return and_(
+        Agendamento.status != literal(StatusAgendamento.CANCELADO, Agendamento.status.type, literal_execute=True),
+        periodo(Agendamento.data_hora_inicio, Agendamento.data_hora_fim).op("&&")(periodo(inicio, fim)),
+    )
+
+class AvailabilityEngine:
+    """Carrega, em uma única consulta, os agendamentos de todas as quadras que tocam
+    a janela pedida, expande as séries recorrentes na mesma janela e monta um
+    IntervalIndex por quadra."""
+
+    def __init__(self, inicio: datetime, fim: datetime, indices: Dict[int, IntervalIndex]):
+        self.inicio = inicio
+        self.fim = fim
+        self.indices = indices
+
+    @classmethod
+    async def carregar(cls, db: AsyncSession, inicio: datetime, fim: datetime, quadra_ids: Optional[List[int]] = None) -> "AvailabilityEngine":
+        stmt = (
+            select(Quadra.id, Agendamento.id, Agendamento.data_hora_inicio, Agendamento.data_hora_fim)
+            .outerjoin(Agendamento, and_(Agendamento.quadra_id == Quadra.id, periodo_sobreposto(inicio, fim)))
+        )
+        if quadra_ids:
+            stmt = stmt.where(Quadra.id.in_(quadra_ids))
+        agendamentos: Dict[int, List[Tuple[Origem, datetime, datetime]]] = {}
+        for quadra_id, agendamento_id, ag_inicio, ag_fim in await db.execute(stmt.order_by(Quadra.id)):
+            itens = agendamentos.setdefault(quadra_id, [])
+            if agendamento_id is not None:
+                itens.append(((agendamento_id, None), ag_inicio, ag_fim))
+        for serie in await carregar_series(db, inicio, fim, quadra_ids):
+            itens = agendamentos.get(serie.quadra_id)
+            if itens is not None:
+                itens.extend(
+                    ((None, serie.id), ocorrencia.inicio, ocorrencia.fim)
+                    for ocorrencia in ocorrencias(serie, inicio, fim, excecoes_por_data(serie))
+                )
+        return cls(inicio, fim, {quadra_id: IntervalIndex(itens) for quadra_id, itens in agendamentos.items()})
+
+    def quadras_livres(self, inicio: Optional[datetime] = None, fim: Optional[datetime] = None) -> List[int]:
+        inicio, fim = self._janela(inicio, fim)
+        return [quadra_id for quadra_id, indice in self.indices.items() if indice.livre(inicio, fim)]
+
+    def intervalos_livres(self, inicio: Optional[datetime] = None, fim: Optional[datetime] = None) -> Dict[int, List[Intervalo]]:
+        inicio, fim = self._janela(inicio, fim)
+        return {quadra_id: indice.intervalos_livres(inicio, fim) for quadra_id, indice in self.indices.items()}
+
+    def horarios(self, duracao: timedelta, passo: Optional[timedelta] = None) -> Dict[int, List[Intervalo]]:
+        return {
+            quadra_id: indice.horarios(self.inicio, self.fim, duracao, passo)
+            for quadra_id, indice in self.indices.items()
+        }
+
+    def conflitos(self, quadra_id: int, inicio: datetime, fim: datetime) -> List[Tuple[Origem, datetime, datetime]]:
+        inicio, fim = self._janela(inicio, fim)
+        indice = self.indices.get(quadra_id)
+        return indice.conflitos(inicio, fim) if indice else []
+
+    def _janela(self, inicio: Optional[datetime], fim: Optional[datetime]) -> Intervalo:
+        inicio = inicio or self.inicio
+        fim = fim or self.fim
+        if inicio < self.inicio or fim > self.fim:
+            raise ValueError("Period outside of the loaded window")
+        return inicio, fim
+
+async def buscar_conflitos(
+    db: AsyncSession,
+    quadra_id: int,
+    periodos: List[Intervalo],
+    ignorar: Optional[Tuple[int, date]] = None,
+) -> List[Tuple[Origem, datetime, datetime]]:
+    """Conflitos de vários períodos da mesma quadra: agendamentos avulsos em uma única
+    consulta (VALUES dos períodos junto da tabela, pelo índice GiST) e ocorrências das
+    séries da quadra expandidas em memória. `ignorar` exclui a ocorrência (serie_id, data)
+    que está sendo remarcada."""
+    if not periodos:
+        return []
+    pedidos = values(column("inicio", DateTime), column("fim", DateTime), name="periodos").data(periodos)
+    result = await db.execute(
+        select(Agendamento.id, Agendamento.data_hora_inicio, Agendamento.data_hora_fim)
+        .select_from(pedidos)
+        .join(Agendamento, and_(Agendamento.quadra_id == quadra_id, periodo_sobreposto(pedidos.c.inicio, pedidos.c.fim)))
+        .distinct()
+    )
+    conflitos = {((agendamento_id, None), ag_inicio, ag_fim) for agendamento_id, ag_inicio, ag_fim in result}
+
+    inicio = min(periodo_inicio for periodo_inicio, _ in periodos)
+    fim = max(periodo_fim for _, periodo_fim in periodos)
+    indice = IntervalIndex(
+        ((None, serie.id), ocorrencia.inicio, ocorrencia.fim)
+        for serie in await carregar_series(db, inicio, fim, [quadra_id])
+        for ocorrencia in ocorrencias(serie, inicio, fim, excecoes_por_data(serie))
+        if (serie.id, ocorrencia.data) != ignorar
+    )
+    if len(indice):
+        for periodo_inicio, periodo_fim in periodos:
+            conflitos.update(indice.conflitos(periodo_inicio, periodo_fim))
+    return sorted(conflitos, key=lambda conflito: (conflito[1], conflito[2]))
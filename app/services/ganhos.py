@@ -0,0 +1,124 @@
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional
+from sqlalchemy import (
+    Date, Numeric, and_, cast, column, exists, false, func, literal_column, select, true, union_all, values,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..models.aluno import Aluno
+from ..models.ganho import GanhoMensal
+from ..models.professor import Professor
+
+MAX_MESES = 120
+
+class GanhoMes(NamedTuple):
+    mes: date
+    alunos_ativos: int
+    valor_bruto: float
+    valor_ganho: float
+    fechado: bool
+
+def primeiro_dia(dia: date) -> date:
+    return dia.replace(day=1)
+
+def meses(inicio: date, fim: date) -> List[date]:
+    mes, ultimo = primeiro_dia(inicio), primeiro_dia(fim)
+    resultado = []
+    while mes <= ultimo:
+        resultado.append(mes)
+        mes = date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+    return resultado
+
+def _agregado(lista_meses: List[date], professor_id: Optional[int] = None, so_abertos: bool = False):
+    """Ganhos por (professor, mês) em um único GROUP BY: cada aluno conta a partir do
+    mês de cadastro, com a mensalidade menos o desconto do aluno, e o professor recebe
+    o seu percentual sobre esse valor. Com `so_abertos`, só os pares sem fechamento."""
+    tabela = values(column("mes", Date), name="meses").data([(mes,) for mes in lista_meses])
+    valor_aluno = settings.VALOR_MENSALIDADE * (1 - func.coalesce(Aluno.percentual_desconto, 0) / 100.0)
+    stmt = (
+        select(
+            Professor.id.label("professor_id"),
+            tabela.c.mes,
+            func.count(Aluno.id).label("alunos_ativos"),
+            func.coalesce(func.sum(valor_aluno), 0.0).label("valor_bruto"),
+            func.coalesce(func.sum(valor_aluno * func.coalesce(Professor.percentual_padrao, 0) / 100.0), 0.0).label("valor_ganho"),
+        )
+        .select_from(Professor)
+        .join(tabela, literal_column("true"))
+        .outerjoin(
+            Aluno,
+            and_(
+                Aluno.professor_id == Professor.id,
+                Aluno.created_at < tabela.c.mes + literal_column("interval '1 month'"),
+            ),
+        )
+        .group_by(Professor.id, tabela.c.mes)
+    )
+    if professor_id is not None:
+        stmt = stmt.where(Professor.id == professor_id)
+    if so_abertos:
+        stmt = stmt.where(
+            ~exists().where(GanhoMensal.professor_id == Professor.id, GanhoMensal.mes == tabela.c.mes)
+        )
+    return stmt
+
+async def calcular(db: AsyncSession, inicio: date, fim: date, professor_id: Optional[int] = None) -> Dict[int, List[GanhoMes]]:
+    """Pares (professor, mês) já fechados vêm de `ganhos_mensais`; os demais são agregados
+    no banco em uma consulta para todos os professores (ou só para `professor_id`).
+    Um professor cadastrado depois do fechamento do mês entra pelo agregado."""
+    lista_meses = meses(inicio, fim)
+    if len(lista_meses) > MAX_MESES:
+        raise ValueError("Period too long")
+
+    fechados = (
+        select(
+            GanhoMensal.professor_id, GanhoMensal.mes, GanhoMensal.alunos_ativos,
+            GanhoMensal.valor_bruto, GanhoMensal.valor_ganho, true().label("fechado"),
+        )
+        .where(GanhoMensal.mes.between(lista_meses[0], lista_meses[-1]))
+    )
+    if professor_id is not None:
+        fechados = fechados.where(GanhoMensal.professor_id == professor_id)
+    # Uma única consulta: um fechamento concorrente não some entre a leitura dos fechados e a dos abertos
+    abertos = _agregado(lista_meses, professor_id, so_abertos=True).add_columns(false().label("fechado"))
+
+    ganhos: Dict[int, List[GanhoMes]] = {}
+    for row in await db.execute(union_all(fechados, abertos)):
+        ganhos.setdefault(row.professor_id, []).append(
+            GanhoMes(row.mes, row.alunos_ativos, round(float(row.valor_bruto), 2), round(float(row.valor_ganho), 2), row.fechado)
+        )
+    for itens in ganhos.values():
+        itens.sort(key=lambda item: item.mes)
+    return ganhos
+
+async def fechar_mes(db: AsyncSession, mes: date) -> int:
+    """Folha do mês para todos os professores em um único INSERT ... SELECT com upsert.
+    Refazer o fechamento do mesmo mês recalcula os valores."""
+    mes = primeiro_dia(mes)
+    agregado = _agregado([mes]).subquery()
+    agora = func.timezone("utc", func.now())
+    stmt = insert(GanhoMensal).from_select(
+        ["professor_id", "mes", "alunos_ativos", "valor_bruto", "valor_ganho", "created_at", "updated_at"],
+        select(
+            agregado.c.professor_id,
+            agregado.c.mes,
+            agregado.c.alunos_ativos,
+            func.round(cast(agregado.c.valor_bruto, Numeric), 2),
+            func.round(cast(agregado.c.valor_ganho, Numeric), 2),
+            agora,
+            agora,
+        ),
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="ganhos_mensais_professor_mes",
+        set_={
+            "alunos_ativos": stmt.excluded.alunos_ativos,
+            "valor_bruto": stmt.excluded.valor_bruto,
+            "valor_ganho": stmt.excluded.valor_ganho,
+            "updated_at": agora,
+        },
+    ).returning(GanhoMensal.professor_id)
+    professores = (await db.scalars(stmt)).all()
+    await db.commit()
+    return len(professores)
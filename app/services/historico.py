@@ -0,0 +1,188 @@
+import asyncio
+import csv
+import gzip
+import logging
+import os
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import asyncpg
+from ..config import settings
+from ..models.agendamento import Agendamento
+from ..models.comanda import Comanda, ItemComanda
+
+logger = logging.getLogger(__name__)
+
+# Tabelas particionadas por mês (migration 0004); os itens são arquivados junto com as comandas
+PARTICIONADAS = ("agendamentos", "comandas")
+ARQUIVADAS = {
+    "agendamentos": Agendamento.__table__,
+    "comandas": Comanda.__table__,
+    "itens_comanda": ItemComanda.__table__,
+}
+PARTICAO = re.compile(r"^(?P<tabela>[a-z_]+)_(?P<ano>\d{4})_(?P<mes>\d{2})$")
+# Advisory lock da manutenção: com vários workers, só um cria e arquiva partições por vez
+LOCK_MANUTENCAO = 7302001
+
+def somar_meses(mes: date, quantidade: int) -> date:
+    indice = mes.year * 12 + mes.month - 1 + quantidade
+    return date(indice // 12, indice % 12 + 1, 1)
+
+def caminho(tabela: str, mes: date) -> Path:
+    return Path(settings.HISTORICO_DIR) / tabela / f"{mes:%Y-%m}.csv.gz"
+
+def arquivos() -> List[Tuple[str, date, int]]:
+    """(tabela, mês, bytes) de cada mês arquivado."""
+    encontrados = []
+    for tabela in ARQUIVADAS:
+        for arquivo in sorted((Path(settings.HISTORICO_DIR) / tabela).glob("*.csv.gz")):
+            mes = datetime.strptime(arquivo.name[:7], "%Y-%m").date()
+            encontrados.append((tabela, mes, arquivo.stat().st_size))
+    return encontrados
+
+def _conversor(coluna):
+    tipo = coluna.type.python_type
+    return datetime.fromisoformat if tipo is datetime else tipo
+
+def ler(tabela: str, mes: date, filtros: Optional[Dict[str, int]] = None) -> Iterator[dict]:
+    """Linhas de um mês arquivado com os tipos das colunas do model, filtradas por igualdade.
+
+    Leitura síncrona e em streaming: quem serve por HTTP itera em uma thread."""
+    colunas = ARQUIVADAS[tabela].columns
+    filtros = filtros or {}
+    with gzip.open(caminho(tabela, mes), "rt", newline="") as arquivo:
+        leitor = csv.DictReader(arquivo)
+        conversores = {nome: _conversor(colunas[nome]) for nome in leitor.fieldnames}
+        for linha in leitor:
+            # COPY ... CSV grava NULL como campo vazio
+            registro = {nome: conversores[nome](valor) if valor != "" else None for nome, valor in linha.items()}
+            if all(registro.get(nome) == valor for nome, valor in filtros.items()):
+                yield registro
+
+async def _exportar(connection: asyncpg.Connection, consulta: str, destino: Path) -> None:
+    # Arquivo temporário + fsync + rename: o arquivo do mês só aparece completo e em disco
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporario = destino.with_name(destino.name + ".tmp")
+    with open(temporario, "wb") as bruto:
+        with gzip.GzipFile(fileobj=bruto, mode="wb") as arquivo:
+            await connection.copy_from_query(consulta, output=arquivo, format="csv", header=True)
+        bruto.flush()
+        os.fsync(bruto.fileno())
+    os.replace(temporario, destino)
+
+class HistoricoJob:
+    """Manutenção das partições mensais de agendamentos e comandas.
+
+    A cada `HISTORICO_INTERVALO_SECONDS` cria as partições dos próximos
+    `HISTORICO_MESES_FUTUROS` meses e, com `HISTORICO_ARQUIVAR`, exporta para
+    `HISTORICO_DIR` (CSV gzip) e remove as partições anteriores aos últimos
+    `HISTORICO_MESES_ATIVOS` meses, mantendo pequenas as tabelas consultadas."""
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._task: Optional[asyncio.Task] = None
+
+    async def _particoes(self, connection: asyncpg.Connection, tabela: str) -> Dict[date, str]:
+        nomes = await connection.fetch(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = $1::regclass",
+            tabela,
+        )
+        particoes = {}
+        for (nome,) in nomes:
+            encontrado = PARTICAO.match(nome)
+            if encontrado and encontrado["tabela"] == tabela:
+                particoes[date(int(encontrado["ano"]), int(encontrado["mes"]), 1)] = nome
+        return particoes
+
+    async def _criar(self, connection: asyncpg.Connection, tabela: str, hoje: date) -> List[str]:
+        existentes = await self._particoes(connection, tabela)
+        criadas = []
+        for quantidade in range(settings.HISTORICO_MESES_FUTUROS + 1):
+            mes = somar_meses(hoje, quantidade)
+            if mes not in existentes:
+                criadas.append(await connection.fetchval("SELECT criar_particao_mensal($1, $2)", tabela, mes))
+        return criadas
+
+    async def _arquivar_particao(self, connection: asyncpg.Connection, tabela: str, particao: str, mes: date) -> None:
+        async with connection.transaction():
+            # Sem escritas no mês durante a exportação; o DETACH e o DROP saem no mesmo commit
+            await connection.execute(f"LOCK TABLE {particao} IN SHARE MODE")
+            await _exportar(connection, f"SELECT * FROM {particao} ORDER BY id", caminho(tabela, mes))
+            if tabela == "comandas":
+                await _exportar(
+                    connection,
+                    f"SELECT i.* FROM itens_comanda i JOIN {particao} c ON c.id = i.comanda_id ORDER BY i.id",
+                    caminho("itens_comanda", mes),
+                )
+                # Os contadores de vendas continuam valendo: o trigger de remoção ignora a manutenção
+                await connection.execute("SET LOCAL arena.manutencao = 'on'")
+                await connection.execute(f"DELETE FROM itens_comanda WHERE comanda_id IN (SELECT id FROM {particao})")
+            # O DETACH trava a tabela inteira: melhor desistir e tentar no próximo ciclo do que enfileirar requests
+            await connection.execute("SET LOCAL lock_timeout = '5s'")
+            await connection.execute(f"ALTER TABLE {tabela} DETACH PARTITION {particao}")
+            await connection.execute(f"DROP TABLE {particao}")
+
+    async def _arquivar(self, connection: asyncpg.Connection, tabela: str, hoje: date) -> List[str]:
+        limite = somar_meses(hoje, -settings.HISTORICO_MESES_ATIVOS)
+        arquivadas = []
+        for mes, particao in sorted((await self._particoes(connection, tabela)).items()):
+            if mes >= limite:
+                break
+            if tabela == "comandas" and await connection.fetchval(
+                f"SELECT EXISTS (SELECT 1 FROM {particao} WHERE status = 'aberta')"
+            ):
+                logger.warning("Partition %s still has open comandas, not archiving", particao)
+                continue
+            try:
+                await self._arquivar_particao(connection, tabela, particao, mes)
+            except asyncpg.PostgresError as exc:
+                logger.warning("Could not archive partition %s: %s", particao, exc)
+                continue
+            arquivadas.append(particao)
+        return arquivadas
+
+    async def executar(self) -> Dict[str, List[str]]:
+        """Um ciclo de manutenção; devolve as partições criadas e as arquivadas."""
+        resultado: Dict[str, List[str]] = {"criadas": [], "arquivadas": []}
+        hoje = date.today().replace(day=1)
+        connection = await asyncpg.connect(self.dsn)
+        try:
+            if not await connection.fetchval("SELECT pg_try_advisory_lock($1)", LOCK_MANUTENCAO):
+                return resultado
+            try:
+                for tabela in PARTICIONADAS:
+                    resultado["criadas"] += await self._criar(connection, tabela, hoje)
+                    if settings.HISTORICO_ARQUIVAR:
+                        resultado["arquivadas"] += await self._arquivar(connection, tabela, hoje)
+            finally:
+                await connection.execute("SELECT pg_advisory_unlock($1)", LOCK_MANUTENCAO)
+        finally:
+            await connection.close()
+        return resultado
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                resultado = await self.executar()
+                if resultado["criadas"] or resultado["arquivadas"]:
+                    logger.info(
+                        "History maintenance: created %s, archived %s", resultado["criadas"], resultado["arquivadas"]
+                    )
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning("History maintenance failed: %s", exc)
+            await asyncio.sleep(settings.HISTORICO_INTERVALO_SECONDS)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import random
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import case, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..core.cluster import cluster
+from ..database import SessionLocal
+from ..models.job import Job, StatusJob
+from . import ganhos
+
+logger = logging.getLogger(__name__)
+
+Tarefa = Callable[[AsyncSession, dict], Awaitable[Any]]
+
+# Tipos de job conhecidos; o resultado de cada um precisa ser serializável em JSON
+TAREFAS: Dict[str, Tarefa] = {}
+
+def tarefa(tipo: str) -> Callable[[Tarefa], Tarefa]:
+    def registrar(funcao: Tarefa) -> Tarefa:
+        TAREFAS[tipo] = funcao
+        return funcao
+    return registrar
+
+@tarefa("ganhos.fechamento")
+async def _fechar_ganhos(db: AsyncSession, payload: dict) -> dict:
+    mes = date.fromisoformat(payload["mes"])
+    return {"mes": ganhos.primeiro_dia(mes).isoformat(), "professores": await ganhos.fechar_mes(db, mes)}
+
+def backoff(tentativas: int) -> float:
+    """Espera antes da próxima tentativa: exponencial, com teto e jitter para não sincronizar os retries."""
+    espera = min(settings.JOBS_BACKOFF_SECONDS * 2 ** (tentativas - 1), settings.JOBS_BACKOFF_MAX_SECONDS)
+    return espera * random.uniform(0.5, 1.0)
+
+async def enfileirar(
+    db: AsyncSession, tipo: str, payload: Optional[dict] = None, criado_por: Optional[int] = None
+) -> Job:
+    if tipo not in TAREFAS:
+        raise ValueError(f"Unknown job type: {tipo}")
+    job = Job(
+        tipo=tipo,
+        payload=payload or {},
+        status=StatusJob.PENDENTE,
+        tentativas=0,
+        max_tentativas=settings.JOBS_MAX_TENTATIVAS,
+        executar_em=datetime.utcnow(),
+        criado_por=criado_por,
+    )
+    db.add(job)
+    await db.commit()
+    job_queue.acordar()
+    return job
+
+class JobQueue:
+    """Pool de `JOBS_WORKERS` tarefas asyncio consumindo a tabela `jobs`.
+
+    Cada worker reserva um job por vez com `FOR UPDATE SKIP LOCKED` e confirma a reserva
+    antes de executar, então vários processos consomem a mesma fila sem bloquear uns aos
+    outros e sem manter transação aberta durante o job. Falhas voltam para a fila com
+    backoff até `max_tentativas`; jobs de um processo que morreu são devolvidos depois
+    do dobro de `JOBS_TIMEOUT_SECONDS`."""
+
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+        self._acordar = asyncio.Event()
+
+    def acordar(self) -> None:
+        self._acordar.set()
+        cluster.publicar("jobs")
+
+    async def _reservar(self, db: AsyncSession) -> Optional[Job]:
+        agora = datetime.utcnow()
+        proximo = (
+            select(Job.id)
+            .where(Job.status == StatusJob.PENDENTE, Job.executar_em <= agora)
+            .order_by(Job.executar_em)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        job = await db.scalar(
+            update(Job)
+            .where(Job.id == proximo)
+            .values(status=StatusJob.EXECUTANDO, tentativas=Job.tentativas + 1, iniciado_em=agora, updated_at=agora)
+            .returning(Job)
+        )
+        await db.commit()
+        return job
+
+    async def _recuperar(self, db: AsyncSession) -> int:
+        # Passado o dobro do timeout o job certamente não está mais rodando; sem tentativas, falha
+        agora = datetime.utcnow()
+        limite = agora - timedelta(seconds=2 * settings.JOBS_TIMEOUT_SECONDS)
+        result = await db.execute(
+            update(Job)
+            .where(Job.status == StatusJob.EXECUTANDO, Job.iniciado_em < limite)
+            .values(
+                status=case((Job.tentativas >= Job.max_tentativas, StatusJob.FALHOU), else_=StatusJob.PENDENTE),
+                erro="Worker stopped while running the job",
+                executar_em=agora,
+                updated_at=agora,
+            )
+        )
+        await db.commit()
+        return result.rowcount
+
+    async def _finalizar(self, job: Job, **valores) -> None:
+        async with SessionLocal() as db:
+            await db.execute(update(Job).where(Job.id == job.id).values(updated_at=datetime.utcnow(), **valores))
+            await db.commit()
+
+    async def _executar(self, job: Job) -> None:
+        try:
+            async with SessionLocal() as db:
+                resultado = await asyncio.wait_for(TAREFAS[job.tipo](db, job.payload), settings.JOBS_TIMEOUT_SECONDS)
+        except asyncio.CancelledError:
+            # Desligamento no meio do job: volta para a fila sem gastar a tentativa
+            await asyncio.shield(self._finalizar(
+                job, status=StatusJob.PENDENTE, tentativas=Job.tentativas - 1, executar_em=datetime.utcnow()
+            ))
+            raise
+        except Exception as exc:
+            erro = f"{type(exc).__name__}: {exc}"
+            if job.tentativas < job.max_tentativas:
+                espera = backoff(job.tentativas)
+                logger.warning("Job %s (%s) failed, retrying in %.0fs: %s", job.id, job.tipo, espera, erro)
+                await self._finalizar(
+                    job, status=StatusJob.PENDENTE, erro=erro,
+                    executar_em=datetime.utcnow() + timedelta(seconds=espera),
+                )
+            else:
+                logger.error("Job %s (%s) failed after %s attempts: %s", job.id, job.tipo, job.tentativas, erro)
+                await self._finalizar(job, status=StatusJob.FALHOU, erro=erro, concluido_em=datetime.utcnow())
+            return
+        await self._finalizar(
+            job, status=StatusJob.CONCLUIDO, resultado=resultado, erro=None, concluido_em=datetime.utcnow()
+        )
+
+    async def _worker(self, recuperar: bool) -> None:
+        while True:
+            # Limpo antes de consultar: um job enfileirado durante a consulta não espera o intervalo
+            self._acordar.clear()
+            try:
+                async with SessionLocal() as db:
+                    job = await self._reservar(db)
+                    if job is None and recuperar:
+                        await self._recuperar(db)
+            except Exception as exc:
+                logger.warning("Job queue unavailable: %s", exc)
+                job = None
+            if job is not None:
+                await self._executar(job)
+                continue
+            # Fila vazia: dorme até o próximo job enfileirado (aqui ou em outro worker) ou o intervalo
+            try:
+                await asyncio.wait_for(self._acordar.wait(), settings.JOBS_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if not self._tasks:
+            # Só o primeiro worker procura jobs abandonados
+            self._tasks = [
+                asyncio.create_task(self._worker(recuperar=n == 0)) for n in range(settings.JOBS_WORKERS)
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+job_queue = JobQueue()
+cluster.registrar("jobs", job_queue._acordar.set)
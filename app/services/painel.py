@@ -0,0 +1,213 @@
+import asyncio
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..models.indicador import OcupacaoHoraria, ReceitaComandasDiaria
+
+HORAS = 24
+# Dias alocados além do último com dados: agendamentos futuros não realocam os arrays a cada novo dia
+FOLGA_DIAS = 90
+# Linhas lidas por vez dos indicadores, para não materializar a tabela inteira em objetos Python
+LOTE = 50000
+
+def _dias(dias: Sequence[date]) -> np.ndarray:
+    return np.array(dias, dtype="datetime64[D]")
+
+class CuboIndicadores:
+    """Indicadores em arrays NumPy: minutos ocupados e receita por (quadra, dia, hora)
+    e receita do bar por dia, a partir de `inicio`.
+
+    Uma faixa de datas é uma fatia do eixo de dias e as agregações são vetoriais,
+    então o custo de uma consulta depende só do tamanho da faixa e do número de
+    quadras, nunca de quantos agendamentos existem."""
+
+    def __init__(self, inicio: Optional[date] = None):
+        self.inicio = inicio
+        self.quadra_ids = np.zeros(0, dtype=np.int64)
+        self.minutos = np.zeros((0, 0, HORAS), dtype=np.float32)
+        self.receita = np.zeros((0, 0, HORAS))
+        self.receita_comandas = np.zeros(0)
+        self.comandas = np.zeros(0, dtype=np.int64)
+
+    @property
+    def dias(self) -> int:
+        return self.minutos.shape[1]
+
+    def _indice(self, dia: date) -> int:
+        return (dia - self.inicio).days
+
+    def _linhas(self, quadra_ids: np.ndarray) -> np.ndarray:
+        mapa = np.full(int(max(self.quadra_ids.max(initial=0), quadra_ids.max(initial=0))) + 1, -1)
+        mapa[self.quadra_ids] = np.arange(len(self.quadra_ids))
+        return mapa[quadra_ids]
+
+    def _garantir(self, quadra_ids: np.ndarray, dias: np.ndarray) -> None:
+        """Aumenta os arrays para incluir as quadras e os dias informados."""
+        if self.inicio is None:
+            self.inicio = dias.min().item()
+        novas = np.setdiff1d(quadra_ids, self.quadra_ids)
+        antes = max(0, -self._indice(dias.min().item()))
+        depois = max(0, self._indice(dias.max().item()) + 1 - self.dias)
+        if depois:
+            depois += FOLGA_DIAS
+        if not (len(novas) or antes or depois):
+            return
+        self.minutos = np.pad(self.minutos, ((0, len(novas)), (antes, depois), (0, 0)))
+        self.receita = np.pad(self.receita, ((0, len(novas)), (antes, depois), (0, 0)))
+        self.receita_comandas = np.pad(self.receita_comandas, (antes, depois))
+        self.comandas = np.pad(self.comandas, (antes, depois))
+        self.quadra_ids = np.concatenate([self.quadra_ids, novas])
+        self.inicio -= timedelta(days=antes)
+
+    def aplicar_ocupacao(self, quadra_ids, dias, horas, minutos, receita) -> None:
+        """Grava valores absolutos dos indicadores (linhas de `ocupacao_horaria`)."""
+        quadra_ids = np.asarray(quadra_ids, dtype=np.int64)
+        dias = _dias(dias)
+        self._garantir(quadra_ids, dias)
+        indices = (dias - np.datetime64(self.inicio, "D")).astype(np.int64)
+        linhas = self._linhas(quadra_ids)
+        horas = np.asarray(horas, dtype=np.int64)
+        self.minutos[linhas, indices, horas] = minutos
+        self.receita[linhas, indices, horas] = receita
+
+    def aplicar_comandas(self, dias, comandas, receita) -> None:
+        dias = _dias(dias)
+        self._garantir(np.zeros(0, dtype=np.int64), dias)
+        indices = (dias - np.datetime64(self.inicio, "D")).astype(np.int64)
+        self.comandas[indices] = comandas
+        self.receita_comandas[indices] = receita
+
+    def _fatia(self, inicio: date, fim: date) -> Tuple[slice, slice]:
+        """Fatia do cubo coberta por [inicio, fim] e a posição correspondente na faixa pedida."""
+        total = (fim - inicio).days + 1
+        if self.inicio is None:
+            return slice(0, 0), slice(0, 0)
+        a = min(max(self._indice(inicio), 0), self.dias)
+        b = min(max(self._indice(fim) + 1, a), self.dias)
+        deslocamento = a - self._indice(inicio)
+        return slice(a, b), slice(deslocamento, min(deslocamento + b - a, total))
+
+    def ocupacao(self, inicio: date, fim: date, quadra_ids: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Percentual ocupado de cada quadra por dia da semana (segunda = 0) e hora, (quadras, 7, 24),
+        e o total de minutos ocupados de cada quadra no período."""
+        total = (fim - inicio).days + 1
+        semana = (np.arange(total) + inicio.weekday()) % 7
+        somas = np.zeros((len(quadra_ids), 7, HORAS))
+        cubo, faixa = self._fatia(inicio, fim)
+        ids = np.asarray(quadra_ids, dtype=np.int64)
+        conhecidas = np.isin(ids, self.quadra_ids)
+        if cubo.stop > cubo.start and conhecidas.any():
+            bloco = self.minutos[self._linhas(ids[conhecidas]), cubo, :]
+            somas[conhecidas] = np.einsum("qdh,dw->qwh", bloco, np.eye(7)[semana[faixa]])
+        # Dias fora do cubo (sem nenhum agendamento) contam como ociosos
+        minutos_possiveis = np.bincount(semana, minlength=7)[None, :, None] * 60.0
+        percentuais = np.divide(somas * 100, minutos_possiveis, out=np.zeros_like(somas), where=minutos_possiveis > 0)
+        return percentuais, somas.sum(axis=(1, 2))
+
+    def receita_diaria(self, inicio: date, fim: date) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Receita de agendamentos, receita do bar e comandas pagas de cada dia de [inicio, fim]."""
+        total = (fim - inicio).days + 1
+        agendamentos, bar, comandas = np.zeros(total), np.zeros(total), np.zeros(total, dtype=np.int64)
+        cubo, faixa = self._fatia(inicio, fim)
+        if cubo.stop > cubo.start:
+            agendamentos[faixa] = self.receita[:, cubo, :].sum(axis=(0, 2))
+            bar[faixa] = self.receita_comandas[cubo]
+            comandas[faixa] = self.comandas[cubo]
+        return agendamentos, bar, comandas
+
+    def salvar(self, caminho: str, **marcas: datetime) -> None:
+        # Arquivo temporário por processo + rename: vários workers podem gravar o mesmo snapshot
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "wb") as arquivo:
+            np.savez(
+                arquivo,
+                inicio=np.datetime64(self.inicio or date.min, "D"),
+                quadra_ids=self.quadra_ids,
+                minutos=self.minutos,
+                receita=self.receita,
+                receita_comandas=self.receita_comandas,
+                comandas=self.comandas,
+                **{nome: np.datetime64(valor, "us") for nome, valor in marcas.items()},
+            )
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def carregar(cls, caminho: str) -> Tuple["CuboIndicadores", Dict[str, datetime]]:
+        with np.load(caminho) as dados:
+            cubo = cls()
+            inicio = dados["inicio"].item()
+            cubo.inicio = None if inicio == date.min else inicio
+            cubo.quadra_ids = dados["quadra_ids"]
+            cubo.minutos = dados["minutos"]
+            cubo.receita = dados["receita"]
+            cubo.receita_comandas = dados["receita_comandas"]
+            cubo.comandas = dados["comandas"]
+            marcas = {nome: dados[nome].item() for nome in ("marca", "carga") if nome in dados.files}
+        return cubo, marcas
+
+class PainelEngine:
+    """Cubo de indicadores do painel, sincronizado com as tabelas mantidas pelos triggers.
+
+    A cada `PAINEL_TTL_SECONDS` relê só as linhas alteradas desde a sincronização
+    anterior (com `PAINEL_MARGEM_SECONDS` de folga para transações longas) e, a cada
+    `PAINEL_RECARGA_SECONDS`, recarrega tudo. O cubo é gravado em `PAINEL_SNAPSHOT`
+    (.npz) para que um worker novo só precise buscar o que mudou desde o snapshot."""
+
+    def __init__(self):
+        self._cubo: Optional[CuboIndicadores] = None
+        self._marca: Optional[datetime] = None
+        self._carga: Optional[datetime] = None
+        self._expira = 0.0
+        self._salvo = 0.0
+        self._lock = asyncio.Lock()
+
+    def _valido(self) -> bool:
+        return self._cubo is not None and self._expira > time.monotonic()
+
+    async def cubo(self, db: AsyncSession) -> CuboIndicadores:
+        if self._valido():
+            return self._cubo
+        async with self._lock:
+            if not self._valido():
+                await self._sincronizar(db)
+        return self._cubo
+
+    async def _sincronizar(self, db: AsyncSession) -> None:
+        if self._cubo is None and settings.PAINEL_SNAPSHOT and os.path.exists(settings.PAINEL_SNAPSHOT):
+            cubo, marcas = await asyncio.to_thread(CuboIndicadores.carregar, settings.PAINEL_SNAPSHOT)
+            self._cubo, self._marca, self._carga = cubo, marcas.get("marca"), marcas.get("carga")
+            self._salvo = time.monotonic()
+        agora = datetime.utcnow()
+        completa = (
+            self._cubo is None or self._marca is None or self._carga is None
+            or agora - self._carga > timedelta(seconds=settings.PAINEL_RECARGA_SECONDS)
+        )
+        cubo = CuboIndicadores() if completa else self._cubo
+        ocupacao = select(
+            OcupacaoHoraria.quadra_id, OcupacaoHoraria.dia, OcupacaoHoraria.hora,
+            OcupacaoHoraria.minutos, OcupacaoHoraria.receita,
+        )
+        bar = select(ReceitaComandasDiaria.dia, ReceitaComandasDiaria.comandas, ReceitaComandasDiaria.receita)
+        if not completa:
+            desde = self._marca - timedelta(seconds=settings.PAINEL_MARGEM_SECONDS)
+            ocupacao = ocupacao.where(OcupacaoHoraria.atualizado_em >= desde)
+            bar = bar.where(ReceitaComandasDiaria.atualizado_em >= desde)
+        async for lote in (await db.stream(ocupacao)).partitions(LOTE):
+            cubo.aplicar_ocupacao(*zip(*lote))
+        async for lote in (await db.stream(bar)).partitions(LOTE):
+            cubo.aplicar_comandas(*zip(*lote))
+        self._cubo, self._marca = cubo, agora
+        if completa:
+            self._carga = agora
+        self._expira = time.monotonic() + settings.PAINEL_TTL_SECONDS
+        if settings.PAINEL_SNAPSHOT and (completa or time.monotonic() - self._salvo > settings.PAINEL_SNAPSHOT_SECONDS):
+            await asyncio.to_thread(cubo.salvar, settings.PAINEL_SNAPSHOT, marca=self._marca, carga=self._carga)
+            self._salvo = time.monotonic()
+
+painel_engine = PainelEngine()
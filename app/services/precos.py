@@ -0,0 +1,119 @@
+import asyncio
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Sequence
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..core.cluster import cluster
+from ..models.quadra import Quadra
+
+MINUTOS_SEMANA = 7 * 24 * 60
+# Uma segunda-feira à meia-noite: minutos desde ela, módulo a semana, dão a posição na grade
+REFERENCIA = np.datetime64("2024-01-01T00:00", "m")
+
+@lru_cache(maxsize=1)
+def _grade_semana() -> Dict[str, np.ndarray]:
+    """Máscaras booleanas por minuto da semana (segunda 00:00 = 0) para cada faixa de preço."""
+    minutos = np.arange(MINUTOS_SEMANA)
+    dia = minutos // 1440
+    hora = (minutos % 1440) / 60
+    pico = (dia < 5) & (hora >= settings.PRECO_PICO_INICIO) & (hora < settings.PRECO_PICO_FIM)
+    if settings.PRECO_PICO_FIM_DE_SEMANA:
+        pico |= dia >= 5
+    noite = (hora >= settings.PRECO_NOITE_INICIO) | (hora < settings.PRECO_NOITE_FIM)
+    return {"pico": pico, "noite": noite}
+
+def minutos(instantes: Sequence[datetime]) -> np.ndarray:
+    # Minutos fracionários: horários com segundos são cobrados pelo tempo exato, como horas × valor_hora
+    return (np.array(instantes, dtype="datetime64[us]") - REFERENCIA) / np.timedelta64(1, "m")
+
+class TabelaPrecos:
+    """Tabela de preços por quadra e minuto da semana, guardada como soma acumulada.
+
+    O preço de qualquer período é C[fim] - C[inicio] (com voltas inteiras da semana
+    somadas à parte), então cotar N horários é um punhado de operações vetoriais,
+    sem laço em Python nem consulta por horário."""
+
+    def __init__(self, quadras: Iterable):
+        quadras = list(quadras)
+        grade = _grade_semana()
+        self.linhas = {quadra.id: linha for linha, quadra in enumerate(quadras)}
+        # Valor por hora em cada minuto da semana: base, pico e cobertura multiplicam; iluminação soma
+        valor_hora = np.array([quadra.valor_hora or 0.0 for quadra in quadras])[:, None]
+        coberta = np.array([bool(quadra.coberta) for quadra in quadras])[:, None]
+        iluminacao = np.array([bool(quadra.iluminacao) for quadra in quadras])[:, None]
+        tarifa = valor_hora * np.where(grade["pico"], settings.PRECO_PICO_MULTIPLICADOR, 1.0)
+        tarifa = tarifa * np.where(coberta, settings.PRECO_COBERTA_MULTIPLICADOR, 1.0)
+        tarifa = tarifa + np.where(iluminacao & grade["noite"], settings.PRECO_ILUMINACAO_HORA, 0.0)
+        self.acumulado = np.zeros((len(quadras), MINUTOS_SEMANA + 1))
+        np.cumsum(tarifa / 60.0, axis=1, out=self.acumulado[:, 1:])
+        self.semana = self.acumulado[:, -1]
+
+    def _ate(self, linhas: np.ndarray, minuto: np.ndarray) -> np.ndarray:
+        voltas, resto = np.divmod(minuto, MINUTOS_SEMANA)
+        inteiro = resto.astype(np.int64)
+        # Dentro do minuto a tarifa é constante: interpola entre as somas acumuladas vizinhas
+        fracao = resto - inteiro
+        proximo = np.minimum(inteiro + 1, MINUTOS_SEMANA)
+        parcial = fracao * (self.acumulado[linhas, proximo] - self.acumulado[linhas, inteiro])
+        return voltas * self.semana[linhas] + self.acumulado[linhas, inteiro] + parcial
+
+    def cotar(self, quadra_ids: Sequence[int], inicios: Sequence[datetime], fins: Sequence[datetime]) -> np.ndarray:
+        """Preço de cada (quadra, início, fim), arredondado em centavos."""
+        if not len(quadra_ids):
+            return np.zeros(0)
+        linhas = np.array([self.linhas[quadra_id] for quadra_id in quadra_ids])
+        valores = self._ate(linhas, minutos(fins)) - self._ate(linhas, minutos(inicios))
+        return np.round(valores, 2)
+
+    def preco(self, quadra_id: int, inicio: datetime, fim: datetime) -> float:
+        return float(self.cotar([quadra_id], [inicio], [fim])[0])
+
+class PricingEngine:
+    """Tabela de todas as quadras para cotações em lote, recarregada após
+    `PRECO_TABELA_TTL_SECONDS` ou quando uma quadra muda (em qualquer worker).
+
+    Valores gravados em agendamentos não passam por aqui: são calculados com a
+    quadra lida (e travada) no próprio request."""
+
+    def __init__(self):
+        self._tabela: Optional[TabelaPrecos] = None
+        self._expira = 0.0
+        self._lock = asyncio.Lock()
+
+    def _valida(self, quadra_ids: Iterable[int]) -> bool:
+        # Quadra criada em outro worker depois da carga também força recarregar
+        return (
+            self._tabela is not None
+            and self._expira > time.monotonic()
+            and all(quadra_id in self._tabela.linhas for quadra_id in quadra_ids)
+        )
+
+    async def tabela(self, db: AsyncSession, quadra_ids: Iterable[int] = ()) -> TabelaPrecos:
+        quadra_ids = list(quadra_ids)
+        if self._valida(quadra_ids):
+            return self._tabela
+        async with self._lock:
+            if not self._valida(quadra_ids):
+                quadras = (await db.execute(
+                    select(Quadra.id, Quadra.valor_hora, Quadra.coberta, Quadra.iluminacao)
+                )).all()
+                self._tabela = TabelaPrecos(quadras)
+                self._expira = time.monotonic() + settings.PRECO_TABELA_TTL_SECONDS
+        return self._tabela
+
+    def invalidar(self) -> None:
+        self._descartar()
+        cluster.publicar("precos")
+
+    def _descartar(self) -> None:
+        self._tabela = None
+
+def preco(quadra: Quadra, inicio: datetime, fim: datetime) -> float:
+    return TabelaPrecos([quadra]).preco(quadra.id, inicio, fim)
+
+pricing_engine = PricingEngine()
+cluster.registrar("precos", pricing_engine._descartar)
@@ -0,0 +1,305 @@
+import asyncio
+import random
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import Integer, column, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.cluster import cluster
+from ..models.ranking import Ranking, ParticipanteRanking
+
+Chave = Tuple[int, int]
+# Acima disso o lote não cabe em um datagrama do cluster: os outros workers recarregam o placar
+MAX_PONTOS_CLUSTER = 2000
+
+class _Node:
+    __slots__ = ("key", "priority", "left", "right", "size")
+
+    def __init__(self, key: Chave):
+        self.key = key
+        self.priority = random.random()
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+        self.size = 1
+
+def _size(node: Optional[_Node]) -> int:
+    return node.size if node else 0
+
+def _update(node: _Node) -> _Node:
+    node.size = 1 + _size(node.left) + _size(node.right)
+    return node
+
+def _split(node: Optional[_Node], key: Chave) -> Tuple[Optional[_Node], Optional[_Node]]:
+    # (chaves < key, chaves >= key)
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        return _update(node), right
+    left, node.left = _split(node.left, key)
+    return left, _update(node)
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    if left is None or right is None:
+        return left or right
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return _update(left)
+    right.left = _merge(left, right.left)
+    return _update(right)
+
+def _remove(node: Optional[_Node], key: Chave) -> Optional[_Node]:
+    if node is None:
+        return None
+    if node.key == key:
+        return _merge(node.left, node.right)
+    if key < node.key:
+        node.left = _remove(node.left, key)
+    else:
+        node.right = _remove(node.right, key)
+    return _update(node)
+
+class OrderStatisticTree:
+    """Treap com tamanho de subárvore: inserção, remoção, posição e k-ésimo em O(log n)."""
+
+    def __init__(self):
+        self._root: Optional[_Node] = None
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def insert(self, key: Chave) -> None:
+        left, right = _split(self._root, key)
+        self._root = _merge(_merge(left, _Node(key)), right)
+
+    def remove(self, key: Chave) -> None:
+        self._root = _remove(self._root, key)
+
+    def rank(self, key: Chave) -> int:
+        # Quantidade de chaves menores que `key`
+        node, rank = self._root, 0
+        while node:
+            if key <= node.key:
+                node = node.left
+            else:
+                rank += _size(node.left) + 1
+                node = node.right
+        return rank
+
+    def kth(self, k: int) -> Chave:
+        node = self._root
+        while node:
+            left = _size(node.left)
+            if k < left:
+                node = node.left
+            elif k == left:
+                return node.key
+            else:
+                k -= left + 1
+                node = node.right
+        raise IndexError(k)
+
+    def slice(self, start: int, stop: int) -> List[Chave]:
+        # Percurso em ordem a partir da posição `start`, sem visitar as subárvores anteriores
+        result: List[Chave] = []
+        stack: List[_Node] = []
+        node, skip = self._root, max(start, 0)
+        while node:
+            left = _size(node.left)
+            if skip < left:
+                stack.append(node)
+                node = node.left
+            else:
+                skip -= left
+                if skip == 0:
+                    stack.append(node)
+                    break
+                skip -= 1
+                node = node.right
+        count = min(stop, len(self)) - max(start, 0)
+        while stack and len(result) < count:
+            node = stack.pop()
+            result.append(node.key)
+            node = node.right
+            while node:
+                stack.append(node)
+                node = node.left
+        return result
+
+class Leaderboard:
+    """Classificação de um ranking, ordenada por pontos (desc) e jogador_id."""
+
+    def __init__(self, participantes: Iterable[Tuple[int, int]] = ()):
+        self._pontos: Dict[int, int] = {}
+        self._arvore = OrderStatisticTree()
+        for jogador_id, pontos in participantes:
+            self.set_pontos(jogador_id, pontos)
+
+    def __len__(self) -> int:
+        return len(self._pontos)
+
+    def __contains__(self, jogador_id: int) -> bool:
+        return jogador_id in self._pontos
+
+    def set_pontos(self, jogador_id: int, pontos: int) -> None:
+        atual = self._pontos.get(jogador_id)
+        if atual == pontos:
+            return
+        if atual is not None:
+            self._arvore.remove((-atual, jogador_id))
+        self._pontos[jogador_id] = pontos
+        self._arvore.insert((-pontos, jogador_id))
+
+    def remove(self, jogador_id: int) -> None:
+        atual = self._pontos.pop(jogador_id, None)
+        if atual is not None:
+            self._arvore.remove((-atual, jogador_id))
+
+    def posicao(self, jogador_id: int) -> int:
+        return self._arvore.rank((-self._pontos[jogador_id], jogador_id)) + 1
+
+    def faixa(self, inicio: int, fim: int) -> List[Tuple[int, int, int]]:
+        # (posição, jogador_id, pontos) com posições 1-based no intervalo [inicio, fim)
+        inicio = max(inicio, 1)
+        return [
+            (inicio + i, jogador_id, -pontos_neg)
+            for i, (pontos_neg, jogador_id) in enumerate(self._arvore.slice(inicio - 1, fim - 1))
+        ]
+
+    def top(self, n: int) -> List[Tuple[int, int, int]]:
+        return self.faixa(1, n + 1)
+
+    def vizinhanca(self, jogador_id: int, raio: int) -> List[Tuple[int, int, int]]:
+        posicao = self.posicao(jogador_id)
+        return self.faixa(posicao - raio, posicao + raio + 1)
+
+class RankingEngine:
+    """Mantém um Leaderboard em memória por ranking.
+
+    O snapshot é carregado do banco no primeiro acesso; resultados são gravados
+    com um único UPDATE por lote e o placar em memória é atualizado a partir dos
+    valores devolvidos pelo RETURNING, de modo que o banco segue como fonte da verdade.
+
+    Resultados gravados enquanto um snapshot é carregado não chegam ao placar, que
+    ainda não existe: durante a carga os jogadores alterados são anotados e relidos
+    depois que o placar é publicado."""
+
+    def __init__(self):
+        self._boards: Dict[int, Leaderboard] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+        # Uma entrada por carga em andamento: ranking_id -> jogadores alterados (None = placar descartado)
+        self._observadores: List[Dict[int, Optional[Set[int]]]] = []
+
+    @contextmanager
+    def _observando(self) -> Iterator[Dict[int, Optional[Set[int]]]]:
+        tocados: Dict[int, Optional[Set[int]]] = {}
+        self._observadores.append(tocados)
+        try:
+            yield tocados
+        finally:
+            self._observadores.remove(tocados)
+
+    async def _reconciliar(self, db: AsyncSession, tocados: Dict[int, Optional[Set[int]]]) -> None:
+        # Cada rodada relê o que mudou na anterior; o que mudar durante a releitura entra na próxima
+        while tocados:
+            lote = dict(tocados)
+            tocados.clear()
+            for ranking_id, jogadores in lote.items():
+                if jogadores is None:
+                    self._boards.pop(ranking_id, None)
+                    continue
+                if ranking_id not in self._boards:
+                    continue
+                result = await db.execute(
+                    select(ParticipanteRanking.jogador_id, ParticipanteRanking.pontos)
+                    .where(ParticipanteRanking.ranking_id == ranking_id, ParticipanteRanking.jogador_id.in_(jogadores))
+                )
+                board = self._boards.get(ranking_id)
+                if board is not None:
+                    for jogador_id, pontos in result:
+                        board.set_pontos(jogador_id, pontos or 0)
+
+    async def get(self, db: AsyncSession, ranking_id: int) -> Optional[Leaderboard]:
+        board = self._boards.get(ranking_id)
+        if board is not None:
+            return board
+        lock = self._locks.setdefault(ranking_id, asyncio.Lock())
+        async with lock:
+            board = self._boards.get(ranking_id)
+            if board is None:
+                # Só mantemos placares de rankings existentes em memória
+                if await db.scalar(select(Ranking.id).where(Ranking.id == ranking_id)) is None:
+                    return None
+                with self._observando() as tocados:
+                    result = await db.execute(
+                        select(ParticipanteRanking.jogador_id, ParticipanteRanking.pontos)
+                        .where(ParticipanteRanking.ranking_id == ranking_id)
+                    )
+                    board = Leaderboard((jogador_id, pontos or 0) for jogador_id, pontos in result)
+                    self._boards[ranking_id] = board
+                    await self._reconciliar(db, tocados)
+        return board
+
+    async def aquecer(self, db: AsyncSession) -> int:
+        # Todos os placares em uma consulta, para a subida do worker
+        with self._observando() as tocados:
+            result = await db.execute(
+                select(Ranking.id, ParticipanteRanking.jogador_id, ParticipanteRanking.pontos)
+                .outerjoin(ParticipanteRanking, ParticipanteRanking.ranking_id == Ranking.id)
+            )
+            participantes: Dict[int, List[Tuple[int, int]]] = {}
+            for ranking_id, jogador_id, pontos in result:
+                itens = participantes.setdefault(ranking_id, [])
+                if jogador_id is not None:
+                    itens.append((jogador_id, pontos or 0))
+            for ranking_id, itens in participantes.items():
+                self._boards.setdefault(ranking_id, Leaderboard(itens))
+            await self._reconciliar(db, tocados)
+        return len(participantes)
+
+    async def registrar_resultados(self, db: AsyncSession, ranking_id: int, resultados: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        deltas: Dict[int, int] = {}
+        for jogador_id, pontos in resultados:
+            deltas[jogador_id] = deltas.get(jogador_id, 0) + pontos
+        if not deltas:
+            return []
+        lote = values(column("jogador_id", Integer), column("delta", Integer), name="resultados").data(list(deltas.items()))
+        result = await db.execute(
+            update(ParticipanteRanking)
+            .where(ParticipanteRanking.ranking_id == ranking_id, ParticipanteRanking.jogador_id == lote.c.jogador_id)
+            .values(pontos=ParticipanteRanking.pontos + lote.c.delta)
+            .returning(ParticipanteRanking.jogador_id, ParticipanteRanking.pontos)
+        )
+        atualizados = [tuple(linha) for linha in result.all()]
+        await db.commit()
+        self._aplicar(ranking_id, atualizados)
+        cluster.publicar("ranking", ranking_id, atualizados if len(atualizados) <= MAX_PONTOS_CLUSTER else None)
+        return atualizados
+
+    def set_participante(self, ranking_id: int, jogador_id: int, pontos: int) -> None:
+        self._aplicar(ranking_id, [(jogador_id, pontos)])
+        cluster.publicar("ranking", ranking_id, [(jogador_id, pontos)])
+
+    def _aplicar(self, ranking_id: int, pontos: Optional[Iterable[Tuple[int, int]]]) -> None:
+        if pontos is not None:
+            pontos = list(pontos)
+        for tocados in self._observadores:
+            if pontos is None:
+                tocados[ranking_id] = None
+            elif tocados.get(ranking_id, ()) is not None:
+                tocados.setdefault(ranking_id, set()).update(jogador_id for jogador_id, _ in pontos)
+        if pontos is None:
+            self._boards.pop(ranking_id, None)
+            return
+        board = self._boards.get(ranking_id)
+        if board is not None:
+            for jogador_id, valor in pontos:
+                board.set_pontos(jogador_id, valor)
+
+    def invalidate(self, ranking_id: Optional[int] = None) -> None:
+        if ranking_id is None:
+            self._boards.clear()
+        else:
+            self._boards.pop(ranking_id, None)
+
+ranking_engine = RankingEngine()
+cluster.registrar("ranking", ranking_engine._aplicar)
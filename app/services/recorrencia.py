@@ -0,0 +1,122 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, NamedTuple, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from ..models.agendamento import ExcecaoAgendamento, FrequenciaSerie, SerieAgendamento, StatusAgendamento
+
+DIAS_SEMANA = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+
+class Ocorrencia(NamedTuple):
+    serie_id: int
+    data: date
+    inicio: datetime
+    fim: datetime
+    cancelada: bool = False
+    valor: Optional[float] = None
+
+def dias_da_semana(serie: SerieAgendamento) -> List[int]:
+    # Sem BYDAY, a série semanal repete no dia da semana da data inicial (como no RRULE)
+    if serie.dias_semana:
+        return sorted({DIAS_SEMANA[dia] for dia in serie.dias_semana.split(",")})
+    return [serie.data_inicio.weekday()]
+
+def datas(serie: SerieAgendamento, inicio: date, fim: date) -> Iterator[date]:
+    """Datas das ocorrências em [inicio, fim], calculadas direto a partir da janela,
+    sem percorrer as ocorrências anteriores a ela."""
+    primeiro = max(inicio, serie.data_inicio)
+    ultimo = min(fim, serie.data_fim)
+    if primeiro > ultimo:
+        return
+    intervalo = serie.intervalo or 1
+    if serie.frequencia == FrequenciaSerie.DIARIA:
+        atraso = (primeiro - serie.data_inicio).days % intervalo
+        dia = primeiro + timedelta(days=(intervalo - atraso) % intervalo)
+        while dia <= ultimo:
+            yield dia
+            dia += timedelta(days=intervalo)
+        return
+
+    dias = dias_da_semana(serie)
+    base = serie.data_inicio - timedelta(days=serie.data_inicio.weekday())
+    semana = (primeiro - base).days // 7
+    semana += (intervalo - semana % intervalo) % intervalo
+    while True:
+        segunda = base + timedelta(weeks=semana)
+        for dia_semana in dias:
+            dia = segunda + timedelta(days=dia_semana)
+            if dia > ultimo:
+                return
+            if dia >= primeiro:
+                yield dia
+        semana += intervalo
+
+def valor_semana(serie: SerieAgendamento, dia: date) -> Optional[float]:
+    return serie.valores_semana[dia.weekday()] if serie.valores_semana else None
+
+def valor_ocorrencia(serie: SerieAgendamento, dia: date, excecao: Optional[ExcecaoAgendamento]) -> float:
+    """Quanto a ocorrência de `dia` conta no total da série, com a exceção aplicada."""
+    if excecao is not None and excecao.cancelada:
+        return 0.0
+    if excecao is not None and excecao.data_hora_inicio is not None:
+        return excecao.valor or 0.0
+    return valor_semana(serie, dia) or 0.0
+
+def e_ocorrencia(serie: SerieAgendamento, dia: date) -> bool:
+    return next(datas(serie, dia, dia), None) == dia
+
+def ocorrencias(
+    serie: SerieAgendamento,
+    inicio: datetime,
+    fim: datetime,
+    excecoes: Optional[Dict[date, ExcecaoAgendamento]] = None,
+    incluir_canceladas: bool = False,
+) -> List[Ocorrencia]:
+    """Ocorrências da série que tocam [inicio, fim), com as exceções aplicadas."""
+    excecoes = excecoes or {}
+    resultado: List[Ocorrencia] = []
+    for dia in datas(serie, inicio.date(), fim.date()):
+        excecao = excecoes.get(dia)
+        if excecao is not None and excecao.data_hora_inicio is not None and not excecao.cancelada:
+            # Remarcadas entram abaixo, pelo novo horário
+            continue
+        ocorrencia_inicio = datetime.combine(dia, serie.hora_inicio)
+        ocorrencia_fim = datetime.combine(dia, serie.hora_fim)
+        cancelada = excecao is not None and excecao.cancelada
+        if ocorrencia_inicio < fim and ocorrencia_fim > inicio and (incluir_canceladas or not cancelada):
+            resultado.append(
+                Ocorrencia(serie.id, dia, ocorrencia_inicio, ocorrencia_fim, cancelada, valor_semana(serie, dia))
+            )
+    for excecao in excecoes.values():
+        if excecao.cancelada or excecao.data_hora_inicio is None:
+            continue
+        if excecao.data_hora_inicio < fim and excecao.data_hora_fim > inicio:
+            resultado.append(Ocorrencia(
+                serie.id, excecao.data, excecao.data_hora_inicio, excecao.data_hora_fim, valor=excecao.valor
+            ))
+    resultado.sort(key=lambda ocorrencia: ocorrencia.inicio)
+    return resultado
+
+def excecoes_por_data(serie: SerieAgendamento) -> Dict[date, ExcecaoAgendamento]:
+    # Requer `excecoes` já carregado (selectinload)
+    return {excecao.data: excecao for excecao in serie.excecoes}
+
+async def carregar_series(
+    db: AsyncSession,
+    inicio: datetime,
+    fim: datetime,
+    quadra_ids: Optional[List[int]] = None,
+) -> List[SerieAgendamento]:
+    # Remarcações ficam dentro do período da série, então filtrar pelas datas da série basta
+    stmt = (
+        select(SerieAgendamento)
+        .options(selectinload(SerieAgendamento.excecoes))
+        .where(
+            SerieAgendamento.status != StatusAgendamento.CANCELADO,
+            SerieAgendamento.data_inicio <= fim.date(),
+            SerieAgendamento.data_fim >= inicio.date(),
+        )
+    )
+    if quadra_ids:
+        stmt = stmt.where(SerieAgendamento.quadra_id.in_(quadra_ids))
+    return list((await db.scalars(stmt)).all())
@@ -0,0 +1,175 @@
+"""Runner do benchmark.
+
+    python -m benchmarks.run                     # sobe o uvicorn, roda todos os cenários
+    python -m benchmarks.run --url http://host:8000 --cenarios bar_rush
+    python -m benchmarks.run --salvar-baseline   # grava os resultados como nova referência
+
+Latência é medida no cliente; consultas por request vêm da diferença do
+`/metrics` da aplicação antes e depois de cada cenário. Com baseline, sai com
+código 1 se algum cenário piorou além da tolerância."""
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import httpx
+from .scenarios import CENARIOS, Amostras, Contexto
+
+BASELINE = Path(__file__).with_name("baseline.json")
+_METRIC = re.compile(r'^arena_db_queries_per_request_(sum|count)\{method="([^"]+)",route="([^"]+)"\} (\S+)$')
+
+def percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+async def consultas(client: httpx.AsyncClient) -> Tuple[float, float]:
+    # (consultas, requests) somados em todas as rotas, exceto o próprio /metrics
+    total = {"sum": 0.0, "count": 0.0}
+    for line in (await client.get("/metrics")).text.splitlines():
+        match = _METRIC.match(line)
+        if match and match.group(3) != "/metrics":
+            total[match.group(1)] += float(match.group(4))
+    return total["sum"], total["count"]
+
+async def rodar_cenario(ctx: Contexto, nome: str, duracao: float, concorrencia: int, aquecimento: float) -> Dict:
+    cenario = CENARIOS[nome]
+
+    async def worker(ate: float):
+        while time.perf_counter() < ate:
+            await cenario(ctx)
+
+    ctx.amostras = Amostras()
+    await asyncio.gather(*(worker(time.perf_counter() + aquecimento) for _ in range(concorrencia)))
+
+    ctx.amostras = Amostras()
+    consultas_antes, requests_antes = await consultas(ctx.client)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(started + duracao) for _ in range(concorrencia)))
+    elapsed = time.perf_counter() - started
+    consultas_depois, requests_depois = await consultas(ctx.client)
+
+    amostras = ctx.amostras
+    requests = requests_depois - requests_antes
+    return {
+        "requests": len(amostras.latencias),
+        "throughput": round(len(amostras.latencias) / elapsed, 1),
+        "p50_ms": round(percentil(amostras.latencias, 50) * 1000, 2),
+        "p95_ms": round(percentil(amostras.latencias, 95) * 1000, 2),
+        "p99_ms": round(percentil(amostras.latencias, 99) * 1000, 2),
+        "queries_per_request": round((consultas_depois - consultas_antes) / requests, 2) if requests else 0.0,
+        "erros": amostras.erros,
+        "status": {str(status): total for status, total in sorted(amostras.status.items())},
+    }
+
+def comparar(resultados: Dict[str, Dict], baseline: Dict[str, Dict], tolerancia: float) -> List[str]:
+    regressoes = []
+    for nome, atual in resultados.items():
+        anterior = baseline.get(nome)
+        if anterior is None:
+            continue
+        for campo in ("p50_ms", "p95_ms", "p99_ms", "queries_per_request"):
+            if anterior[campo] and atual[campo] > anterior[campo] * (1 + tolerancia):
+                regressoes.append(f"{nome}: {campo} {anterior[campo]} -> {atual[campo]}")
+        if atual["throughput"] < anterior["throughput"] * (1 - tolerancia):
+            regressoes.append(f"{nome}: throughput {anterior['throughput']} -> {atual['throughput']}")
+        if atual["erros"] > anterior["erros"]:
+            regressoes.append(f"{nome}: erros {anterior['erros']} -> {atual['erros']}")
+    return regressoes
+
+def imprimir(resultados: Dict[str, Dict], baseline: Dict[str, Dict]) -> None:
+    cabecalho = f"{'cenario':<22}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'q/req':>8}{'5xx':>6}"
+    print(cabecalho)
+    print("-" * len(cabecalho))
+    for nome, r in resultados.items():
+        print(f"{nome:<22}{r['throughput']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['queries_per_request']:>8}{r['erros']:>6}")
+        anterior = baseline.get(nome)
+        if anterior:
+            print(
+                f"{'  baseline':<22}{anterior['throughput']:>10}{anterior['p50_ms']:>10}{anterior['p95_ms']:>10}"
+                f"{anterior['p99_ms']:>10}{anterior['queries_per_request']:>8}{anterior['erros']:>6}"
+            )
+
+def subir_servidor(porta: int, workers: int) -> subprocess.Popen:
+    # Mesmo runner da produção, sem Server-Timing e sem limite de login (as sessões saem todas do mesmo IP)
+    env = {
+        **os.environ,
+        "METRICS_SERVER_TIMING": "false",
+        "RATE_LIMIT_LOGIN_PER_MINUTE": "0",
+        "SERVER_PORT": str(porta),
+        "SERVER_WORKERS": str(workers),
+    }
+    return subprocess.Popen([sys.executable, "-m", "app.server"], env=env)
+
+async def esperar_servidor(client: httpx.AsyncClient, timeout: float = 30) -> None:
+    limite = time.perf_counter() + timeout
+    while True:
+        try:
+            (await client.get("/")).raise_for_status()
+            return
+        except httpx.HTTPError:
+            if time.perf_counter() > limite:
+                raise RuntimeError("Server did not start")
+            await asyncio.sleep(0.2)
+
+async def main_async(args) -> int:
+    baseline = json.loads(Path(args.baseline).read_text()) if Path(args.baseline).exists() else {}
+    limits = httpx.Limits(max_connections=args.concorrencia * 2)
+    async with httpx.AsyncClient(base_url=args.url, timeout=30, limits=limits) as client:
+        await esperar_servidor(client)
+        ctx = Contexto(client, args.escala, args.semente)
+        await ctx.preparar(args.sessoes)
+        resultados = {}
+        for nome in args.cenarios:
+            print(f"> {nome} ({args.duracao}s, {args.concorrencia} usuarios)", flush=True)
+            resultados[nome] = await rodar_cenario(ctx, nome, args.duracao, args.concorrencia, args.aquecimento)
+
+    imprimir(resultados, baseline)
+    if args.saida:
+        Path(args.saida).write_text(json.dumps(resultados, indent=2) + "\n")
+    if args.salvar_baseline:
+        Path(args.baseline).write_text(json.dumps({**baseline, **resultados}, indent=2) + "\n")
+        print(f"baseline gravado em {args.baseline}")
+        return 0
+    regressoes = comparar(resultados, baseline, args.tolerancia)
+    for regressao in regressoes:
+        print(f"REGRESSAO {regressao}")
+    return 1 if regressoes else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos horários de pico da arena")
+    parser.add_argument("--url", help="usa um servidor já em execução em vez de subir o uvicorn")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--cenarios", nargs="+", choices=list(CENARIOS), default=list(CENARIOS))
+    parser.add_argument("--duracao", type=float, default=30, help="segundos medidos por cenário")
+    parser.add_argument("--aquecimento", type=float, default=5, help="segundos descartados antes da medição")
+    parser.add_argument("--concorrencia", type=int, default=32)
+    parser.add_argument("--sessoes", type=int, default=200, help="clientes logados antes das rodadas")
+    parser.add_argument("--escala", type=float, default=1.0, help="a mesma usada no seed")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--tolerancia", type=float, default=0.15)
+    parser.add_argument("--salvar-baseline", action="store_true")
+    parser.add_argument("--saida", help="grava os resultados em JSON")
+    args = parser.parse_args()
+
+    servidor: Optional[subprocess.Popen] = None
+    if args.url is None:
+        args.url = f"http://127.0.0.1:{args.porta}"
+        servidor = subir_servidor(args.porta, args.workers)
+    try:
+        sys.exit(asyncio.run(main_async(args)))
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait()
+
+if __name__ == "__main__":
+    main()
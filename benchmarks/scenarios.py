@@ -0,0 +1,110 @@
+"""Cenários do benchmark: cada função é uma ação de um usuário, repetida pelos
+workers do runner durante o tempo do cenário."""
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+import httpx
+from .seed import SENHA, VOLUMES
+
+class Amostras:
+    def __init__(self):
+        self.latencias: List[float] = []
+        self.status: Dict[int, int] = {}
+        self.erros = 0
+
+    def registrar(self, duracao: float, status: int) -> None:
+        self.latencias.append(duracao)
+        self.status[status] = self.status.get(status, 0) + 1
+        if status >= 500:
+            self.erros += 1
+
+class Contexto:
+    """Cliente HTTP, tokens e ids descobertos na API antes das rodadas."""
+
+    def __init__(self, client: httpx.AsyncClient, escala: float, semente: int):
+        self.client = client
+        self.rnd = random.Random(semente)
+        self.clientes = max(1, int(VOLUMES["clientes"] * escala))
+        self.admin_token: Optional[str] = None
+        self.tokens: List[str] = []
+        self.quadras: List[int] = []
+        self.produtos: List[int] = []
+        self.rankings: Dict[int, List[int]] = {}
+        self.amostras = Amostras()
+
+    async def request(self, method: str, url: str, token: Optional[str] = None, **kwargs) -> httpx.Response:
+        headers = {"Authorization": f"Bearer {token}"} if token else None
+        started = time.perf_counter()
+        response = await self.client.request(method, url, headers=headers, **kwargs)
+        self.amostras.registrar(time.perf_counter() - started, response.status_code)
+        return response
+
+    async def login(self, username: str) -> str:
+        response = await self.client.post("/auth/token", data={"username": username, "password": SENHA})
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+    async def preparar(self, sessoes: int) -> None:
+        self.admin_token = await self.login("bench_admin")
+        for n in self.rnd.sample(range(self.clientes), min(sessoes, self.clientes)):
+            self.tokens.append(await self.login(f"bench_cliente_{n}"))
+        auth = {"Authorization": f"Bearer {self.admin_token}"}
+        self.quadras = [item["id"] for item in (await self.client.get("/quadras/", headers=auth)).json()["items"]]
+        self.produtos = [
+            item["id"] for item in (await self.client.get("/produtos/", params={"limit": 500}, headers=auth)).json()["items"]
+        ]
+        for item in (await self.client.get("/rankings/", headers=auth)).json()["items"]:
+            top = (await self.client.get(f"/rankings/{item['id']}/top", params={"n": 500}, headers=auth)).json()
+            self.rankings[item["id"]] = [posicao["jogador_id"] for posicao in top]
+        if not (self.quadras and self.produtos and self.rankings):
+            raise RuntimeError("Database is not seeded: run python -m benchmarks.seed --reset")
+
+async def login_storm(ctx: Contexto) -> None:
+    # Abertura do app às 18h: todos entram ao mesmo tempo, custo dominado pelo bcrypt
+    username = f"bench_cliente_{ctx.rnd.randrange(ctx.clientes)}"
+    await ctx.request("POST", "/auth/token", data={"username": username, "password": SENHA})
+
+async def booking_peak(ctx: Contexto) -> None:
+    # Consulta a grade da noite e tenta reservar um horário nobre; 409 faz parte do pico
+    token = ctx.rnd.choice(ctx.tokens)
+    dia = date.today() + timedelta(days=ctx.rnd.randint(1, 14))
+    inicio = datetime.combine(dia, datetime.min.time()) + timedelta(hours=18)
+    await ctx.request(
+        "GET", "/agendamentos/disponibilidade", token,
+        params={"inicio": inicio.isoformat(), "fim": (inicio + timedelta(hours=5)).isoformat(), "duracao_minutos": 60},
+    )
+    hora = inicio + timedelta(hours=ctx.rnd.randrange(5))
+    await ctx.request("POST", "/agendamentos/", token, json={
+        "quadra_id": ctx.rnd.choice(ctx.quadras),
+        "data_hora_inicio": hora.isoformat(),
+        "data_hora_fim": (hora + timedelta(hours=1)).isoformat(),
+    })
+
+async def bar_rush(ctx: Contexto) -> None:
+    # Fim dos jogos: abre comanda, lança itens, fecha e recebe
+    token = ctx.admin_token
+    response = await ctx.request("POST", "/comandas/", token, json={"cliente_id": ctx.rnd.randint(2, ctx.clientes + 1)})
+    if response.status_code != 200:
+        return
+    comanda_id = response.json()["id"]
+    for _ in range(ctx.rnd.randint(1, 3)):
+        itens = [{"produto_id": ctx.rnd.choice(ctx.produtos), "quantidade": ctx.rnd.randint(1, 3)}]
+        await ctx.request("POST", f"/comandas/{comanda_id}/itens", token, json=itens)
+    await ctx.request("POST", f"/comandas/{comanda_id}/fechar", token)
+    await ctx.request("POST", f"/comandas/{comanda_id}/pagar", token, json={"forma_pagamento": "pix"})
+
+async def leaderboard_polling(ctx: Contexto) -> None:
+    # Telas do clube e celulares atualizando o placar
+    token = ctx.rnd.choice(ctx.tokens)
+    ranking_id = ctx.rnd.choice(list(ctx.rankings))
+    await ctx.request("GET", f"/rankings/{ranking_id}/top", token, params={"n": 20})
+    jogador_id = ctx.rnd.choice(ctx.rankings[ranking_id])
+    await ctx.request("GET", f"/rankings/{ranking_id}/jogadores/{jogador_id}", token)
+
+CENARIOS = {
+    "login_storm": login_storm,
+    "booking_peak": booking_peak,
+    "bar_rush": bar_rush,
+    "leaderboard_polling": leaderboard_polling,
+}
@@ -0,0 +1,194 @@
+"""Carga de dados para o benchmark.
+
+Uso (banco dedicado, já migrado com `alembic upgrade head`):
+
+    python -m benchmarks.seed --reset --escala 1
+
+Todos os usuários têm a senha `SENHA`; `bench_admin` é o administrador e os
+clientes são `bench_cliente_<n>`. Com a mesma semente os dados são os mesmos."""
+import argparse
+import asyncio
+import random
+from datetime import datetime, time, timedelta
+from typing import Dict, List
+from sqlalchemy import insert, text
+from app.core.security import get_password_hash
+from app.database import SessionLocal, engine
+from app.models.agendamento import Agendamento, StatusAgendamento
+from app.models.aluno import Aluno
+from app.models.comanda import Comanda, ItemComanda, StatusComanda
+from app.models.produto import Produto
+from app.models.professor import Professor
+from app.models.quadra import Quadra
+from app.models.ranking import Categoria, ParticipanteRanking, Ranking, TipoRanking
+from app.models.user import User, UserType
+from app.services.historico import PARTICIONADAS, somar_meses
+
+SENHA = "bench"
+CHUNK = 5000
+CATEGORIAS_PRODUTO = ("bebidas", "lanches", "acessorios", "aluguel")
+TABELAS = (
+    "vendas_categoria_diaria", "vendas_produto", "excecoes_agendamento", "series_agendamento", "agendamentos",
+    "participantes_ranking", "rankings", "itens_comanda", "comandas", "produtos", "quadras", "ganhos_mensais",
+    "alunos", "professores", "users",
+)
+
+VOLUMES = {
+    "clientes": 5000,
+    "professores": 50,
+    "alunos": 20000,
+    "quadras": 12,
+    "dias_agendados": 120,
+    "produtos": 200,
+    "comandas": 30000,
+    "rankings": 10,
+    "participantes": 200,
+}
+
+async def _inserir(db, model, rows: List[Dict]) -> List[int]:
+    ids: List[int] = []
+    for start in range(0, len(rows), CHUNK):
+        ids += (await db.scalars(insert(model).returning(model.id), rows[start:start + CHUNK])).all()
+    return ids
+
+async def seed(escala: float, semente: int, reset: bool) -> Dict[str, int]:
+    rnd = random.Random(semente)
+    volumes = {nome: max(1, int(valor * escala)) for nome, valor in VOLUMES.items()}
+    # Um único hash: o bcrypt de milhares de usuários dominaria o tempo de carga
+    hashed = get_password_hash(SENHA)
+    agora = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+
+    async with SessionLocal() as db:
+        if reset:
+            await db.execute(text(f"TRUNCATE {', '.join(TABELAS)} RESTART IDENTITY CASCADE"))
+        # Partições mensais para todo o histórico gerado; sem elas tudo cairia na partição padrão
+        inicio = (agora - timedelta(days=365)).date().replace(day=1)
+        for tabela in PARTICIONADAS:
+            for quantidade in range(14):
+                mes = somar_meses(inicio, quantidade)
+                await db.execute(text("SELECT criar_particao_mensal(:tabela, :mes)"), {"tabela": tabela, "mes": mes})
+
+        def usuario(username: str, user_type: UserType) -> Dict:
+            return {
+                "username": username,
+                "email": f"{username}@bench.local",
+                "full_name": username.replace("_", " ").title(),
+                "hashed_password": hashed,
+                "user_type": user_type,
+                "is_active": True,
+            }
+
+        await _inserir(db, User, [usuario("bench_admin", UserType.ADMIN)])
+        clientes = await _inserir(
+            db, User, [usuario(f"bench_cliente_{n}", UserType.CLIENTE) for n in range(volumes["clientes"])]
+        )
+        professores_users = await _inserir(
+            db, User, [usuario(f"bench_professor_{n}", UserType.PROFESSOR) for n in range(volumes["professores"])]
+        )
+        professores = await _inserir(db, Professor, [
+            {"user_id": user_id, "especialidade": "beach tennis", "percentual_padrao": rnd.choice((30.0, 40.0, 50.0))}
+            for user_id in professores_users
+        ])
+        await _inserir(db, Aluno, [
+            {
+                "nome": f"Aluno {n}",
+                "professor_id": rnd.choice(professores),
+                "percentual_desconto": rnd.choice((0.0, 0.0, 10.0, 20.0)),
+                "created_at": agora - timedelta(days=rnd.randrange(730)),
+            }
+            for n in range(volumes["alunos"])
+        ])
+
+        quadras = await _inserir(db, Quadra, [
+            {
+                "nome": f"Quadra {n + 1}",
+                "descricao": "Areia",
+                "valor_hora": rnd.choice((80.0, 100.0, 120.0)),
+                "coberta": n % 3 == 0,
+                "iluminacao": n % 2 == 0,
+            }
+            for n in range(volumes["quadras"])
+        ])
+        # Grade horária cheia nos dias passados, sem sobreposição por quadra
+        agendamentos = []
+        for dia in range(volumes["dias_agendados"], 0, -1):
+            data = (agora - timedelta(days=dia)).date()
+            for quadra_id in quadras:
+                for hora in range(8, 22):
+                    if rnd.random() < 0.35:
+                        continue
+                    inicio = datetime.combine(data, time(hora))
+                    agendamentos.append({
+                        "quadra_id": quadra_id,
+                        "cliente_id": rnd.choice(clientes),
+                        "data_hora_inicio": inicio,
+                        "data_hora_fim": inicio + timedelta(hours=1),
+                        "status": rnd.choice((StatusAgendamento.CONFIRMADO,) * 9 + (StatusAgendamento.CANCELADO,)),
+                        "valor": 100.0,
+                    })
+        await _inserir(db, Agendamento, agendamentos)
+
+        produtos_rows = [
+            {
+                "nome": f"Produto {n}",
+                "descricao": "",
+                "preco": round(rnd.uniform(5, 60), 2),
+                "estoque": 1_000_000,
+                "categoria": CATEGORIAS_PRODUTO[n % len(CATEGORIAS_PRODUTO)],
+            }
+            for n in range(volumes["produtos"])
+        ]
+        produtos = await _inserir(db, Produto, produtos_rows)
+        precos = dict(zip(produtos, (row["preco"] for row in produtos_rows)))
+        comandas_rows, itens_por_comanda = [], []
+        for _ in range(volumes["comandas"]):
+            itens = [(rnd.choice(produtos), rnd.randint(1, 4)) for _ in range(rnd.randint(1, 5))]
+            itens_por_comanda.append(itens)
+            comandas_rows.append({
+                "cliente_id": rnd.choice(clientes),
+                "status": StatusComanda.PAGA,
+                "valor_total": round(sum(precos[produto_id] * quantidade for produto_id, quantidade in itens), 2),
+                "forma_pagamento": rnd.choice(("pix", "cartao", "dinheiro")),
+                "created_at": agora - timedelta(days=rnd.randrange(365)),
+            })
+        comandas = await _inserir(db, Comanda, comandas_rows)
+        await _inserir(db, ItemComanda, [
+            {"comanda_id": comanda_id, "produto_id": produto_id, "quantidade": quantidade, "valor_unitario": precos[produto_id]}
+            for comanda_id, itens in zip(comandas, itens_por_comanda)
+            for produto_id, quantidade in itens
+        ])
+
+        rankings = await _inserir(db, Ranking, [
+            {"nome": f"Ranking {n + 1}", "categoria": rnd.choice(list(Categoria)), "tipo": rnd.choice(list(TipoRanking))}
+            for n in range(volumes["rankings"])
+        ])
+        participantes = min(volumes["participantes"], len(clientes))
+        await _inserir(db, ParticipanteRanking, [
+            {"ranking_id": ranking_id, "jogador_id": jogador_id, "pontos": rnd.randrange(2000)}
+            for ranking_id in rankings
+            for jogador_id in rnd.sample(clientes, participantes)
+        ])
+        await db.commit()
+
+    await engine.dispose()
+    return {
+        "usuarios": len(clientes) + len(professores_users) + 1,
+        "alunos": volumes["alunos"],
+        "quadras": len(quadras),
+        "agendamentos": len(agendamentos),
+        "produtos": len(produtos),
+        "comandas": len(comandas),
+        "rankings": len(rankings),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Popula o banco configurado no .env para o benchmark")
+    parser.add_argument("--escala", type=float, default=1.0, help="multiplicador dos volumes padrão")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="apaga todos os dados antes (TRUNCATE)")
+    args = parser.parse_args()
+    for nome, total in asyncio.run(seed(args.escala, args.semente, args.reset)).items():
+        print(f"{nome}: {total}")
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,17 @@
 -- Create extensions
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS btree_gist;
 
 -- Drop tables if they exist
 DROP TABLE IF EXISTS participantes_ranking CASCADE;
 DROP TABLE IF EXISTS rankings CASCADE;
 DROP TABLE IF EXISTS itens_comanda CASCADE;
 DROP TABLE IF EXISTS comandas CASCADE;
+DROP TABLE IF EXISTS excecoes_agendamento CASCADE;
+DROP TABLE IF EXISTS series_agendamento CASCADE;
 DROP TABLE IF EXISTS agendamentos CASCADE;
 DROP TABLE IF EXISTS produtos CASCADE;
+DROP TABLE IF EXISTS ganhos_mensais CASCADE;
 DROP TABLE IF EXISTS alunos CASCADE;
 DROP TABLE IF EXISTS professores CASCADE;
 DROP TABLE IF EXISTS quadras CASCADE;
@@ -17,6 +21,7 @@ DROP TABLE IF EXISTS users CASCADE;
 CREATE TYPE user_type AS ENUM ('admin', 'professor', 'cliente');
 CREATE TYPE status_comanda AS ENUM ('aberta', 'fechada', 'paga');
 CREATE TYPE status_agendamento AS ENUM ('pendente', 'confirmado', 'cancelado');
+CREATE TYPE frequencia_serie AS ENUM ('diaria', 'semanal');
 CREATE TYPE categoria_ranking AS ENUM ('iniciante', 'intermediario', 'avancado');
 CREATE TYPE tipo_ranking AS ENUM ('masculino', 'feminino', 'misto');
 
@@ -66,6 +71,19 @@ CREATE TABLE alunos (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Create ganhos_mensais table (fechamento mensal dos professores)
+CREATE TABLE ganhos_mensais (
+    id SERIAL PRIMARY KEY,
+    professor_id INTEGER REFERENCES professores(id) ON DELETE CASCADE,
+    mes DATE NOT NULL,
+    alunos_ativos INTEGER NOT NULL DEFAULT 0,
+    valor_bruto DECIMAL(12,2) NOT NULL DEFAULT 0,
+    valor_ganho DECIMAL(12,2) NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT ganhos_mensais_professor_mes UNIQUE (professor_id, mes)
+);
+
 -- Create produtos table
 CREATE TABLE produtos (
     id SERIAL PRIMARY KEY,
@@ -131,16 +149,58 @@ CREATE TABLE agendamentos (
     valor DECIMAL(10,2) NOT NULL,
     observacoes TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT agendamentos_periodo_valido CHECK (data_hora_fim > data_hora_inicio),
+    -- Índice GiST (quadra, período) que impede sobreposição e atende as consultas de disponibilidade
+    CONSTRAINT agendamentos_sem_sobreposicao EXCLUDE USING gist (
+        quadra_id WITH =,
+        tsrange(data_hora_inicio, data_hora_fim, '[)') WITH &&
+    ) WHERE (status <> 'cancelado')
+);
+
+-- Create series_agendamento table (séries recorrentes, expandidas sob demanda)
+CREATE TABLE series_agendamento (
+    id SERIAL PRIMARY KEY,
+    quadra_id INTEGER REFERENCES quadras(id),
+    cliente_id INTEGER REFERENCES users(id),
+    frequencia frequencia_serie NOT NULL DEFAULT 'semanal',
+    intervalo INTEGER NOT NULL DEFAULT 1,
+    dias_semana VARCHAR(20),
+    data_inicio DATE NOT NULL,
+    data_fim DATE NOT NULL,
+    hora_inicio TIME NOT NULL,
+    hora_fim TIME NOT NULL,
+    status status_agendamento NOT NULL DEFAULT 'pendente',
+    valor DECIMAL(10,2) NOT NULL,
+    observacoes TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT series_agendamento_datas_validas CHECK (data_fim >= data_inicio),
+    CONSTRAINT series_agendamento_horario_valido CHECK (hora_fim > hora_inicio)
+);
+
+-- Create excecoes_agendamento table (cancelamentos e remarcações por ocorrência)
+CREATE TABLE excecoes_agendamento (
+    id SERIAL PRIMARY KEY,
+    serie_id INTEGER REFERENCES series_agendamento(id) ON DELETE CASCADE,
+    data DATE NOT NULL,
+    cancelada BOOLEAN DEFAULT false,
+    data_hora_inicio TIMESTAMP,
+    data_hora_fim TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT excecoes_agendamento_serie_data UNIQUE (serie_id, data)
 );
 
 -- Create indexes
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_users_username ON users(username);
-CREATE INDEX idx_alunos_professor ON alunos(professor_id);
+CREATE INDEX idx_alunos_professor ON alunos(professor_id, created_at);
+CREATE INDEX idx_ganhos_mensais_mes ON ganhos_mensais(mes);
 CREATE INDEX idx_comandas_cliente ON comandas(cliente_id);
 CREATE INDEX idx_agendamentos_quadra ON agendamentos(quadra_id);
 CREATE INDEX idx_agendamentos_cliente ON agendamentos(cliente_id);
+CREATE INDEX idx_series_agendamento_quadra ON series_agendamento(quadra_id, data_inicio, data_fim);
 CREATE INDEX idx_participantes_ranking ON participantes_ranking(ranking_id, jogador_id);
 
 -- Insert initial admin user (password: admin123)
@@ -0,0 +1,255 @@
+"""schema inicial
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-01-15 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+ENUMS = {
+    "user_type": ("admin", "professor", "cliente"),
+    "status_comanda": ("aberta", "fechada", "paga"),
+    "status_agendamento": ("pendente", "confirmado", "cancelado"),
+    "frequencia_serie": ("diaria", "semanal"),
+    "categoria_ranking": ("iniciante", "intermediario", "avancado"),
+    "tipo_ranking": ("masculino", "feminino", "misto"),
+}
+
+# Colunas, constraints, índices, triggers e dados iniciais iguais aos do init.sql, para que
+# bancos criados por ele possam ser marcados com `alembic stamp 0001`
+ATUALIZAR_UPDATED_AT = """
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ language 'plpgsql'
+"""
+
+TABELAS_UPDATED_AT = (
+    "users", "quadras", "professores", "alunos", "produtos", "comandas",
+    "itens_comanda", "rankings", "participantes_ranking", "agendamentos",
+)
+
+# Senha: admin123
+ADMIN = (
+    "INSERT INTO users (email, username, hashed_password, full_name, user_type) "
+    "VALUES ('admin@arena.com', 'admin', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewKyNiLR5P3PseLy', "
+    "'Administrador', 'admin')"
+)
+
+QUADRAS = """
+INSERT INTO quadras (nome, descricao, valor_hora, coberta, iluminacao) VALUES
+('Quadra 1', 'Quadra principal coberta', 100.00, true, true),
+('Quadra 2', 'Quadra descoberta', 80.00, false, true),
+('Quadra 3', 'Quadra de saibro', 120.00, false, true)
+"""
+
+PRODUTOS = """
+INSERT INTO produtos (nome, descricao, preco, estoque, categoria) VALUES
+('Água Mineral 500ml', 'Água mineral sem gás', 5.00, 100, 'Bebidas'),
+('Isotônico 500ml', 'Bebida isotônica sabor laranja', 8.00, 50, 'Bebidas'),
+('Bola de Tênis', 'Tubo com 3 bolas', 25.00, 30, 'Equipamentos'),
+('Aluguel Raquete', 'Aluguel de raquete por hora', 20.00, 10, 'Equipamentos')
+"""
+
+def enum(name: str) -> postgresql.ENUM:
+    return postgresql.ENUM(*ENUMS[name], name=name, create_type=False)
+
+def base_columns():
+    return [
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP")),
+    ]
+
+def create_table(name: str, *columns):
+    op.create_table(name, *base_columns(), *columns)
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"')
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    for name, values in ENUMS.items():
+        postgresql.ENUM(*values, name=name).create(op.get_bind(), checkfirst=True)
+
+    create_table(
+        "users",
+        sa.Column("email", sa.String(255), unique=True, nullable=False),
+        sa.Column("username", sa.String(50), unique=True, nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("full_name", sa.String(100), nullable=False),
+        sa.Column("user_type", enum("user_type"), nullable=False),
+        sa.Column("is_active", sa.Boolean(), server_default=sa.true()),
+    )
+
+    create_table(
+        "quadras",
+        sa.Column("nome", sa.String(100), nullable=False),
+        sa.Column("descricao", sa.Text()),
+        sa.Column("valor_hora", sa.Numeric(10, 2), nullable=False),
+        sa.Column("coberta", sa.Boolean(), server_default=sa.false()),
+        sa.Column("iluminacao", sa.Boolean(), server_default=sa.false()),
+    )
+
+    create_table(
+        "professores",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("especialidade", sa.String(100), nullable=False),
+        sa.Column("percentual_padrao", sa.Numeric(5, 2), nullable=False),
+        sa.UniqueConstraint("user_id"),
+    )
+
+    create_table(
+        "alunos",
+        sa.Column("nome", sa.String(100), nullable=False),
+        sa.Column("professor_id", sa.Integer(), sa.ForeignKey("professores.id")),
+        sa.Column("percentual_desconto", sa.Numeric(5, 2), nullable=False),
+    )
+
+    create_table(
+        "ganhos_mensais",
+        sa.Column("professor_id", sa.Integer(), sa.ForeignKey("professores.id", ondelete="CASCADE")),
+        sa.Column("mes", sa.Date(), nullable=False),
+        sa.Column("alunos_ativos", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("valor_bruto", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column("valor_ganho", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.UniqueConstraint("professor_id", "mes", name="ganhos_mensais_professor_mes"),
+    )
+
+    create_table(
+        "produtos",
+        sa.Column("nome", sa.String(100), nullable=False),
+        sa.Column("descricao", sa.Text()),
+        sa.Column("preco", sa.Numeric(10, 2), nullable=False),
+        sa.Column("estoque", sa.Integer(), nullable=False),
+        sa.Column("categoria", sa.String(50), nullable=False),
+    )
+
+    create_table(
+        "comandas",
+        sa.Column("cliente_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("status", enum("status_comanda"), nullable=False, server_default="aberta"),
+        sa.Column("valor_total", sa.Numeric(10, 2), server_default="0.0"),
+        sa.Column("forma_pagamento", sa.String(50)),
+    )
+
+    create_table(
+        "itens_comanda",
+        sa.Column("comanda_id", sa.Integer(), sa.ForeignKey("comandas.id")),
+        sa.Column("produto_id", sa.Integer(), sa.ForeignKey("produtos.id")),
+        sa.Column("quantidade", sa.Integer(), nullable=False),
+        sa.Column("valor_unitario", sa.Numeric(10, 2), nullable=False),
+    )
+
+    create_table(
+        "rankings",
+        sa.Column("nome", sa.String(100), nullable=False),
+        sa.Column("categoria", enum("categoria_ranking"), nullable=False),
+        sa.Column("tipo", enum("tipo_ranking"), nullable=False),
+    )
+
+    create_table(
+        "participantes_ranking",
+        sa.Column("ranking_id", sa.Integer(), sa.ForeignKey("rankings.id")),
+        sa.Column("jogador_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("pontos", sa.Integer(), server_default="0"),
+    )
+
+    create_table(
+        "agendamentos",
+        sa.Column("quadra_id", sa.Integer(), sa.ForeignKey("quadras.id")),
+        sa.Column("cliente_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("data_hora_inicio", sa.DateTime(), nullable=False),
+        sa.Column("data_hora_fim", sa.DateTime(), nullable=False),
+        sa.Column("status", enum("status_agendamento"), nullable=False, server_default="pendente"),
+        sa.Column("valor", sa.Numeric(10, 2), nullable=False),
+        sa.Column("observacoes", sa.Text()),
+        sa.CheckConstraint("data_hora_fim > data_hora_inicio", name="agendamentos_periodo_valido"),
+    )
+    # Índice GiST por quadra + período: impede sobreposição no banco e atende as consultas de disponibilidade
+    op.execute(
+        "ALTER TABLE agendamentos ADD CONSTRAINT agendamentos_sem_sobreposicao EXCLUDE USING gist "
+        "(quadra_id WITH =, tsrange(data_hora_inicio, data_hora_fim, '[)') WITH &&) "
+        "WHERE (status <> 'cancelado')"
+    )
+
+    create_table(
+        "series_agendamento",
+        sa.Column("quadra_id", sa.Integer(), sa.ForeignKey("quadras.id")),
+        sa.Column("cliente_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("frequencia", enum("frequencia_serie"), nullable=False, server_default="semanal"),
+        sa.Column("intervalo", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("dias_semana", sa.String(20)),
+        sa.Column("data_inicio", sa.Date(), nullable=False),
+        sa.Column("data_fim", sa.Date(), nullable=False),
+        sa.Column("hora_inicio", sa.Time(), nullable=False),
+        sa.Column("hora_fim", sa.Time(), nullable=False),
+        sa.Column("status", enum("status_agendamento"), nullable=False, server_default="pendente"),
+        sa.Column("valor", sa.Numeric(10, 2), nullable=False),
+        sa.Column("observacoes", sa.Text()),
+        sa.CheckConstraint("data_fim >= data_inicio", name="series_agendamento_datas_validas"),
+        sa.CheckConstraint("hora_fim > hora_inicio", name="series_agendamento_horario_valido"),
+    )
+
+    create_table(
+        "excecoes_agendamento",
+        sa.Column("serie_id", sa.Integer(), sa.ForeignKey("series_agendamento.id", ondelete="CASCADE")),
+        sa.Column("data", sa.Date(), nullable=False),
+        sa.Column("cancelada", sa.Boolean(), server_default=sa.false()),
+        sa.Column("data_hora_inicio", sa.DateTime()),
+        sa.Column("data_hora_fim", sa.DateTime()),
+        sa.UniqueConstraint("serie_id", "data", name="excecoes_agendamento_serie_data"),
+    )
+
+    op.create_index("idx_users_email", "users", ["email"])
+    op.create_index("idx_users_username", "users", ["username"])
+    op.create_index("idx_alunos_professor", "alunos", ["professor_id", "created_at"])
+    op.create_index("idx_ganhos_mensais_mes", "ganhos_mensais", ["mes"])
+    op.create_index("idx_comandas_cliente", "comandas", ["cliente_id"])
+    op.create_index("idx_agendamentos_quadra", "agendamentos", ["quadra_id"])
+    op.create_index("idx_agendamentos_cliente", "agendamentos", ["cliente_id"])
+    op.create_index(
+        "idx_series_agendamento_quadra", "series_agendamento", ["quadra_id", "data_inicio", "data_fim"]
+    )
+    op.create_index("idx_participantes_ranking", "participantes_ranking", ["ranking_id", "jogador_id"])
+
+    op.execute(ADMIN)
+    op.execute(QUADRAS)
+    op.execute(PRODUTOS)
+
+    op.execute(ATUALIZAR_UPDATED_AT)
+    for name in TABELAS_UPDATED_AT:
+        op.execute(
+            f"CREATE TRIGGER update_{name}_updated_at BEFORE UPDATE ON {name} "
+            f"FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()"
+        )
+
+def downgrade() -> None:
+    for name in (
+        "excecoes_agendamento",
+        "series_agendamento",
+        "agendamentos",
+        "participantes_ranking",
+        "rankings",
+        "itens_comanda",
+        "comandas",
+        "produtos",
+        "quadras",
+        "ganhos_mensais",
+        "alunos",
+        "professores",
+        "users",
+    ):
+        op.drop_table(name)
+    op.execute("DROP FUNCTION update_updated_at_column()")
+    for name in ENUMS:
+        postgresql.ENUM(name=name).drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,155 @@
+"""contadores de vendas e estoque mínimo
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-02-01 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# Categoria do produto no momento da venda, gravada no item: remover ou alterar o item
+# desconta da categoria em que a venda foi contada, mesmo que o produto tenha mudado de categoria
+PREENCHER_CATEGORIA = """
+CREATE FUNCTION preencher_categoria_item() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' OR NEW.produto_id IS DISTINCT FROM OLD.produto_id THEN
+        NEW.categoria := (SELECT categoria FROM produtos WHERE id = NEW.produto_id);
+    END IF;
+    RETURN NEW;
+END;
+$$
+"""
+
+# Aplica um delta (positivo na inserção, negativo na remoção) aos contadores.
+# Um upsert por produto e por (dia, categoria), em ordem fixa para que statements
+# concorrentes travem as linhas na mesma sequência.
+APLICAR_VENDAS = """
+CREATE FUNCTION aplicar_vendas(
+    produto_ids integer[], dias date[], categorias text[], quantidades integer[], receitas double precision[]
+) RETURNS void LANGUAGE sql AS $$
+    INSERT INTO vendas_produto AS v (produto_id, quantidade, receita, updated_at)
+    SELECT d.produto_id, sum(d.quantidade), sum(d.receita), timezone('utc', now())
+    FROM unnest(produto_ids, quantidades, receitas) AS d(produto_id, quantidade, receita)
+    GROUP BY d.produto_id
+    ORDER BY d.produto_id
+    ON CONFLICT (produto_id) DO UPDATE
+    SET quantidade = v.quantidade + EXCLUDED.quantidade,
+        receita = v.receita + EXCLUDED.receita,
+        updated_at = EXCLUDED.updated_at;
+
+    INSERT INTO vendas_categoria_diaria AS v (dia, categoria, quantidade, receita)
+    SELECT d.dia, coalesce(d.categoria, ''), sum(d.quantidade), sum(d.receita)
+    FROM unnest(dias, categorias, quantidades, receitas) AS d(dia, categoria, quantidade, receita)
+    GROUP BY 1, 2
+    ORDER BY 1, 2
+    ON CONFLICT (dia, categoria) DO UPDATE
+    SET quantidade = v.quantidade + EXCLUDED.quantidade,
+        receita = v.receita + EXCLUDED.receita;
+$$
+"""
+
+# Triggers por statement com tabelas de transição: a inserção de vários itens de uma
+# comanda vira um único delta agregado. O dia é o da criação do item (UTC).
+CONTABILIZAR_ITENS = """
+CREATE FUNCTION contabilizar_itens_comanda() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM aplicar_vendas(
+            array_agg(produto_id), array_agg(coalesce(created_at, timezone('utc', now()))::date),
+            array_agg(categoria), array_agg(quantidade), array_agg(quantidade * valor_unitario)
+        ) FROM novos;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM aplicar_vendas(
+            array_agg(produto_id), array_agg(coalesce(created_at, timezone('utc', now()))::date),
+            array_agg(categoria), array_agg(-quantidade), array_agg(-quantidade * valor_unitario)
+        ) FROM antigos;
+    ELSE
+        PERFORM aplicar_vendas(
+            array_agg(produto_id), array_agg(dia), array_agg(categoria), array_agg(quantidade), array_agg(receita)
+        ) FROM (
+            SELECT produto_id, coalesce(created_at, timezone('utc', now()))::date AS dia, categoria,
+                   quantidade, quantidade * valor_unitario AS receita
+            FROM novos
+            UNION ALL
+            SELECT produto_id, coalesce(created_at, timezone('utc', now()))::date, categoria,
+                   -quantidade, -quantidade * valor_unitario
+            FROM antigos
+        ) AS delta;
+    END IF;
+    RETURN NULL;
+END;
+$$
+"""
+
+TRIGGERS = {
+    "itens_comanda_vendas_insert": "AFTER INSERT ON itens_comanda REFERENCING NEW TABLE AS novos",
+    "itens_comanda_vendas_delete": "AFTER DELETE ON itens_comanda REFERENCING OLD TABLE AS antigos",
+    "itens_comanda_vendas_update": "AFTER UPDATE ON itens_comanda REFERENCING OLD TABLE AS antigos NEW TABLE AS novos",
+}
+
+def upgrade() -> None:
+    op.add_column("produtos", sa.Column("estoque_minimo", sa.Integer(), server_default="0"))
+    op.create_index(op.f("ix_produtos_categoria"), "produtos", ["categoria"])
+    op.create_index(
+        "idx_produtos_estoque_baixo", "produtos", ["id"],
+        postgresql_where=sa.text("estoque <= estoque_minimo"),
+    )
+
+    op.create_table(
+        "vendas_produto",
+        sa.Column("produto_id", sa.Integer(), sa.ForeignKey("produtos.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("quantidade", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("receita", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_table(
+        "vendas_categoria_diaria",
+        sa.Column("dia", sa.Date(), primary_key=True),
+        sa.Column("categoria", sa.String(), primary_key=True),
+        sa.Column("quantidade", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("receita", sa.Float(), nullable=False, server_default="0"),
+    )
+
+    op.add_column("itens_comanda", sa.Column("categoria", sa.String(50)))
+    # Itens existentes ficam com a categoria atual do produto; sem mexer no updated_at deles
+    op.execute("ALTER TABLE itens_comanda DISABLE TRIGGER update_itens_comanda_updated_at")
+    op.execute("UPDATE itens_comanda i SET categoria = p.categoria FROM produtos p WHERE p.id = i.produto_id")
+    op.execute("ALTER TABLE itens_comanda ENABLE TRIGGER update_itens_comanda_updated_at")
+    op.execute(PREENCHER_CATEGORIA)
+    op.execute(
+        "CREATE TRIGGER itens_comanda_categoria BEFORE INSERT OR UPDATE OF produto_id ON itens_comanda "
+        "FOR EACH ROW EXECUTE FUNCTION preencher_categoria_item()"
+    )
+
+    op.execute(APLICAR_VENDAS)
+    op.execute(CONTABILIZAR_ITENS)
+    # Tabelas de transição não aceitam mais de um evento por trigger
+    for name, definition in TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER {name} {definition} FOR EACH STATEMENT EXECUTE FUNCTION contabilizar_itens_comanda()")
+
+    # Carga inicial a partir dos itens existentes, pelo mesmo caminho dos triggers
+    op.execute(
+        "SELECT aplicar_vendas(array_agg(produto_id), array_agg(coalesce(created_at, timezone('utc', now()))::date), "
+        "array_agg(categoria), array_agg(quantidade), array_agg(quantidade * valor_unitario)) "
+        "FROM itens_comanda"
+    )
+
+def downgrade() -> None:
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER {name} ON itens_comanda")
+    op.execute("DROP FUNCTION contabilizar_itens_comanda()")
+    op.execute("DROP FUNCTION aplicar_vendas(integer[], date[], text[], integer[], double precision[])")
+    op.execute("DROP TRIGGER itens_comanda_categoria ON itens_comanda")
+    op.execute("DROP FUNCTION preencher_categoria_item()")
+    op.drop_column("itens_comanda", "categoria")
+    op.drop_table("vendas_categoria_diaria")
+    op.drop_table("vendas_produto")
+    op.drop_index("idx_produtos_estoque_baixo", table_name="produtos")
+    op.drop_index(op.f("ix_produtos_categoria"), table_name="produtos")
+    op.drop_column("produtos", "estoque_minimo")
@@ -0,0 +1,116 @@
+"""notificações de ocupação (LISTEN/NOTIFY)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-02-15 10:00:00
+
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# Mensagens no mesmo formato de app.core.events. O NOTIFY só é entregue no commit,
+# e mudanças que não afetam a ocupação (updated_at, observações, valor) não notificam.
+FUNCOES = {
+    "notificar_agendamento": """
+CREATE FUNCTION notificar_agendamento() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    linha agendamentos;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        linha := OLD;
+    ELSE
+        linha := NEW;
+    END IF;
+    IF TG_OP = 'UPDATE' AND (OLD.quadra_id, OLD.data_hora_inicio, OLD.data_hora_fim, OLD.status)
+        IS NOT DISTINCT FROM (NEW.quadra_id, NEW.data_hora_inicio, NEW.data_hora_fim, NEW.status) THEN
+        RETURN NULL;
+    END IF;
+    PERFORM pg_notify('arena_ocupacao', json_build_object(
+        't', 'agendamento', 'op', lower(TG_OP), 'id', linha.id, 'quadra_id', linha.quadra_id,
+        'inicio', linha.data_hora_inicio, 'fim', linha.data_hora_fim, 'status', linha.status
+    )::text);
+    RETURN NULL;
+END;
+$$
+""",
+    "notificar_serie": """
+CREATE FUNCTION notificar_serie() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    linha series_agendamento;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        linha := OLD;
+    ELSE
+        linha := NEW;
+    END IF;
+    IF TG_OP = 'UPDATE' AND (OLD.quadra_id, OLD.status, OLD.data_fim) IS NOT DISTINCT FROM (NEW.quadra_id, NEW.status, NEW.data_fim) THEN
+        RETURN NULL;
+    END IF;
+    PERFORM pg_notify('arena_ocupacao', json_build_object(
+        't', 'serie', 'op', lower(TG_OP), 'id', linha.id, 'quadra_id', linha.quadra_id
+    )::text);
+    RETURN NULL;
+END;
+$$
+""",
+    "notificar_excecao": """
+CREATE FUNCTION notificar_excecao() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    alvo integer;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        alvo := OLD.serie_id;
+    ELSE
+        alvo := NEW.serie_id;
+    END IF;
+    PERFORM pg_notify('arena_ocupacao', json_build_object(
+        't', 'serie', 'op', 'update', 'id', s.id, 'quadra_id', s.quadra_id
+    )::text)
+    FROM series_agendamento s WHERE s.id = alvo;
+    RETURN NULL;
+END;
+$$
+""",
+    "notificar_quadra": """
+CREATE FUNCTION notificar_quadra() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('arena_ocupacao', json_build_object(
+            't', 'quadra', 'op', 'delete', 'quadra_id', OLD.id, 'nome', NULL
+        )::text);
+    ELSE
+        PERFORM pg_notify('arena_ocupacao', json_build_object(
+            't', 'quadra', 'op', lower(TG_OP), 'quadra_id', NEW.id, 'nome', NEW.nome
+        )::text);
+    END IF;
+    RETURN NULL;
+END;
+$$
+""",
+}
+
+TRIGGERS = {
+    "agendamentos_notificar": ("agendamentos", "notificar_agendamento"),
+    "series_agendamento_notificar": ("series_agendamento", "notificar_serie"),
+    "excecoes_agendamento_notificar": ("excecoes_agendamento", "notificar_excecao"),
+    "quadras_notificar": ("quadras", "notificar_quadra"),
+}
+
+def upgrade() -> None:
+    for definition in FUNCOES.values():
+        op.execute(definition)
+    for name, (table, function) in TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER {name} AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {function}()"
+        )
+
+def downgrade() -> None:
+    for name, (table, _) in TRIGGERS.items():
+        op.execute(f"DROP TRIGGER {name} ON {table}")
+    for function in FUNCOES:
+        op.execute(f"DROP FUNCTION {function}()")
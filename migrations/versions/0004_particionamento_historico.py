@@ -0,0 +1,172 @@
+"""particionamento mensal de agendamentos e comandas
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2024-03-01 10:00:00
+
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# Coluna de particionamento de cada tabela; a chave entra na PK, exigência do Postgres
+TABELAS = {"agendamentos": "data_hora_inicio", "comandas": "created_at"}
+
+COLUNAS = {
+    "agendamentos": (
+        "id", "created_at", "updated_at", "quadra_id", "cliente_id", "data_hora_inicio", "data_hora_fim",
+        "status", "valor", "observacoes",
+    ),
+    "comandas": ("id", "created_at", "updated_at", "cliente_id", "status", "valor_total", "forma_pagamento"),
+}
+
+# No Postgres 13 a constraint de exclusão não existe na tabela particionada: vai em cada partição
+SEM_SOBREPOSICAO = (
+    "ALTER TABLE {tabela} ADD CONSTRAINT {tabela}_sem_sobreposicao EXCLUDE USING gist "
+    "(quadra_id WITH =, tsrange(data_hora_inicio, data_hora_fim, '[)') WITH &&) "
+    "WHERE (status <> 'cancelado')"
+)
+
+# Cria (se ainda não existe) a partição do mês, com as linhas desse mês que estavam na
+# partição padrão. Triggers com `WHEN ... arena.manutencao` ignoram essa movimentação.
+CRIAR_PARTICAO = """
+CREATE FUNCTION criar_particao_mensal(tabela text, mes date) RETURNS text LANGUAGE plpgsql AS $$
+DECLARE
+    inicio date := date_trunc('month', mes)::date;
+    fim date := (date_trunc('month', mes) + interval '1 month')::date;
+    particao text := format('%s_%s', tabela, to_char(mes, 'YYYY_MM'));
+    coluna text := CASE tabela WHEN 'agendamentos' THEN 'data_hora_inicio' ELSE 'created_at' END;
+BEGIN
+    IF to_regclass(particao) IS NOT NULL THEN
+        RETURN particao;
+    END IF;
+    PERFORM set_config('arena.manutencao', 'on', true);
+    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', particao, tabela);
+    IF tabela = 'agendamentos' THEN
+        EXECUTE format(
+            'ALTER TABLE %I ADD CONSTRAINT %I EXCLUDE USING gist '
+            '(quadra_id WITH =, tsrange(data_hora_inicio, data_hora_fim, ''[)'') WITH &&) '
+            'WHERE (status <> ''cancelado'')',
+            particao, particao || '_sem_sobreposicao'
+        );
+    END IF;
+    IF to_regclass(tabela || '_padrao') IS NOT NULL THEN
+        EXECUTE format(
+            'WITH movidas AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) '
+            'INSERT INTO %I SELECT * FROM movidas',
+            tabela || '_padrao', coluna, inicio, coluna, fim, particao
+        );
+    END IF;
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', tabela, particao, inicio, fim);
+    PERFORM set_config('arena.manutencao', '', true);
+    RETURN particao;
+END;
+$$
+"""
+
+# O trigger do updated_at (revisão inicial) some com a tabela antiga; na particionada vale para todas as partições
+ATUALIZAR_UPDATED_AT = (
+    "CREATE TRIGGER update_{tabela}_updated_at BEFORE UPDATE ON {tabela} "
+    "FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()"
+)
+
+FORA_DA_MANUTENCAO = "WHEN (current_setting('arena.manutencao', true) IS DISTINCT FROM 'on')"
+
+def _particionar(tabela: str, origem: str) -> None:
+    """Recria `tabela` particionada por mês; `origem` é a expressão da chave nas linhas existentes."""
+    coluna = TABELAS[tabela]
+    colunas = ", ".join(COLUNAS[tabela])
+    valores = ", ".join(origem if nome == coluna else nome for nome in COLUNAS[tabela])
+    op.execute(f"ALTER SEQUENCE {tabela}_id_seq OWNED BY NONE")
+    op.execute(f"ALTER TABLE {tabela} RENAME TO {tabela}_legado")
+    op.execute(
+        f"CREATE TABLE {tabela} (LIKE {tabela}_legado INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE ({coluna})"
+    )
+    op.execute(f"ALTER TABLE {tabela} ALTER COLUMN {coluna} SET NOT NULL")
+    op.execute(f"CREATE TABLE {tabela}_padrao PARTITION OF {tabela} DEFAULT")
+    # Meses com dados até três à frente; os seguintes ficam com o job de histórico
+    op.execute(
+        f"SELECT criar_particao_mensal('{tabela}', mes::date) FROM generate_series("
+        f"date_trunc('month', least((SELECT min({origem}) FROM {tabela}_legado), timezone('utc', now()))), "
+        f"date_trunc('month', timezone('utc', now())) + interval '3 months', interval '1 month') AS mes"
+    )
+    op.execute(f"INSERT INTO {tabela} ({colunas}) SELECT {valores} FROM {tabela}_legado")
+    op.execute(f"DROP TABLE {tabela}_legado")
+    op.execute(f"ALTER SEQUENCE {tabela}_id_seq OWNED BY {tabela}.id")
+    op.execute(f"ALTER TABLE {tabela} ADD PRIMARY KEY (id, {coluna})")
+    op.execute(f"ALTER TABLE {tabela} ADD FOREIGN KEY (cliente_id) REFERENCES users (id)")
+    op.execute(f"CREATE INDEX ix_{tabela}_id ON {tabela} (id)")
+    op.execute(f"CREATE INDEX idx_{tabela}_cliente ON {tabela} (cliente_id)")
+    op.execute(ATUALIZAR_UPDATED_AT.format(tabela=tabela))
+
+def upgrade() -> None:
+    op.execute(CRIAR_PARTICAO)
+
+    # Itens continuam sem partição: a FK para comandas exigiria a chave de partição nos itens.
+    # O arquivamento leva os itens junto com as comandas do mês.
+    op.execute("ALTER TABLE itens_comanda DROP CONSTRAINT itens_comanda_comanda_id_fkey")
+    op.create_index("idx_itens_comanda_comanda", "itens_comanda", ["comanda_id"])
+
+    _particionar("agendamentos", "data_hora_inicio")
+    op.execute(SEM_SOBREPOSICAO.format(tabela="agendamentos_padrao"))
+    op.execute("ALTER TABLE agendamentos ADD FOREIGN KEY (quadra_id) REFERENCES quadras (id)")
+    # Mesmo predicado literal das consultas de disponibilidade (pendente e confirmado)
+    op.execute("CREATE INDEX idx_agendamentos_ativos ON agendamentos (data_hora_inicio) WHERE status <> 'cancelado'")
+    op.execute(
+        f"CREATE TRIGGER agendamentos_notificar AFTER INSERT OR UPDATE OR DELETE ON agendamentos "
+        f"FOR EACH ROW {FORA_DA_MANUTENCAO} EXECUTE FUNCTION notificar_agendamento()"
+    )
+
+    # Comandas antigas podem ter created_at nulo: vale o updated_at ou o momento da migração
+    _particionar("comandas", "coalesce(created_at, updated_at, timezone('utc', now()))")
+    op.execute("ALTER TABLE comandas ALTER COLUMN created_at SET DEFAULT timezone('utc', now())")
+    op.execute("CREATE INDEX idx_comandas_abertas ON comandas (id) WHERE status = 'aberta'")
+
+    # Remover itens arquivados não pode descontar os contadores de vendas
+    op.execute("DROP TRIGGER itens_comanda_vendas_delete ON itens_comanda")
+    op.execute(
+        f"CREATE TRIGGER itens_comanda_vendas_delete AFTER DELETE ON itens_comanda REFERENCING OLD TABLE AS antigos "
+        f"FOR EACH STATEMENT {FORA_DA_MANUTENCAO} EXECUTE FUNCTION contabilizar_itens_comanda()"
+    )
+
+def _desparticionar(tabela: str) -> None:
+    coluna = TABELAS[tabela]
+    colunas = ", ".join(COLUNAS[tabela])
+    op.execute(f"ALTER SEQUENCE {tabela}_id_seq OWNED BY NONE")
+    op.execute(f"ALTER TABLE {tabela} RENAME TO {tabela}_particionada")
+    op.execute(f"CREATE TABLE {tabela} (LIKE {tabela}_particionada INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    op.execute(f"ALTER TABLE {tabela} ALTER COLUMN {coluna} DROP NOT NULL")
+    op.execute(f"INSERT INTO {tabela} ({colunas}) SELECT {colunas} FROM {tabela}_particionada")
+    op.execute(f"DROP TABLE {tabela}_particionada")
+    op.execute(f"ALTER SEQUENCE {tabela}_id_seq OWNED BY {tabela}.id")
+    op.execute(f"ALTER TABLE {tabela} ADD PRIMARY KEY (id)")
+    op.execute(f"ALTER TABLE {tabela} ADD FOREIGN KEY (cliente_id) REFERENCES users (id)")
+    op.execute(f"CREATE INDEX ix_{tabela}_id ON {tabela} (id)")
+    op.execute(f"CREATE INDEX idx_{tabela}_cliente ON {tabela} (cliente_id)")
+    op.execute(ATUALIZAR_UPDATED_AT.format(tabela=tabela))
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER itens_comanda_vendas_delete ON itens_comanda")
+    op.execute(
+        "CREATE TRIGGER itens_comanda_vendas_delete AFTER DELETE ON itens_comanda REFERENCING OLD TABLE AS antigos "
+        "FOR EACH STATEMENT EXECUTE FUNCTION contabilizar_itens_comanda()"
+    )
+
+    _desparticionar("comandas")
+    op.execute("ALTER TABLE comandas ALTER COLUMN created_at DROP DEFAULT")
+
+    _desparticionar("agendamentos")
+    op.execute("ALTER TABLE agendamentos ADD FOREIGN KEY (quadra_id) REFERENCES quadras (id)")
+    op.execute(SEM_SOBREPOSICAO.format(tabela="agendamentos"))
+    op.execute(
+        "CREATE TRIGGER agendamentos_notificar AFTER INSERT OR UPDATE OR DELETE ON agendamentos "
+        "FOR EACH ROW EXECUTE FUNCTION notificar_agendamento()"
+    )
+
+    op.drop_index("idx_itens_comanda_comanda", table_name="itens_comanda")
+    op.execute("ALTER TABLE itens_comanda ADD FOREIGN KEY (comanda_id) REFERENCES comandas (id)")
+    op.execute("DROP FUNCTION criar_particao_mensal(text, date)")
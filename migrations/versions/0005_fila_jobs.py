@@ -0,0 +1,49 @@
+"""fila de jobs em segundo plano
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-03-15 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+STATUS_JOB = ("pendente", "executando", "concluido", "falhou")
+
+def upgrade() -> None:
+    postgresql.ENUM(*STATUS_JOB, name="status_job").create(op.get_bind(), checkfirst=True)
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("tipo", sa.String(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False, server_default="{}"),
+        sa.Column(
+            "status", postgresql.ENUM(*STATUS_JOB, name="status_job", create_type=False),
+            nullable=False, server_default="pendente",
+        ),
+        sa.Column("tentativas", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_tentativas", sa.Integer(), nullable=False),
+        sa.Column("executar_em", sa.DateTime(), nullable=False),
+        sa.Column("iniciado_em", sa.DateTime()),
+        sa.Column("concluido_em", sa.DateTime()),
+        sa.Column("resultado", sa.JSON()),
+        sa.Column("erro", sa.Text()),
+        sa.Column("criado_por", sa.Integer(), sa.ForeignKey("users.id", ondelete="SET NULL")),
+    )
+    op.create_index(op.f("ix_jobs_id"), "jobs", ["id"])
+    # Índices parciais pequenos: só a fila e os jobs em execução, não o histórico de concluídos
+    op.execute("CREATE INDEX idx_jobs_fila ON jobs (executar_em) WHERE status = 'pendente'")
+    op.execute("CREATE INDEX idx_jobs_executando ON jobs (iniciado_em) WHERE status = 'executando'")
+    op.create_index("idx_jobs_criado_por", "jobs", ["criado_por"])
+
+def downgrade() -> None:
+    op.drop_table("jobs")
+    postgresql.ENUM(name="status_job").drop(op.get_bind(), checkfirst=True)
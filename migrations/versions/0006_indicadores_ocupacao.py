@@ -0,0 +1,191 @@
+"""indicadores de ocupação e receita
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2024-04-01 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# Soma (sinal 1) ou desconta (sinal -1) agendamentos nos indicadores por quadra, dia e hora no horário local,
+# o mesmo de data_hora_inicio e data_hora_fim.
+# Cada agendamento é dividido nas horas que ocupa, com o valor rateado pelos minutos em cada hora.
+APLICAR_OCUPACAO = """
+CREATE FUNCTION aplicar_ocupacao(
+    quadra_ids integer[], inicios timestamp[], fins timestamp[], valores double precision[], sinais integer[]
+) RETURNS void LANGUAGE sql AS $$
+    INSERT INTO ocupacao_horaria AS o (quadra_id, dia, hora, minutos, receita, atualizado_em)
+    SELECT d.quadra_id, h::date, extract(hour FROM h)::integer,
+           sum(d.sinal * extract(epoch FROM least(d.fim, h + interval '1 hour') - greatest(d.inicio, h)) / 60),
+           sum(d.sinal * coalesce(d.valor, 0)
+               * extract(epoch FROM least(d.fim, h + interval '1 hour') - greatest(d.inicio, h))
+               / extract(epoch FROM d.fim - d.inicio)),
+           timezone('utc', clock_timestamp())
+    FROM unnest(quadra_ids, inicios, fins, valores, sinais) AS d(quadra_id, inicio, fim, valor, sinal)
+    CROSS JOIN LATERAL generate_series(
+        date_trunc('hour', d.inicio), d.fim - interval '1 microsecond', interval '1 hour'
+    ) AS h
+    WHERE d.quadra_id IS NOT NULL AND d.fim > d.inicio
+    GROUP BY 1, 2, 3
+    ORDER BY 1, 2, 3
+    ON CONFLICT (quadra_id, dia, hora) DO UPDATE
+    SET minutos = o.minutos + EXCLUDED.minutos,
+        receita = o.receita + EXCLUDED.receita,
+        atualizado_em = EXCLUDED.atualizado_em;
+$$
+"""
+
+# Ocupação e receita contam os agendamentos ativos: pendentes também bloqueiam a quadra e nenhum
+# fluxo da API confirma agendamentos, então só o cancelamento tira um agendamento dos indicadores
+CONTABILIZAR_AGENDAMENTOS = """
+CREATE FUNCTION contabilizar_agendamentos() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM aplicar_ocupacao(
+            array_agg(quadra_id), array_agg(data_hora_inicio), array_agg(data_hora_fim),
+            array_agg(valor), array_agg(1)
+        ) FROM novos WHERE status <> 'cancelado';
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM aplicar_ocupacao(
+            array_agg(quadra_id), array_agg(data_hora_inicio), array_agg(data_hora_fim),
+            array_agg(valor), array_agg(-1)
+        ) FROM antigos WHERE status <> 'cancelado';
+    ELSE
+        PERFORM aplicar_ocupacao(
+            array_agg(quadra_id), array_agg(inicio), array_agg(fim), array_agg(valor), array_agg(sinal)
+        ) FROM (
+            SELECT a.quadra_id, a.data_hora_inicio AS inicio, a.data_hora_fim AS fim, a.valor, -1 AS sinal
+            FROM antigos a JOIN novos n ON n.id = a.id
+            WHERE a.status <> 'cancelado'
+              AND (a.quadra_id, a.data_hora_inicio, a.data_hora_fim, a.status, a.valor)
+                  IS DISTINCT FROM (n.quadra_id, n.data_hora_inicio, n.data_hora_fim, n.status, n.valor)
+            UNION ALL
+            SELECT n.quadra_id, n.data_hora_inicio, n.data_hora_fim, n.valor, 1
+            FROM novos n JOIN antigos a ON a.id = n.id
+            WHERE n.status <> 'cancelado'
+              AND (a.quadra_id, a.data_hora_inicio, a.data_hora_fim, a.status, a.valor)
+                  IS DISTINCT FROM (n.quadra_id, n.data_hora_inicio, n.data_hora_fim, n.status, n.valor)
+        ) AS delta;
+    END IF;
+    RETURN NULL;
+END;
+$$
+"""
+
+# Receita do bar por dia de abertura da comanda, contando só comandas pagas. created_at é UTC e vira a data local
+# (TimeZone do banco) para cair no mesmo dia dos agendamentos
+APLICAR_COMANDAS = """
+CREATE FUNCTION aplicar_comandas(dias date[], quantidades integer[], receitas double precision[])
+RETURNS void LANGUAGE sql AS $$
+    INSERT INTO receita_comandas_diaria AS r (dia, comandas, receita, atualizado_em)
+    SELECT d.dia, sum(d.quantidade), sum(d.receita), timezone('utc', clock_timestamp())
+    FROM unnest(dias, quantidades, receitas) AS d(dia, quantidade, receita)
+    GROUP BY d.dia
+    ORDER BY d.dia
+    ON CONFLICT (dia) DO UPDATE
+    SET comandas = r.comandas + EXCLUDED.comandas,
+        receita = r.receita + EXCLUDED.receita,
+        atualizado_em = EXCLUDED.atualizado_em;
+$$
+"""
+
+CONTABILIZAR_COMANDAS = """
+CREATE FUNCTION contabilizar_comandas() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM aplicar_comandas(array_agg((created_at AT TIME ZONE 'UTC')::date), array_agg(1), array_agg(coalesce(valor_total, 0)))
+        FROM novos WHERE status = 'paga';
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM aplicar_comandas(array_agg((created_at AT TIME ZONE 'UTC')::date), array_agg(-1), array_agg(-coalesce(valor_total, 0)))
+        FROM antigos WHERE status = 'paga';
+    ELSE
+        PERFORM aplicar_comandas(array_agg(dia), array_agg(quantidade), array_agg(receita))
+        FROM (
+            SELECT (a.created_at AT TIME ZONE 'UTC')::date AS dia, -1 AS quantidade, -coalesce(a.valor_total, 0) AS receita
+            FROM antigos a JOIN novos n ON n.id = a.id
+            WHERE a.status = 'paga'
+              AND (a.created_at, a.status, a.valor_total) IS DISTINCT FROM (n.created_at, n.status, n.valor_total)
+            UNION ALL
+            SELECT (n.created_at AT TIME ZONE 'UTC')::date, 1, coalesce(n.valor_total, 0)
+            FROM novos n JOIN antigos a ON a.id = n.id
+            WHERE n.status = 'paga'
+              AND (a.created_at, a.status, a.valor_total) IS DISTINCT FROM (n.created_at, n.status, n.valor_total)
+        ) AS delta;
+    END IF;
+    RETURN NULL;
+END;
+$$
+"""
+
+# Triggers por statement na tabela particionada: movimentações e arquivamento de partições
+# operam direto nas partições e não alteram os indicadores, que sobrevivem ao arquivamento
+TRIGGERS = {
+    "agendamentos_indicadores_insert": ("agendamentos", "INSERT", "NEW TABLE AS novos", "contabilizar_agendamentos"),
+    "agendamentos_indicadores_delete": ("agendamentos", "DELETE", "OLD TABLE AS antigos", "contabilizar_agendamentos"),
+    "agendamentos_indicadores_update": (
+        "agendamentos", "UPDATE", "OLD TABLE AS antigos NEW TABLE AS novos", "contabilizar_agendamentos",
+    ),
+    "comandas_indicadores_insert": ("comandas", "INSERT", "NEW TABLE AS novos", "contabilizar_comandas"),
+    "comandas_indicadores_delete": ("comandas", "DELETE", "OLD TABLE AS antigos", "contabilizar_comandas"),
+    "comandas_indicadores_update": (
+        "comandas", "UPDATE", "OLD TABLE AS antigos NEW TABLE AS novos", "contabilizar_comandas",
+    ),
+}
+
+def upgrade() -> None:
+    op.create_table(
+        "ocupacao_horaria",
+        sa.Column("quadra_id", sa.Integer(), sa.ForeignKey("quadras.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("dia", sa.Date(), primary_key=True),
+        sa.Column("hora", sa.Integer(), primary_key=True),
+        sa.Column("minutos", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("receita", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("atualizado_em", sa.DateTime(), nullable=False),
+    )
+    op.create_table(
+        "receita_comandas_diaria",
+        sa.Column("dia", sa.Date(), primary_key=True),
+        sa.Column("comandas", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("receita", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("atualizado_em", sa.DateTime(), nullable=False),
+    )
+    # O painel relê só o que mudou desde a última sincronização
+    op.create_index("idx_ocupacao_horaria_atualizado", "ocupacao_horaria", ["atualizado_em"])
+    op.create_index("idx_receita_comandas_atualizado", "receita_comandas_diaria", ["atualizado_em"])
+
+    op.execute(APLICAR_OCUPACAO)
+    op.execute(CONTABILIZAR_AGENDAMENTOS)
+    op.execute(APLICAR_COMANDAS)
+    op.execute(CONTABILIZAR_COMANDAS)
+    for name, (tabela, evento, transicao, funcao) in TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER {name} AFTER {evento} ON {tabela} REFERENCING {transicao} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION {funcao}()"
+        )
+
+    # Carga inicial a partir dos dados existentes, pelo mesmo caminho dos triggers
+    op.execute(
+        "SELECT aplicar_ocupacao(array_agg(quadra_id), array_agg(data_hora_inicio), array_agg(data_hora_fim), "
+        "array_agg(valor), array_agg(1)) "
+        "FROM agendamentos WHERE status <> 'cancelado'"
+    )
+    op.execute(
+        "SELECT aplicar_comandas(array_agg((created_at AT TIME ZONE 'UTC')::date), array_agg(1), array_agg(coalesce(valor_total, 0))) "
+        "FROM comandas WHERE status = 'paga'"
+    )
+
+def downgrade() -> None:
+    for name, (tabela, *_) in TRIGGERS.items():
+        op.execute(f"DROP TRIGGER {name} ON {tabela}")
+    op.execute("DROP FUNCTION contabilizar_comandas()")
+    op.execute("DROP FUNCTION aplicar_comandas(date[], integer[], double precision[])")
+    op.execute("DROP FUNCTION contabilizar_agendamentos()")
+    op.execute("DROP FUNCTION aplicar_ocupacao(integer[], timestamp[], timestamp[], double precision[], integer[])")
+    op.drop_table("receita_comandas_diaria")
+    op.drop_table("ocupacao_horaria")
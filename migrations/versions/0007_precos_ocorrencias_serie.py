@@ -0,0 +1,89 @@
+"""preço por ocorrência das séries
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2024-04-15 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# Datas das ocorrências de uma série, com as mesmas regras de app/services/recorrencia.py:
+# diária a cada `intervalo` dias; semanal a cada `intervalo` semanas (contadas a partir da segunda-feira
+# da semana de data_inicio) nos dias de `dias_semana`, ou no dia da semana de data_inicio
+DATAS_SERIE = """
+CREATE FUNCTION datas_serie(
+    frequencia frequencia_serie, intervalo integer, dias_semana text, data_inicio date, data_fim date
+) RETURNS SETOF date LANGUAGE sql IMMUTABLE AS $$
+    SELECT dia::date
+    FROM generate_series(data_inicio::timestamp, data_fim::timestamp, interval '1 day') AS dia
+    WHERE CASE
+        WHEN frequencia = 'diaria' THEN (dia::date - data_inicio) % greatest(coalesce(intervalo, 1), 1) = 0
+        ELSE ((dia::date - data_inicio + extract(isodow FROM data_inicio)::integer - 1) / 7)
+                 % greatest(coalesce(intervalo, 1), 1) = 0
+             AND extract(isodow FROM dia)::integer = ANY (
+                 CASE WHEN coalesce(dias_semana, '') = '' THEN ARRAY[extract(isodow FROM data_inicio)::integer]
+                 ELSE ARRAY(
+                     SELECT array_position(ARRAY['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU'], token)
+                     FROM unnest(string_to_array(dias_semana, ',')) AS token
+                 )
+                 END
+             )
+    END
+$$
+"""
+
+def upgrade() -> None:
+    # Valor de cada ocorrência por dia da semana (segunda = 0); remarcadas guardam o próprio valor
+    op.add_column("series_agendamento", sa.Column("valores_semana", sa.JSON(), nullable=True))
+    op.add_column("excecoes_agendamento", sa.Column("valor", sa.Float(), nullable=True))
+    op.execute(DATAS_SERIE)
+
+    # `valor` passa de preço da primeira ocorrência a total da série. Séries existentes mantêm o preço
+    # que tinham em todas as ocorrências
+    op.execute(
+        "UPDATE series_agendamento SET valores_semana = json_build_array(valor, valor, valor, valor, valor, valor, valor)"
+    )
+    op.execute(
+        "UPDATE excecoes_agendamento e SET valor = s.valor FROM series_agendamento s "
+        "WHERE s.id = e.serie_id AND NOT e.cancelada AND e.data_hora_inicio IS NOT NULL"
+    )
+    op.execute(
+        """
+        UPDATE series_agendamento s
+        SET valor = coalesce(s.valor, 0) * (
+                SELECT count(*)
+                FROM datas_serie(s.frequencia, s.intervalo, s.dias_semana, s.data_inicio, s.data_fim) AS d
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM excecoes_agendamento e
+                    WHERE e.serie_id = s.id AND e.data = d AND (e.cancelada OR e.data_hora_inicio IS NOT NULL)
+                )
+            ) + coalesce((
+                SELECT sum(e.valor) FROM excecoes_agendamento e
+                WHERE e.serie_id = s.id AND NOT e.cancelada AND e.data_hora_inicio IS NOT NULL
+            ), 0)
+        """
+    )
+
+def downgrade() -> None:
+    # Volta ao preço por ocorrência: o da primeira ocorrência que ainda tem valor
+    op.execute(
+        """
+        UPDATE series_agendamento s
+        SET valor = (
+            SELECT (s.valores_semana ->> (extract(isodow FROM d)::integer - 1))::double precision
+            FROM datas_serie(s.frequencia, s.intervalo, s.dias_semana, s.data_inicio, s.data_fim) AS d
+            ORDER BY d
+            LIMIT 1
+        )
+        WHERE s.valores_semana IS NOT NULL
+        """
+    )
+    op.execute("DROP FUNCTION datas_serie(frequencia_serie, integer, text, date, date)")
+    op.drop_column("excecoes_agendamento", "valor")
+    op.drop_column("series_agendamento", "valores_semana")
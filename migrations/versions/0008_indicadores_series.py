@@ -0,0 +1,148 @@
+"""séries recorrentes nos indicadores de ocupação
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2024-05-01 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+# Séries não gravam uma linha por ocorrência, então não há delta a aplicar linha a linha como em
+# agendamentos. `ocorrencias_contabilizadas` guarda o que cada série somou nos indicadores: recontabilizar
+# desconta o que foi somado e soma as ocorrências atuais, o que dá o mesmo resultado em qualquer ordem
+# e com qualquer combinação de alterações na série e nas exceções.
+RECONTABILIZAR_SERIES = """
+CREATE FUNCTION recontabilizar_series(ids integer[]) RETURNS void LANGUAGE sql AS $$
+    -- Alterações concorrentes na mesma série esperam aqui e releem o que a anterior gravou
+    SELECT 1 FROM series_agendamento WHERE id = ANY (ids) ORDER BY id FOR NO KEY UPDATE;
+
+    WITH removidas AS (
+        DELETE FROM ocorrencias_contabilizadas WHERE serie_id = ANY (ids)
+        RETURNING quadra_id, inicio, fim, valor
+    )
+    SELECT aplicar_ocupacao(array_agg(quadra_id), array_agg(inicio), array_agg(fim), array_agg(valor), array_agg(-1))
+    FROM removidas;
+
+    -- Ocorrências de séries ativas, sem as canceladas; remarcadas contam no novo horário e pelo próprio valor
+    WITH incluidas AS (
+        INSERT INTO ocorrencias_contabilizadas (serie_id, data, quadra_id, inicio, fim, valor)
+        SELECT s.id, d, s.quadra_id, d + s.hora_inicio, d + s.hora_fim,
+               (s.valores_semana ->> (extract(isodow FROM d)::integer - 1))::double precision
+        FROM series_agendamento s
+        CROSS JOIN LATERAL datas_serie(s.frequencia, s.intervalo, s.dias_semana, s.data_inicio, s.data_fim) AS d
+        WHERE s.id = ANY (ids) AND s.status <> 'cancelado'
+          AND NOT EXISTS (
+              SELECT 1 FROM excecoes_agendamento e
+              WHERE e.serie_id = s.id AND e.data = d AND (e.cancelada OR e.data_hora_inicio IS NOT NULL)
+          )
+        UNION ALL
+        SELECT s.id, e.data, s.quadra_id, e.data_hora_inicio, e.data_hora_fim, e.valor
+        FROM series_agendamento s
+        JOIN excecoes_agendamento e ON e.serie_id = s.id
+        WHERE s.id = ANY (ids) AND s.status <> 'cancelado' AND NOT e.cancelada AND e.data_hora_inicio IS NOT NULL
+        RETURNING quadra_id, inicio, fim, valor
+    )
+    SELECT aplicar_ocupacao(array_agg(quadra_id), array_agg(inicio), array_agg(fim), array_agg(valor), array_agg(1))
+    FROM incluidas;
+$$
+"""
+
+CONTABILIZAR_SERIES = """
+CREATE FUNCTION contabilizar_series() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM recontabilizar_series(array_agg(id)) FROM novos;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM recontabilizar_series(array_agg(id)) FROM antigos;
+    ELSE
+        PERFORM recontabilizar_series(array_agg(n.id))
+        FROM novos n JOIN antigos a ON a.id = n.id
+        WHERE (a.quadra_id, a.frequencia, a.intervalo, a.dias_semana, a.data_inicio, a.data_fim,
+               a.hora_inicio, a.hora_fim, a.status, a.valores_semana::text)
+              IS DISTINCT FROM (n.quadra_id, n.frequencia, n.intervalo, n.dias_semana, n.data_inicio, n.data_fim,
+                                n.hora_inicio, n.hora_fim, n.status, n.valores_semana::text);
+    END IF;
+    RETURN NULL;
+END;
+$$
+"""
+
+CONTABILIZAR_EXCECOES = """
+CREATE FUNCTION contabilizar_excecoes() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM recontabilizar_series(array_agg(DISTINCT serie_id)) FROM novos;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM recontabilizar_series(array_agg(DISTINCT serie_id)) FROM antigos;
+    ELSE
+        PERFORM recontabilizar_series(array_agg(serie_id))
+        FROM (SELECT serie_id FROM antigos UNION SELECT serie_id FROM novos) AS alteradas;
+    END IF;
+    RETURN NULL;
+END;
+$$
+"""
+
+TRIGGERS = {
+    "series_agendamento_indicadores_insert": (
+        "series_agendamento", "INSERT", "NEW TABLE AS novos", "contabilizar_series",
+    ),
+    "series_agendamento_indicadores_delete": (
+        "series_agendamento", "DELETE", "OLD TABLE AS antigos", "contabilizar_series",
+    ),
+    "series_agendamento_indicadores_update": (
+        "series_agendamento", "UPDATE", "OLD TABLE AS antigos NEW TABLE AS novos", "contabilizar_series",
+    ),
+    "excecoes_agendamento_indicadores_insert": (
+        "excecoes_agendamento", "INSERT", "NEW TABLE AS novos", "contabilizar_excecoes",
+    ),
+    "excecoes_agendamento_indicadores_delete": (
+        "excecoes_agendamento", "DELETE", "OLD TABLE AS antigos", "contabilizar_excecoes",
+    ),
+    "excecoes_agendamento_indicadores_update": (
+        "excecoes_agendamento", "UPDATE", "OLD TABLE AS antigos NEW TABLE AS novos", "contabilizar_excecoes",
+    ),
+}
+
+def upgrade() -> None:
+    # Sem FK para a série: a exclusão da série precisa encontrar estas linhas para descontá-las
+    op.create_table(
+        "ocorrencias_contabilizadas",
+        sa.Column("serie_id", sa.Integer(), primary_key=True),
+        sa.Column("data", sa.Date(), primary_key=True),
+        sa.Column("quadra_id", sa.Integer(), nullable=False),
+        sa.Column("inicio", sa.DateTime(), nullable=False),
+        sa.Column("fim", sa.DateTime(), nullable=False),
+        sa.Column("valor", sa.Float(), nullable=True),
+    )
+
+    op.execute(RECONTABILIZAR_SERIES)
+    op.execute(CONTABILIZAR_SERIES)
+    op.execute(CONTABILIZAR_EXCECOES)
+    for name, (tabela, evento, transicao, funcao) in TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER {name} AFTER {evento} ON {tabela} REFERENCING {transicao} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION {funcao}()"
+        )
+
+    # Carga inicial: todas as séries existentes
+    op.execute("SELECT recontabilizar_series(array_agg(id)) FROM series_agendamento")
+
+def downgrade() -> None:
+    for name, (tabela, *_) in TRIGGERS.items():
+        op.execute(f"DROP TRIGGER {name} ON {tabela}")
+    # Tira dos indicadores o que as séries tinham somado
+    op.execute(
+        "SELECT aplicar_ocupacao(array_agg(quadra_id), array_agg(inicio), array_agg(fim), array_agg(valor), "
+        "array_agg(-1)) FROM ocorrencias_contabilizadas"
+    )
+    op.execute("DROP FUNCTION contabilizar_excecoes()")
+    op.execute("DROP FUNCTION contabilizar_series()")
+    op.execute("DROP FUNCTION recontabilizar_series(integer[])")
+    op.drop_table("ocorrencias_contabilizadas")
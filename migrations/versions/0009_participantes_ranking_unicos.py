@@ -0,0 +1,28 @@
+"""um participante por jogador em cada ranking
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2024-05-15 10:00:00
+
+"""
+from alembic import op
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Inscrições duplicadas por requests concorrentes: fica a primeira
+    op.execute(
+        "DELETE FROM participantes_ranking p USING participantes_ranking o "
+        "WHERE o.ranking_id = p.ranking_id AND o.jogador_id = p.jogador_id AND o.id < p.id"
+    )
+    op.drop_index("idx_participantes_ranking", table_name="participantes_ranking")
+    op.create_unique_constraint(
+        "participantes_ranking_ranking_jogador", "participantes_ranking", ["ranking_id", "jogador_id"]
+    )
+
+def downgrade() -> None:
+    op.drop_constraint("participantes_ranking_ranking_jogador", "participantes_ranking", type_="unique")
+    op.create_index("idx_participantes_ranking", "participantes_ranking", ["ranking_id", "jogador_id"])